@@ -0,0 +1,910 @@
+"""
+Admin routes: assignment (single, bulk and automatic), dashboards, exports,
+user management, audit logs and operational metrics.
+"""
+
+from flask import Blueprint, Response, current_app, request, jsonify, session
+import os
+import itertools
+import uuid
+from datetime import datetime
+import mysql.connector
+
+from pagination import parse_page_args, keyset_condition, page_response
+from serialization import fetch_dicts
+from notifications import create_notifications, report_parties
+from dashboard_counters import get_counters
+from response_cache import cached
+from rate_limit import limit
+from bulk_assign import (InvalidBatch, parse_assignments, select_by_filter, select_for_auto_assign,
+                         stored_results, current_officers, apply_batch, purge_old_batches,
+                         assignment_notices, summarize)
+from audit_partitions import truncate_all, list_partitions, list_archives, query_archives
+from exports import EXPORTS, FORMATS, InvalidExport, build_export_query, ndjson_chunks, csv_chunks, gzip_chunks
+from profiling import InstrumentedCursor
+from extensions import (DatabaseUnavailable, db_cursor, get_db_pool, get_db_connection, get_dedicated_connection,
+                        get_audit_writer, get_assignment_engine, refresh_caseloads, forget_officer, log_audit_event,
+                        profiler, response_cache, notification_hub)
+from procedures import get_user_statistics, assign_officer_to_report, notify_assignment
+
+bp = Blueprint('admin', __name__)
+
+# Test database connection
+@bp.route('/test_db')
+def test_db():
+    with db_cursor() as (connection, cursor):
+        try:
+            # Test if tables exist
+            cursor.execute("SHOW TABLES")
+            tables = cursor.fetchall()
+            return jsonify({
+                "message": "Database connection successful",
+                "tables": [table[0] for table in tables]
+            }), 200
+        except Exception as e:
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+@bp.route('/admin/assign', methods=['POST'])
+def admin_assign():
+    print(f"Admin assign request - Session: {session}")
+    print(f"User ID in session: {session.get('user_id')}")
+    print(f"Role in session: {session.get('role')}")
+    
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.json
+    report_id = data.get('report_id')
+    officer_id = data.get('officer_id')
+    note = data.get('note', '')
+    
+    if not report_id or not officer_id:
+        return jsonify({'error': 'Report ID and Officer ID are required'}), 400
+    
+    # Use stored procedure to assign officer
+    try:
+        # A reassignment also takes the case off the previous officer's caseload
+        with db_cursor() as (connection, cursor):
+            _, previous_officer_id = report_parties(cursor, report_id)
+        result = assign_officer_to_report(report_id, officer_id, note)
+        if result is not None:
+            response_cache.invalidate(f'report:{report_id}', 'reports')
+            refresh_caseloads([officer_id, previous_officer_id])
+            notify_assignment(report_id, officer_id)
+            return jsonify({'message': 'Officer assigned successfully'}), 200
+        else:
+            return jsonify({'error': 'Failed to assign officer'}), 500
+    except Exception as e:
+        print(f"Error in stored procedure call: {e}")
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+@bp.route('/admin/assign/bulk', methods=['POST'])
+def admin_bulk_assign():
+    """
+    Assign many reports in one transaction.
+
+    Body: {"assignments": [{"report_id", "officer_id", "note"}, ...]} or
+    {"filter": {...}, "officer_id": n, "note": "..."}.  Send an
+    Idempotency-Key header (or "idempotency_key") to make retries replay
+    the stored results instead of re-applying the batch.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    batch_key = request.headers.get('Idempotency-Key') or data.get('idempotency_key')
+    if batch_key and len(batch_key) > 64:
+        return jsonify({'error': 'Idempotency key must be at most 64 characters'}), 400
+    max_items = current_app.config['BULK_ASSIGN_MAX_ITEMS']
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            if batch_key:
+                results = stored_results(cursor, batch_key)
+                if results:
+                    return jsonify({
+                        'batch_key': batch_key,
+                        'replayed': True,
+                        'summary': summarize(results),
+                        'results': results
+                    }), 200
+            else:
+                batch_key = uuid.uuid4().hex
+            
+            if 'assignments' in data:
+                items = parse_assignments(data['assignments'], max_items)
+            elif 'filter' in data:
+                items = select_by_filter(cursor, data['filter'], data.get('officer_id'), data.get('note'), max_items)
+            else:
+                return jsonify({'error': 'assignments or filter is required'}), 400
+            
+            if not items:
+                return jsonify({'batch_key': batch_key, 'replayed': False, 'summary': {}, 'results': []}), 200
+            
+            purge_old_batches(cursor, current_app.config['BULK_ASSIGN_RETENTION_DAYS'])
+            previous_officers = current_officers(cursor, [report_id for report_id, _, _ in items])
+            results = apply_batch(cursor, batch_key, items)
+            
+            assigned = [row for row in results if row['result'] == 'assigned']
+            created = create_assignment_notifications(cursor, results)
+            
+            connection.commit()
+        
+        except InvalidBatch:
+            raise
+        except mysql.connector.IntegrityError:
+            # The same idempotency key is being applied by a concurrent request
+            connection.rollback()
+            return jsonify({'error': 'Batch with this idempotency key is in progress; retry shortly'}), 409
+        except Exception as e:
+            print(f"Database error in admin_bulk_assign: {e}")
+            connection.rollback()
+            return jsonify({"error": "Database error"}), 500
+    
+    if assigned:
+        response_cache.invalidate('reports', *[f"report:{row['report_id']}" for row in assigned])
+        # The new officers' caseloads and those of the officers the cases were taken from
+        refresh_caseloads([row['officer_id'] for row in assigned] +
+                          [previous_officers.get(row['report_id']) for row in assigned])
+    notification_hub.publish(created)
+    
+    summary = summarize(results)
+    admin_name = session.get('email', 'Admin')
+    log_audit_event(admin_name, "Bulk Assignment",
+                    f"Batch {batch_key}: {len(results)} items, {summary.get('assigned', 0)} assigned",
+                    "Success", request.remote_addr)
+    
+    return jsonify({
+        'batch_key': batch_key,
+        'replayed': False,
+        'summary': summary,
+        'results': results
+    }), 200
+
+def create_assignment_notifications(cursor, results):
+    """Notifications for assigned batch items, inserted 1000 at a time"""
+    notices = assignment_notices(results)
+    created = []
+    for start in range(0, len(notices), 1000):
+        created.extend(create_notifications(cursor, notices[start:start + 1000]))
+    return created
+
+@bp.route('/admin/assign/auto', methods=['POST'])
+def admin_auto_assign():
+    """
+    Assign matching reports to the least-loaded officers with a suitable
+    specialization, in one transaction.
+
+    Body: {"filter": {...}, "note": "..."}, with the same filter keys as
+    /admin/assign/bulk (default: Open, unassigned reports, oldest first).
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    note = data.get('note') or 'Assigned automatically by caseload'
+    engine = get_assignment_engine()
+    batch_key = uuid.uuid4().hex
+    items = []
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            items, skipped = select_for_auto_assign(cursor, data.get('filter', {}), engine, note,
+                                                    current_app.config['BULK_ASSIGN_MAX_ITEMS'])
+            if not items:
+                return jsonify({'batch_key': None, 'skipped': skipped, 'summary': {}, 'results': []}), 200
+            
+            purge_old_batches(cursor, current_app.config['BULK_ASSIGN_RETENTION_DAYS'])
+            previous_officers = current_officers(cursor, [report_id for report_id, _, _ in items])
+            results = apply_batch(cursor, batch_key, items)
+            created = create_assignment_notifications(cursor, results)
+            
+            connection.commit()
+        
+        except InvalidBatch:
+            raise
+        except Exception as e:
+            print(f"Database error in admin_auto_assign: {e}")
+            connection.rollback()
+            for _, officer_id, _ in items:
+                engine.release(officer_id)
+            return jsonify({"error": "Database error"}), 500
+    
+    # Items the procedure did not assign (e.g. a report taken meanwhile) give their reservation back
+    for row in results:
+        if row['result'] != 'assigned':
+            engine.release(row['officer_id'])
+    
+    assigned = [row for row in results if row['result'] == 'assigned']
+    if assigned:
+        response_cache.invalidate('reports', *[f"report:{row['report_id']}" for row in assigned])
+        # The new officers' reservations already count the cases; the officers
+        # they were taken from (with unassigned_only off) are re-read
+        refresh_caseloads(previous_officers.get(row['report_id']) for row in assigned)
+    notification_hub.publish(created)
+    
+    summary = summarize(results)
+    admin_name = session.get('email', 'Admin')
+    log_audit_event(admin_name, "Auto Assignment",
+                    f"Batch {batch_key}: {len(results)} items, {summary.get('assigned', 0)} assigned",
+                    "Success", request.remote_addr)
+    
+    return jsonify({
+        'batch_key': batch_key,
+        'skipped': skipped,
+        'summary': summary,
+        'results': results
+    }), 200
+
+@bp.route('/admin/analytics', methods=['GET'])
+def admin_analytics():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Use stored procedure for user statistics
+    user_stats = get_user_statistics()
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Report tallies come from the materialized counters, not a scan of reports
+            counters = get_counters(cursor, 'global')
+            report_stats = {
+                'total_reports': counters['total_reports'],
+                'open_reports': counters['open_reports'],
+                'investigating_reports': counters['investigating_reports'],
+                'closed_reports': counters['closed_reports'],
+                'rejected_reports': counters['rejected_reports'],
+                'total_evidence': counters['evidence_count'],
+                'total_evidence_bytes': counters['evidence_bytes']
+            }
+        
+            # Reports per officer: one counter row per active officer
+            cursor.execute("""
+                SELECT u.name as officer_name,
+                       COALESCE(c.total_reports, 0) as total_cases,
+                       COALESCE(c.closed_reports, 0) as closed_cases,
+                       c.response_days_total / NULLIF(c.total_reports, 0) as avg_response_time
+                FROM users u
+                JOIN officers off ON u.id = off.user_id
+                LEFT JOIN dashboard_counters c ON c.scope = 'officer' AND c.owner_id = u.id
+                WHERE u.role = 'officer' AND u.is_active = TRUE
+                ORDER BY total_cases DESC
+            """)
+            reports_per_officer = cursor.fetchall()
+        
+            # Get active cases using view
+            cursor.execute("SELECT * FROM active_cases_view LIMIT 10")
+            active_cases = cursor.fetchall()
+        
+            # Reports with the most evidence, read off the counters index
+            cursor.execute("""
+                SELECT c.owner_id as report_id, r.crime_type, c.evidence_count,
+                       c.evidence_bytes as total_size
+                FROM dashboard_counters c
+                JOIN reports r ON r.id = c.owner_id
+                WHERE c.scope = 'report'
+                ORDER BY c.evidence_count DESC
+                LIMIT 10
+            """)
+            evidence_summary = cursor.fetchall()
+        
+            return jsonify({
+                'user_stats': user_stats,
+                'report_stats': report_stats,
+                'reports_per_officer': reports_per_officer,
+                'active_cases': active_cases,
+                'evidence_summary': evidence_summary
+            }), 200
+        
+        except Exception as e:
+            print(f"Database error in admin_analytics: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/active_cases', methods=['GET'])
+@cached(tags=['reports', 'users'])
+def get_active_cases():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            cursor.execute("SELECT * FROM active_cases_view")
+            active_cases = fetch_dicts(cursor)
+        
+            return jsonify({'active_cases': active_cases}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_active_cases: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/officer_performance', methods=['GET'])
+@cached(tags=['reports', 'users'])
+def get_officer_performance():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            cursor.execute("SELECT * FROM officer_performance_view")
+            officer_performance = fetch_dicts(cursor)
+        
+            return jsonify({'officer_performance': officer_performance}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_officer_performance: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/audit_trail', methods=['GET'])
+def get_audit_trail():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            cursor.execute("SELECT * FROM audit_trail_view LIMIT 100")
+            audit_trail = fetch_dicts(cursor)
+        
+            return jsonify({'audit_trail': audit_trail}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_audit_trail: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/all_reports', methods=['GET'])
+def admin_all_reports():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    limit, position, include_total = parse_page_args(request.args)
+    # ?unassigned=1: only reports still waiting for an officer (the assignment page)
+    unassigned = request.args.get('unassigned', '').lower() in ('1', 'true', 'yes')
+    filters = ['r.assigned_officer_id IS NULL'] if unassigned else []
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            after, after_params = keyset_condition('r.date_submitted', 'r.id', position)
+            conditions = filters + ([after] if after else [])
+            cursor.execute(f"""
+                SELECT r.id, r.crime_type, r.description, r.date_occurred, r.date_submitted, r.location, r.status, r.priority,
+                       u.name as victim_name, u.phone as victim_phone,
+                       o.name as assigned_officer_name
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                LEFT JOIN users o ON r.assigned_officer_id = o.id
+                {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                ORDER BY r.date_submitted DESC, r.id DESC
+                LIMIT %s
+            """, after_params + [limit + 1])
+        
+            reports, page = page_response(fetch_dicts(cursor), limit, 'date_submitted')
+            
+            if include_total:
+                cursor.execute(f"""
+                    SELECT COUNT(*) as total FROM reports r
+                    {'WHERE ' + ' AND '.join(filters) if filters else ''}
+                """)
+                page['total'] = cursor.fetchone()[0]
+        
+            return jsonify({'reports': reports, 'page': page}), 200
+        
+        except Exception as e:
+            print(f"Database error in admin_all_reports: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/export/<kind>', methods=['GET'])
+@limit('export')
+def admin_export(kind):
+    """
+    Stream every row of an export (reports, evidence or audit_logs) as NDJSON
+    (default) or CSV (?format=csv).  Filters: from, to, status, officer_id.
+    The body is gzip-encoded when the client accepts it, unless ?gzip=0.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    if kind not in EXPORTS:
+        return jsonify({'error': f"Unknown export; choose one of {', '.join(EXPORTS)}"}), 404
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in FORMATS:
+        raise InvalidExport(f"format must be one of {', '.join(FORMATS)}")
+    query, params = build_export_query(kind, request.args)
+    
+    # Not pooled: the stream can outlast the leak threshold, and the export
+    # concurrency cap already bounds how many of these are open
+    connection = get_dedicated_connection('export')
+    if not connection:
+        raise DatabaseUnavailable()
+    try:
+        # Unbuffered: rows are read from the server as the response is sent
+        cursor = InstrumentedCursor(connection.cursor(buffered=False), profiler._get_current_object())
+        cursor.execute(query, params)
+    except Exception as e:
+        print(f"Database error in admin_export: {e}")
+        connection.discard()
+        return jsonify({"error": "Database error"}), 500
+    
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    if export_format == 'csv':
+        chunks = csv_chunks(cursor, batch_size)
+    else:
+        chunks = ndjson_chunks(cursor, batch_size)
+    compress = request.args.get('gzip', 'auto')
+    if compress in ('1', 'true') or (compress == 'auto' and request.accept_encodings['gzip']):
+        chunks = gzip_chunks(chunks, current_app.config['EXPORT_GZIP_LEVEL'])
+        encoding = 'gzip'
+    else:
+        encoding = None
+    
+    def stream():
+        try:
+            yield from chunks
+        except Exception as e:
+            print(f"Export of {kind} failed mid-stream: {e}")
+            return
+        cursor.close()
+        connection.close()
+    
+    def release():
+        # Client went away or the read failed: don't drain the rest of the result
+        if not connection.closed:
+            connection.discard()
+    
+    admin_name = session.get('email', 'Admin')
+    log_audit_event(admin_name, "Data Exported", f"Export of {kind} as {export_format}: {request.query_string.decode()}",
+                    "Success", request.remote_addr)
+    
+    mimetype, extension = FORMATS[export_format]
+    response = Response(stream(), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{kind}.{extension}"'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.call_on_close(release)
+    return response
+
+@bp.route('/admin/available_officers', methods=['GET'])
+@cached(tags=['users'])
+def admin_available_officers():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            cursor.execute("""
+                SELECT u.id, u.name, u.email, u.phone,
+                       o.badge_number, o.department, o.specialization, o.rank_name
+                FROM users u
+                JOIN officers o ON u.id = o.user_id
+                WHERE u.role = 'officer' AND u.is_active = TRUE
+                ORDER BY u.name
+            """)
+        
+            available_officers = cursor.fetchall()
+        
+            # Convert to frontend format
+            formatted_officers = []
+            for officer in available_officers:
+                officer_data = {
+                    'id': officer['id'],
+                    'name': officer['name'],
+                    'email': officer['email'],
+                    'specialization': officer.get('specialization', 'General'),
+                    'department': officer.get('department', 'Cyber Crime'),
+                    'badge': officer.get('badge_number', 'N/A'),
+                    'rank': officer.get('rank_name', 'Officer')
+                }
+                formatted_officers.append(officer_data)
+        
+            return jsonify({'officers': formatted_officers}), 200
+        
+        except Exception as e:
+            print(f"Database error in admin_available_officers: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+# New API endpoints for ManageUsers functionality
+@bp.route('/admin/users', methods=['GET'])
+def get_all_users():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    limit, position, include_total = parse_page_args(request.args)
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            after, after_params = keyset_condition('u.created_at', 'u.id', position)
+            cursor.execute(f"""
+                SELECT u.id, u.name, u.email, u.phone, u.role, u.created_at,
+                       v.nid, v.address, v.emergency_contact,
+                       o.badge_number, o.department, o.specialization, o.rank_name,
+                       a.admin_code, a.position
+                FROM users u
+                LEFT JOIN victims v ON u.id = v.user_id
+                LEFT JOIN officers o ON u.id = o.user_id
+                LEFT JOIN admins a ON u.id = a.user_id
+                WHERE u.is_active = TRUE {'AND ' + after if after else ''}
+                ORDER BY u.created_at DESC, u.id DESC
+                LIMIT %s
+            """, after_params + [limit + 1])
+        
+            users_list, page = page_response(cursor.fetchall(), limit, 'created_at')
+            
+            if include_total:
+                cursor.execute("SELECT COUNT(*) as total FROM users WHERE is_active = TRUE")
+                page['total'] = cursor.fetchone()['total']
+        
+            # Convert to frontend format
+            formatted_users = []
+            for user in users_list:
+                user_data = {
+                    'id': user['id'],
+                    'name': user['name'],
+                    'email': user['email'],
+                    'phone': user.get('phone', 'N/A'),
+                    'role': user['role'].title(),
+                    'joinDate': user['created_at'].date() if user.get('created_at') else '2024-01-01',
+                    'specialization': user.get('specialization', 'General'),
+                    'department': user.get('department', 'Cyber Crime'),
+                    'badge': user.get('badge_number', 'N/A')
+                }
+                formatted_users.append(user_data)
+        
+            return jsonify({'users': formatted_users, 'page': page}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_all_users: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/users/<int:user_id>', methods=['PUT'])
+def update_user(user_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.json
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            # Update user data in users table
+            update_fields = []
+            update_values = []
+        
+            if 'name' in data:
+                update_fields.append("name = %s")
+                update_values.append(data['name'])
+            if 'phone' in data:
+                update_fields.append("phone = %s")
+                update_values.append(data['phone'])
+            if 'role' in data:
+                update_fields.append("role = %s")
+                update_values.append(data['role'].lower())
+        
+            if update_fields:
+                update_values.append(user_id)
+                cursor.execute(f"""
+                    UPDATE users 
+                    SET {', '.join(update_fields)}
+                    WHERE id = %s
+                """, update_values)
+            
+                if cursor.rowcount == 0:
+                    return jsonify({'error': 'User not found'}), 404
+        
+            # Update role-specific data
+            if 'role' in data and data['role'].lower() == 'officer':
+                if 'specialization' in data or 'department' in data:
+                    officer_update_fields = []
+                    officer_update_values = []
+                
+                    if 'specialization' in data:
+                        officer_update_fields.append("specialization = %s")
+                        officer_update_values.append(data['specialization'])
+                    if 'department' in data:
+                        officer_update_fields.append("department = %s")
+                        officer_update_values.append(data['department'])
+                
+                    if officer_update_fields:
+                        officer_update_values.append(user_id)
+                        cursor.execute(f"""
+                            UPDATE officers 
+                            SET {', '.join(officer_update_fields)}
+                            WHERE user_id = %s
+                        """, officer_update_values)
+        
+            connection.commit()
+        
+            response_cache.invalidate('users')
+            refresh_caseloads([user_id])
+        
+            # Log the user update event
+            admin_name = session.get('email', 'Admin')
+            log_audit_event(admin_name, "User Updated", f"User ID {user_id} updated", "Success", request.remote_addr)
+        
+            return jsonify({'message': 'User updated successfully'}), 200
+        
+        except Exception as e:
+            print(f"Database error during user update: {e}")
+            connection.rollback()
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+@bp.route('/admin/users/<int:user_id>', methods=['DELETE'])
+def delete_user(user_id):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Don't allow admin to delete themselves
+    if user_id == session.get('user_id'):
+        return jsonify({'error': 'Cannot delete your own account'}), 400
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            # Get user info before deletion for audit log
+            cursor.execute("SELECT name, email FROM users WHERE id = %s", (user_id,))
+            user_info = cursor.fetchone()
+        
+            if not user_info:
+                return jsonify({'error': 'User not found'}), 404
+        
+            # Soft delete by setting is_active to FALSE
+            cursor.execute("UPDATE users SET is_active = FALSE WHERE id = %s", (user_id,))
+        
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'User not found'}), 404
+        
+            connection.commit()
+            response_cache.invalidate('users')
+            forget_officer(user_id)
+        
+            # Log the user deletion event
+            admin_name = session.get('email', 'Admin')
+            log_audit_event(admin_name, "User Deleted", f"User {user_info[0]} ({user_info[1]}) deleted", "Success", request.remote_addr)
+        
+            return jsonify({'message': 'User deleted successfully'}), 200
+        
+        except Exception as e:
+            print(f"Database error during user deletion: {e}")
+            connection.rollback()
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+@bp.route('/admin/users/stats', methods=['GET'])
+def get_user_stats():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            # Get total users count
+            cursor.execute("SELECT COUNT(*) FROM users WHERE is_active = TRUE")
+            total_users = cursor.fetchone()[0]
+        
+            # Get counts by role
+            cursor.execute("SELECT role, COUNT(*) FROM users WHERE is_active = TRUE GROUP BY role")
+            role_counts = cursor.fetchall()
+        
+            victims = 0
+            officers = 0
+            admins = 0
+        
+            for role, count in role_counts:
+                if role == 'victim':
+                    victims = count
+                elif role == 'officer':
+                    officers = count
+                elif role == 'admin':
+                    admins = count
+        
+            return jsonify({
+                'total': total_users,
+                'victims': victims,
+                'officers': officers,
+                'admins': admins
+            }), 200
+        
+        except Exception as e:
+            print(f"Database error in get_user_stats: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+def audit_log_filters(args):
+    """
+    WHERE conditions and params for the audit log filters in `args`: user_id,
+    action, status, from and to (`to` exclusive).  Without `from`, only the
+    last AUDIT_RECENT_DAYS days (or ?days=N) are read, so MySQL prunes to the
+    recent partitions.  Raises ValueError for malformed dates.
+    """
+    conditions = []
+    params = []
+    if args.get('from'):
+        conditions.append("al.timestamp >= %s")
+        params.append(datetime.fromisoformat(args['from']))
+    else:
+        conditions.append("al.timestamp >= NOW() - INTERVAL %s DAY")
+        params.append(args.get('days', current_app.config['AUDIT_RECENT_DAYS'], type=int))
+    if args.get('to'):
+        conditions.append("al.timestamp < %s")
+        params.append(datetime.fromisoformat(args['to']))
+    for column in ('action', 'status'):
+        if args.get(column):
+            conditions.append(f"al.{column} = %s")
+            params.append(args[column])
+    if args.get('user_id', type=int):
+        conditions.append("al.user_id = %s")
+        params.append(args.get('user_id', type=int))
+    return conditions, params
+
+@bp.route('/admin/audit_logs', methods=['GET'])
+def get_audit_logs():
+    """
+    Audit log entries, newest first, paginated with a cursor on (timestamp, id).
+    Filters as in audit_log_filters().
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    limit, position, include_total = parse_page_args(request.args, default_limit=100)
+    try:
+        conditions, params = audit_log_filters(request.args)
+    except ValueError:
+        return jsonify({'error': 'from and to must be dates (YYYY-MM-DD) or datetimes'}), 400
+    after, after_params = keyset_condition('al.timestamp', 'al.id', position)
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            cursor.execute(f"""
+                SELECT al.id, al.action, al.details, al.status, al.ip_address, al.timestamp, al.user_id,
+                       COALESCE(al.actor_name, 'Unknown User') as user, 
+                       al.actor_email as user_email, 
+                       COALESCE(al.actor_role, 'Unknown Role') as role
+                FROM audit_logs al
+                WHERE {' AND '.join(conditions + ([after] if after else []))}
+                ORDER BY al.timestamp DESC, al.id DESC
+                LIMIT %s
+            """, params + after_params + [limit + 1])
+        
+            audit_logs, page = page_response(fetch_dicts(cursor), limit, 'timestamp')
+            
+            if include_total:
+                cursor.execute(f"SELECT COUNT(*) FROM audit_logs al WHERE {' AND '.join(conditions)}", params)
+                page['total'] = cursor.fetchone()[0]
+        
+            return jsonify({'logs': audit_logs, 'page': page}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_audit_logs: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/audit_logs/stats', methods=['GET'])
+def get_audit_log_stats():
+    """Counts per action per hour (or ?bucket=day) over the filtered audit logs"""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    bucket_format = {'hour': '%Y-%m-%d %H:00', 'day': '%Y-%m-%d'}.get(request.args.get('bucket', 'hour'))
+    if not bucket_format:
+        return jsonify({'error': 'bucket must be hour or day'}), 400
+    try:
+        conditions, params = audit_log_filters(request.args)
+    except ValueError:
+        return jsonify({'error': 'from and to must be dates (YYYY-MM-DD) or datetimes'}), 400
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            cursor.execute(f"""
+                SELECT DATE_FORMAT(al.timestamp, %s) as bucket, al.action, COUNT(*) as count
+                FROM audit_logs al
+                WHERE {' AND '.join(conditions)}
+                GROUP BY bucket, al.action
+                ORDER BY bucket, al.action
+            """, [bucket_format] + params)
+        
+            return jsonify({'stats': fetch_dicts(cursor)}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_audit_log_stats: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/admin/audit_logs/reset', methods=['DELETE'])
+def reset_audit_logs():
+    """
+    Empty audit_logs by truncating its partitions, archiving each one to the
+    archive folder first unless ?archive=0.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    archive = request.args.get('archive', '1') not in ('0', 'false')
+    
+    # Write out queued events first so they are cleared too
+    get_audit_writer().flush()
+    
+    connection = get_db_connection('audit_reset')
+    if not connection:
+        raise DatabaseUnavailable()
+    try:
+        archived = truncate_all(connection, current_app.config['AUDIT_ARCHIVE_FOLDER'] if archive else None)
+    except Exception as e:
+        print(f"Database error in reset_audit_logs: {e}")
+        return jsonify({"error": "Database error"}), 500
+    finally:
+        connection.close()
+    
+    # Log the reset event
+    admin_name = session.get('email', 'Admin')
+    log_audit_event(admin_name, "Audit Log Reset",
+                    f"All audit logs have been cleared ({sum(rows for _, rows, _ in archived)} rows archived)",
+                    "Success", request.remote_addr)
+    
+    return jsonify({
+        'message': 'Audit logs reset successfully',
+        'archived': [{'partition': name, 'rows': rows, 'file': os.path.basename(path)}
+                     for name, rows, path in archived]
+    }), 200
+
+@bp.route('/admin/audit_logs/partitions', methods=['GET'])
+def get_audit_log_partitions():
+    """Partitions of audit_logs with estimated row counts, and the archive files"""
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with db_cursor(label='audit_partitions') as (connection, cursor):
+        partitions = list_partitions(cursor)
+    
+    return jsonify({
+        'partitions': [{'name': name, 'less_than': bound, 'estimated_rows': rows}
+                       for name, bound, rows in partitions],
+        'archives': [{'file': filename, 'month': month, 'bytes': size}
+                     for filename, month, size in list_archives(current_app.config['AUDIT_ARCHIVE_FOLDER'])],
+        'retention_months': current_app.config['AUDIT_RETENTION_MONTHS']
+    }), 200
+
+@bp.route('/admin/audit_logs/archive', methods=['GET'])
+def query_audit_log_archive():
+    """
+    Archived audit rows between ?from and ?to (dates; `to` exclusive),
+    optionally filtered by action, status and user_id.  At most ?limit rows
+    (default 100, max 1000), oldest first.
+    """
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        start = datetime.fromisoformat(request.args['from'])
+        end = datetime.fromisoformat(request.args['to'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'from and to are required (YYYY-MM-DD)'}), 400
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    
+    rows = query_archives(current_app.config['AUDIT_ARCHIVE_FOLDER'], start, end,
+                          action=request.args.get('action'), status=request.args.get('status'),
+                          user_id=request.args.get('user_id', type=int))
+    logs = list(itertools.islice(rows, limit + 1))
+    rows.close()
+    return jsonify({'logs': logs[:limit], 'has_more': len(logs) > limit}), 200
+
+@bp.route('/admin/db_pool', methods=['GET'])
+def get_db_pool_metrics():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    pool = get_db_pool()
+    return jsonify({'pool': pool.metrics(), 'leaks': pool.find_leaks()}), 200
+
+@bp.route('/admin/cache', methods=['GET', 'DELETE'])
+def admin_response_cache():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    if request.method == 'DELETE':
+        response_cache.clear()
+    return jsonify({'cache': response_cache.stats()}), 200
+
+@bp.route('/admin/slow_queries', methods=['GET'])
+def get_slow_queries():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    return jsonify({
+        'threshold_ms': profiler.slow_query_threshold * 1000,
+        'queries': profiler.slow_queries()
+    }), 200
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return profiler.render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
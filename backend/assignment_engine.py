@@ -0,0 +1,229 @@
+"""
+Workload-aware automatic officer assignment.
+
+AssignmentEngine keeps every active officer in min-heaps keyed by caseload
+(Open + Under Investigation reports): one heap per specialization and one
+over all officers.  Picking the least-loaded officer whose specialization
+matches a report's crime type is then O(log n), instead of a scan of
+officer_performance_view.  Caseloads are read from the officer rows of
+dashboard_counters (migration 0005), so a full load is one query and
+refreshing one officer after a status change is a primary-key lookup.
+
+The heaps use lazy deletion: a load change pushes a fresh entry and leaves
+the old one behind, to be discarded when it reaches the top, and a heap is
+rebuilt once stale entries outnumber live ones.
+
+Each process has its own engine.  Reservations made by other processes are
+only seen after the next reload, so callers reload it periodically.
+"""
+
+import heapq
+import threading
+import time
+
+# Specializations (as offered at officer registration) suited to each crime
+# type.  A specialization named like the crime type also matches; other crime
+# types go to the least-loaded officer overall.
+CRIME_SPECIALIZATIONS = {
+    'hacking': ('Network Security', 'Malware Analysis', 'Cyber Forensics'),
+    'phishing': ('Network Security', 'Digital Evidence'),
+    'scam': ('Cyber Forensics', 'Digital Evidence'),
+    'cyberbullying': ('Digital Evidence', 'Cyber Forensics'),
+}
+
+ANY = None
+GENERAL = ('other', 'general')
+
+CASELOAD_QUERY = """
+    SELECT u.id, o.specialization, u.is_active,
+           COALESCE(c.open_reports + c.investigating_reports, 0)
+    FROM users u
+    JOIN officers o ON o.user_id = u.id
+    LEFT JOIN dashboard_counters c ON c.scope = 'officer' AND c.owner_id = u.id
+    WHERE u.role = 'officer'
+"""
+
+
+def _key(name):
+    return (name or '').strip().lower() or 'general'
+
+
+class AssignmentEngine:
+    """Least-loaded officer per specialization, with O(log n) choice"""
+
+    def __init__(self, max_caseload=None, specializations=None):
+        self.max_caseload = max_caseload
+        self.specializations = {
+            _key(crime): tuple(_key(s) for s in names)
+            for crime, names in (specializations or CRIME_SPECIALIZATIONS).items()
+        }
+        # officer_id -> [load, specialization key, version]
+        self._officers = {}
+        # specialization key (or ANY) -> [(load, officer_id, version), ...]
+        self._heaps = {ANY: []}
+        self._lock = threading.Lock()
+        self.loaded_at = None
+        self.reservations = 0
+        self.no_candidate = 0
+        self.rebuilds = 0
+
+    def load(self, cursor):
+        """Replace the whole state with current caseloads; returns the officer count"""
+        cursor.execute(CASELOAD_QUERY + " AND u.is_active = TRUE")
+        return self.load_rows(cursor.fetchall())
+
+    def load_rows(self, rows):
+        """Replace the state from (officer_id, specialization, is_active, caseload) rows"""
+        officers = {}
+        for row in rows:
+            officer_id, specialization, active, caseload = _caseload_row(row)
+            if active:
+                officers[officer_id] = [caseload, _key(specialization), 0]
+        with self._lock:
+            self._officers = officers
+            self._rebuild()
+            self.loaded_at = time.monotonic()
+        return len(officers)
+
+    def refresh_officers(self, cursor, officer_ids):
+        """Re-read the caseload, specialization and active flag of a few officers"""
+        officer_ids = [int(i) for i in set(officer_ids) if i]
+        if not officer_ids:
+            return
+        cursor.execute(CASELOAD_QUERY + f" AND u.id IN ({', '.join(['%s'] * len(officer_ids))})",
+                       officer_ids)
+        found = set()
+        for row in cursor.fetchall():
+            officer_id, specialization, active, caseload = _caseload_row(row)
+            found.add(officer_id)
+            if active:
+                self.update(officer_id, caseload, specialization)
+            else:
+                self.remove(officer_id)
+        for officer_id in set(officer_ids) - found:
+            self.remove(officer_id)
+
+    def age(self):
+        """Seconds since the last full load (None if never loaded)"""
+        return None if self.loaded_at is None else time.monotonic() - self.loaded_at
+
+    def update(self, officer_id, caseload, specialization):
+        with self._lock:
+            state = self._officers.get(officer_id)
+            if state is None:
+                state = self._officers[officer_id] = [caseload, _key(specialization), 0]
+            else:
+                state[0] = caseload
+                state[1] = _key(specialization)
+                state[2] += 1
+            self._push(officer_id, state)
+
+    def remove(self, officer_id):
+        with self._lock:
+            self._officers.pop(officer_id, None)
+
+    def choose(self, crime_type):
+        """The officer a report of `crime_type` would go to, without reserving it"""
+        with self._lock:
+            best = self._best(crime_type)
+            return best[1] if best else None
+
+    def reserve(self, crime_type):
+        """
+        Pick the least-loaded matching officer and count the report against
+        them.  Returns the officer id, or None if there is no officer below
+        max_caseload.  Call release() if the assignment is not committed.
+        """
+        with self._lock:
+            best = self._best(crime_type)
+            if best is None:
+                self.no_candidate += 1
+                return None
+            officer_id = best[1]
+            state = self._officers[officer_id]
+            state[0] += 1
+            state[2] += 1
+            self._push(officer_id, state)
+            self.reservations += 1
+            return officer_id
+
+    def release(self, officer_id):
+        """Undo a reservation (or record that a case left an officer's caseload)"""
+        with self._lock:
+            state = self._officers.get(officer_id)
+            if state is not None and state[0] > 0:
+                state[0] -= 1
+                state[2] += 1
+                self._push(officer_id, state)
+
+    def caseload(self, officer_id):
+        with self._lock:
+            state = self._officers.get(officer_id)
+            return state[0] if state else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'officers': len(self._officers),
+                'heap_entries': sum(len(heap) for heap in self._heaps.values()),
+                'reservations': self.reservations,
+                'no_candidate': self.no_candidate,
+                'rebuilds': self.rebuilds,
+            }
+
+    # -- internals (caller holds the lock) --
+
+    def _candidate_keys(self, crime_type):
+        crime = _key(crime_type)
+        keys = self.specializations.get(crime, ())
+        if crime in self._heaps and crime not in keys and crime not in GENERAL:
+            keys = keys + (crime,)
+        return keys
+
+    def _best(self, crime_type):
+        best = None
+        for key in self._candidate_keys(crime_type):
+            top = self._top(key)
+            if top is not None and (best is None or top[:2] < best[:2]):
+                best = top
+        if best is None:
+            best = self._top(ANY)
+        if best is None or (self.max_caseload is not None and best[0] >= self.max_caseload):
+            return None
+        return best
+
+    def _top(self, key):
+        """Smallest live entry of a heap, discarding stale ones on the way"""
+        heap = self._heaps.get(key)
+        while heap:
+            load, officer_id, version = heap[0]
+            state = self._officers.get(officer_id)
+            if state is not None and state[2] == version and (key is ANY or state[1] == key):
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _push(self, officer_id, state):
+        entry = (state[0], officer_id, state[2])
+        heapq.heappush(self._heaps.setdefault(state[1], []), entry)
+        heapq.heappush(self._heaps[ANY], entry)
+        if len(self._heaps[ANY]) > 2 * len(self._officers) + 64:
+            self._rebuild()
+
+    def _rebuild(self):
+        heaps = {ANY: []}
+        for officer_id, (load, key, version) in self._officers.items():
+            entry = (load, officer_id, version)
+            heaps.setdefault(key, []).append(entry)
+            heaps[ANY].append(entry)
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        self._heaps = heaps
+        self.rebuilds += 1
+
+
+def _caseload_row(row):
+    if isinstance(row, dict):
+        row = tuple(row.values())
+    officer_id, specialization, active, caseload = row
+    return int(officer_id), specialization, bool(active), int(caseload or 0)
@@ -0,0 +1,857 @@
+#!/usr/bin/env python3
+"""
+Async serving mode for the CyberCrime Reporting System backend.
+
+The regular server (the Flask app from app.py) runs every request on its own thread with a
+blocking mysql.connector connection, so an SSE stream or a slow upload
+occupies a thread for as long as it lasts.  This module serves the
+long-lived and high-traffic routes from async handlers on one event loop
+instead:
+
+    POST /victim/report, /victim/report/<id>/evidence
+    GET  /victim/reports, /victim/report/<id>
+    GET  /officer/case/<id>, /officer/case/<id>/logs, /officer/case/<id>/evidence,
+         /officer/all_evidence, /officer/assigned_cases
+    GET  /admin/all_reports, /admin/users
+    GET  /notifications/stream
+
+They use Quart (Flask's API on asyncio) and their own aiomysql pool.
+Every other route, and CORS preflights, are passed to the unchanged Flask
+app, which runs in a thread pool, so the async server exposes the whole
+API.  Both apps sign session cookies with the same key and serializer, so
+a login on either one is valid on the other.
+
+Responses match the sync routes.  Uploads are still spooled to disk and
+hashed while the body is parsed.  Token-bucket limits apply as on the sync routes;
+the concurrency caps become asyncio semaphores, since a waiting request no
+longer holds a thread.  The response cache is not used for these reads.
+
+Needs the optional packages quart, aiomysql and hypercorn
+(pip install -r requirements-async.txt):
+
+    hypercorn async_app:asgi_app --bind 0.0.0.0:5000
+    python async_app.py              (the same, on port 5000)
+
+The sync path is still `python serve.py` (or any WSGI server on wsgi:app).
+"""
+
+import asyncio
+import itertools
+import math
+import queue
+import sys
+import threading
+from contextlib import asynccontextmanager
+from functools import wraps
+
+import aiomysql
+from quart import Quart, Request, jsonify, make_response, request, session
+from quart.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.utils import secure_filename
+from werkzeug.wsgi import ClosingIterator
+from hypercorn.middleware import AsyncioWSGIMiddleware
+
+from app import create_app
+from extensions import DatabaseUnavailable
+from evidence_routes import public_evidence
+from officer_routes import assigned_cases_query
+from notifications import (ASSIGNED, NEW_EVIDENCE, HEARTBEAT_INTERVAL, FETCH_SINCE_QUERY, RESUME_LIMIT, SentIds,
+                           fetch_since_args, notification_insert, inserted_notifications, format_notification,
+                           sse_event)
+from pagination import InvalidCursor, parse_page_args, keyset_condition, page_response
+from schema_check import SchemaOutOfDate
+from serialization import encode_value, dumps
+from uploads import new_spool, store_upload
+
+sync_app = create_app()
+resources = sync_app.extensions['resources']
+profiler = sync_app.extensions['profiler']
+rate_limiter = sync_app.extensions['rate_limiter']
+response_cache = sync_app.extensions['response_cache']
+notification_hub = sync_app.extensions['notification_hub']
+
+
+class AsyncJSONProvider(DefaultJSONProvider):
+    """Quart JSON provider with the same output as serialization.AppJSONProvider"""
+
+    default = staticmethod(encode_value)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=self.sort_keys, fast=sync_app.config['JSON_FAST_ENCODER'])
+
+
+class AsyncUploadRequest(Request):
+    """
+    Request class that spools file parts through HashingSpoolFile, like
+    UploadRequest.  Quart does not close request files afterwards, so the
+    spools are kept for close_spools() to remove whatever was not stored.
+    """
+
+    spools = ()
+
+    def make_form_data_parser(self):
+        return self.form_data_parser_class(
+            stream_factory=self.spool,
+            charset=self.charset,
+            errors=self.encoding_errors,
+            max_content_length=self.max_content_length,
+            cls=self.parameter_storage_class,
+        )
+
+    def spool(self, *args):
+        spool = new_spool(sync_app.config)
+        self.spools = [*self.spools, spool]
+        return spool
+
+
+app = Quart(__name__)
+app.request_class = AsyncUploadRequest
+app.json = AsyncJSONProvider(app)
+app.secret_key = sync_app.secret_key
+app.config['MAX_CONTENT_LENGTH'] = sync_app.config['MAX_CONTENT_LENGTH']
+app.config['BODY_TIMEOUT'] = sync_app.config['ASYNC_BODY_TIMEOUT']
+
+# aiomysql pool, opened when the server starts
+db_pool = None
+
+
+@app.before_serving
+async def open_pool():
+    global db_pool
+    db_pool = await aiomysql.create_pool(
+        host=sync_app.config['MYSQL_HOST'],
+        user=sync_app.config['MYSQL_USER'],
+        password=sync_app.config['MYSQL_PASSWORD'],
+        db=sync_app.config['MYSQL_DB'],
+        minsize=sync_app.config['ASYNC_DB_POOL_MIN'],
+        maxsize=sync_app.config['ASYNC_DB_POOL_MAX'],
+        pool_recycle=sync_app.config['DB_POOL_RECYCLE'],
+        # Reads run outside transactions; writes BEGIN explicitly (aiomysql
+        # closes connections returned mid-transaction)
+        autocommit=True,
+    )
+    profiler.register_gauges('async_db_pool', 'Async connection pool counters', pool_stats)
+
+
+@app.after_serving
+async def close_pool():
+    if db_pool is not None:
+        db_pool.close()
+        await db_pool.wait_closed()
+
+
+def pool_stats():
+    return {'size': db_pool.size, 'free': db_pool.freesize, 'max_size': db_pool.maxsize}
+
+
+@asynccontextmanager
+async def db_cursor(dictionary=True):
+    """Borrow a connection and cursor from the async pool for a with-block"""
+    try:
+        connection = await db_pool.acquire()
+    except Exception as e:
+        print(f"Error connecting to MySQL Database: {e}")
+        raise DatabaseUnavailable()
+    try:
+        async with connection.cursor(aiomysql.DictCursor if dictionary else aiomysql.Cursor) as cursor:
+            yield connection, cursor
+    finally:
+        db_pool.release(connection)
+
+
+@app.before_request
+async def require_schema():
+    if resources.schema_capabilities is None:
+        await asyncio.to_thread(resources.schema)
+
+
+@app.teardown_request
+async def close_spools(exc):
+    for spool in request.spools:
+        spool.close()
+
+
+@app.after_request
+async def add_cors_headers(response):
+    # Same policy as CORS(app, supports_credentials=True) on the sync app
+    origin = request.headers.get('Origin')
+    if origin:
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.headers['Access-Control-Allow-Credentials'] = 'true'
+        response.vary.add('Origin')
+    return response
+
+
+@app.errorhandler(DatabaseUnavailable)
+async def handle_database_unavailable(e):
+    return jsonify({"error": "Database connection failed"}), 500
+
+
+@app.errorhandler(SchemaOutOfDate)
+async def handle_schema_out_of_date(e):
+    return jsonify({"error": "Database schema is out of date", "details": str(e)}), 503
+
+
+@app.errorhandler(InvalidCursor)
+async def handle_invalid_cursor(e):
+    return jsonify({"error": str(e)}), 400
+
+
+# -- shared with the sync app --
+
+concurrency_slots = {route_class: asyncio.Semaphore(rule['concurrency'])
+                     for route_class, rule in sync_app.config['RATE_LIMITS'].items() if rule.get('concurrency')}
+
+
+def limited(route_class):
+    """rate_limit.limit() for async views"""
+    limiter = rate_limiter
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            if not limiter.enabled:
+                return await view(*args, **kwargs)
+            key = (route_class, request.remote_addr, session.get('user_id'))
+            # The shared store is a blocking Redis call
+            if limiter.shared is not None:
+                wait = await asyncio.to_thread(limiter.check, *key)
+            else:
+                wait = limiter.check(*key)
+            if wait:
+                return jsonify({"error": "Too many requests, please slow down"}), 429, \
+                    {'Retry-After': str(max(1, math.ceil(wait)))}
+            slots = concurrency_slots.get(route_class)
+            if slots is None:
+                return await view(*args, **kwargs)
+            try:
+                await asyncio.wait_for(slots.acquire(), limiter.queue_timeout)
+            except asyncio.TimeoutError:
+                limiter.count(route_class, 'rejected_busy')
+                return jsonify({"error": "Server busy, please try again"}), 503, \
+                    {'Retry-After': str(max(1, math.ceil(limiter.queue_timeout)))}
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                slots.release()
+        return wrapper
+    return decorator
+
+
+def log_audit_event(user, action, details, status="Success"):
+    """Queue an audit event for the sync app's background writer"""
+    resources.audit_writer().submit(action, details, status, request.remote_addr,
+                                    user_id=session.get('user_id'), email=session.get('email'),
+                                    actor_name=user, actor_role=session.get('role'))
+
+
+async def invalidate(*tags):
+    cache = response_cache
+    if cache.shared is not None:
+        await asyncio.to_thread(cache.invalidate, *tags)
+    else:
+        cache.invalidate(*tags)
+
+
+async def create_notifications(cursor, items):
+    insert = notification_insert(items)
+    if insert is None:
+        return []
+    sql, params, items = insert
+    await cursor.execute(sql, params)
+    return inserted_notifications(cursor.lastrowid, items)
+
+
+async def report_parties(cursor, report_id):
+    await cursor.execute("SELECT victim_id, assigned_officer_id FROM reports WHERE id = %s", (report_id,))
+    row = await cursor.fetchone()
+    return (row['victim_id'], row['assigned_officer_id']) if row else (None, None)
+
+
+async def store_files(files):
+    """
+    Move spooled uploads into the blob store (off the event loop); returns
+    [(file, size, sha256, blob path)].  Blobs of a transaction that is then
+    rolled back are unreferenced and removed by the blob GC.
+    """
+    blob_store = resources.blob_store()
+    stored = []
+    for file in files:
+        if file and file.filename:
+            stored.append((file, *await asyncio.to_thread(store_upload, file, blob_store)))
+    return stored
+
+
+async def insert_evidence(cursor, report_id, stored, uploaded_by, description):
+    saved = []
+    for file, file_size, sha256, blob_path in stored:
+        # The digest prefix keeps same-named uploads from colliding
+        unique_filename = f"{report_id}_{sha256[:12]}_{secure_filename(file.filename)}"
+        saved.append({
+            "filename": unique_filename,
+            "original_name": file.filename,
+            "content_type": file.content_type,
+            "file_size": file_size,
+            "sha256": sha256
+        })
+        await cursor.execute("""
+            INSERT INTO evidence (report_id, filename, original_name, file_path, file_size, content_type, sha256, uploaded_by, description)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (report_id, unique_filename, file.filename, blob_path, file_size, file.content_type, sha256, uploaded_by, description))
+    return saved
+
+
+EVIDENCE_QUERY = """
+    SELECT id, filename, original_name, content_type, file_size, description, upload_date
+    FROM evidence
+    WHERE report_id = %s
+    ORDER BY upload_date DESC
+"""
+
+
+# -- victim --
+
+@app.route('/victim/report', methods=['POST'])
+@limited('upload')
+async def report_crime():
+    if 'user_id' not in session or session.get('role') != 'victim':
+        return jsonify({"error": "Unauthorized"}), 401
+
+    victim_id = session['user_id']
+    form = await request.form
+    crime_type = form.get('crime_type')
+    description = form.get('description')
+    date_occurred = form.get('date')
+    location = form.get('location')
+    files = (await request.files).getlist('files')
+
+    if not all([crime_type, description, date_occurred, location]):
+        return jsonify({"error": "All fields are required"}), 400
+
+    stored = await store_files(files)
+    assigned_officer_id = None
+    created = []
+    async with db_cursor() as (connection, cursor):
+        try:
+            await connection.begin()
+            await cursor.execute("""
+                INSERT INTO reports (victim_id, crime_type, description, date_occurred, location, status, priority)
+                VALUES (%s, %s, %s, %s, %s, 'Open', 'Medium')
+            """, (victim_id, crime_type, description, date_occurred, location))
+            report_id = cursor.lastrowid
+
+            evidence_files = await insert_evidence(cursor, report_id, stored, victim_id, "Evidence uploaded with report")
+
+            if sync_app.config['AUTO_ASSIGN_ON_SUBMIT']:
+                assigned_officer_id = resources.assignment_engine().reserve(crime_type)
+                if assigned_officer_id:
+                    await cursor.execute("""
+                        UPDATE reports
+                        SET assigned_officer_id = %s, assignment_date = NOW(),
+                            assignment_note = 'Assigned automatically by caseload', status = 'Under Investigation'
+                        WHERE id = %s
+                    """, (assigned_officer_id, report_id))
+                    created = await create_notifications(cursor, [
+                        (assigned_officer_id, report_id, ASSIGNED, f"You have been assigned to report #{report_id}"),
+                    ])
+
+            await connection.commit()
+            print(f"Report submitted successfully: ID {report_id}")
+
+        except Exception as e:
+            print(f"Database error in report submission: {e}")
+            await connection.rollback()
+            if assigned_officer_id:
+                resources.assignment_engine().release(assigned_officer_id)
+            return jsonify({"error": "Database error"}), 500
+
+    await invalidate('reports')
+    victim_name = session.get('email', 'Unknown')
+    log_audit_event(victim_name, "Report Submitted", f"Crime report #{report_id} submitted")
+    if assigned_officer_id:
+        notification_hub.publish(created)
+        log_audit_event(victim_name, "Officer Auto-Assigned",
+                        f"Officer #{assigned_officer_id} assigned to report #{report_id}")
+
+    return jsonify({
+        'message': 'Report submitted successfully',
+        'report_id': report_id,
+        'assigned_officer_id': assigned_officer_id,
+        'evidence_count': len(evidence_files),
+        'evidence': [public_evidence(ev) for ev in evidence_files]
+    }), 200
+
+
+@app.route('/victim/report/<int:report_id>/evidence', methods=['POST'])
+@limited('upload')
+async def add_report_evidence(report_id):
+    if 'user_id' not in session or session.get('role') != 'victim':
+        return jsonify({"error": "Unauthorized"}), 401
+
+    user_id = session['user_id']
+    files = (await request.files).getlist('files')
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            await cursor.execute("SELECT id FROM reports WHERE id = %s AND victim_id = %s", (report_id, user_id))
+            if not await cursor.fetchone():
+                return jsonify({"error": "Report not found"}), 404
+
+            stored = await store_files(files)
+            await connection.begin()
+            evidence_files = await insert_evidence(cursor, report_id, stored, user_id, "Additional evidence uploaded")
+            _, officer_id = await report_parties(cursor, report_id)
+            created = await create_notifications(cursor, [
+                (officer_id, report_id, NEW_EVIDENCE,
+                 f"{len(evidence_files)} new evidence file(s) on report #{report_id}")
+            ]) if evidence_files else []
+            await connection.commit()
+
+            await cursor.execute(EVIDENCE_QUERY, (report_id,))
+            updated_evidence = await cursor.fetchall()
+
+        except Exception as e:
+            print(f"Database error in add evidence: {e}")
+            await connection.rollback()
+            return jsonify({"error": "Database error"}), 500
+
+    # New evidence can also move the report from Open to Under Investigation
+    await invalidate(f'report:{report_id}', 'reports')
+    notification_hub.publish(created)
+    return jsonify({
+        'message': 'Evidence added successfully',
+        'evidence': updated_evidence
+    }), 200
+
+
+@app.route('/victim/reports', methods=['GET'])
+async def get_victim_reports():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            await cursor.execute("""
+                SELECT r.*, u.name as victim_name, o.name as assigned_officer_name,
+                       (SELECT COUNT(*) FROM evidence e WHERE e.report_id = r.id) as evidence_count
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                LEFT JOIN users o ON r.assigned_officer_id = o.id
+                WHERE r.victim_id = %s
+                ORDER BY r.date_submitted DESC
+            """, (user_id,))
+            return jsonify({"reports": await cursor.fetchall()}), 200
+
+        except Exception as e:
+            print(f"Database error in get_victim_reports: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+@app.route('/victim/report/<int:report_id>', methods=['GET'])
+async def get_victim_report_details(report_id):
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            await cursor.execute("""
+                SELECT r.*, u.name as victim_name,
+                       o.name as assigned_officer_name, o.email as assigned_officer_email,
+                       off.badge_number, off.specialization
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                LEFT JOIN users o ON r.assigned_officer_id = o.id
+                LEFT JOIN officers off ON o.id = off.user_id
+                WHERE r.id = %s AND r.victim_id = %s
+            """, (report_id, user_id))
+            report = await cursor.fetchone()
+            if not report:
+                return jsonify({"error": "Report not found"}), 404
+
+            await cursor.execute(EVIDENCE_QUERY, (report_id,))
+            report['evidence'] = await cursor.fetchall()
+            return jsonify({"report": report}), 200
+
+        except Exception as e:
+            print(f"Database error in get_victim_report_details: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+# -- officer --
+
+async def assigned_case(cursor, case_id):
+    await cursor.execute("SELECT id FROM reports WHERE id = %s AND assigned_officer_id = %s",
+                         (case_id, session.get('user_id')))
+    return await cursor.fetchone()
+
+
+@app.route('/officer/case/<int:case_id>', methods=['GET'])
+async def get_case_details(case_id):
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            await cursor.execute("""
+                SELECT r.id, r.crime_type, r.description, r.date_occurred, r.date_submitted, r.location, r.status, r.priority,
+                       u.name as victim_name, u.phone as victim_phone
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                WHERE r.id = %s AND r.assigned_officer_id = %s
+            """, (case_id, session.get('user_id')))
+            case = await cursor.fetchone()
+            if not case:
+                return jsonify({'error': 'Case not found'}), 404
+            return jsonify({'case': case}), 200
+
+        except Exception as e:
+            print(f"Database error in get_case_details: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+@app.route('/officer/case/<int:case_id>/logs', methods=['GET'])
+async def get_case_logs(case_id):
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            if not await assigned_case(cursor, case_id):
+                return jsonify({'error': 'Case not found or not assigned to you'}), 404
+
+            await cursor.execute("""
+                SELECT cl.*, DATE(cl.log_date) as date, u.name as officer_name, u.email as officer_email
+                FROM case_logs cl
+                LEFT JOIN users u ON cl.officer_id = u.id
+                WHERE cl.report_id = %s
+                ORDER BY cl.log_date DESC
+            """, (case_id,))
+            return jsonify({'logs': await cursor.fetchall()}), 200
+
+        except Exception as e:
+            print(f"Database error in get_case_logs: {e}")
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+
+@app.route('/officer/case/<int:case_id>/evidence', methods=['GET'])
+async def officer_case_evidence(case_id):
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            if not await assigned_case(cursor, case_id):
+                return jsonify({'error': 'Case not found or not assigned to you'}), 404
+
+            await cursor.execute(EVIDENCE_QUERY, (case_id,))
+            return jsonify({'evidence': await cursor.fetchall()}), 200
+
+        except Exception as e:
+            print(f"Database error in officer_case_evidence: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+@app.route('/officer/all_evidence', methods=['GET'])
+async def officer_all_evidence():
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    officer_id = session.get('user_id')
+    limit, position, include_total = parse_page_args(request.args)
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            after, after_params = keyset_condition('e.upload_date', 'e.id', position)
+            await cursor.execute(f"""
+                SELECT e.id, e.report_id as case_id, e.filename, e.original_name, e.content_type, e.file_size, e.upload_date,
+                       r.crime_type, r.status, u.name as victim_name
+                FROM evidence e
+                JOIN reports r ON e.report_id = r.id
+                JOIN users u ON r.victim_id = u.id
+                WHERE r.assigned_officer_id = %s {'AND ' + after if after else ''}
+                ORDER BY e.upload_date DESC, e.id DESC
+                LIMIT %s
+            """, [officer_id] + after_params + [limit + 1])
+            evidence_list, page = page_response(list(await cursor.fetchall()), limit, 'upload_date')
+
+            if include_total:
+                await cursor.execute("""
+                    SELECT COUNT(*) as total FROM evidence e
+                    JOIN reports r ON e.report_id = r.id
+                    WHERE r.assigned_officer_id = %s
+                """, (officer_id,))
+                page['total'] = (await cursor.fetchone())['total']
+
+            return jsonify({'evidence': evidence_list, 'page': page}), 200
+
+        except Exception as e:
+            print(f"Database error in officer_all_evidence: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+@app.route('/officer/assigned_cases', methods=['GET'])
+async def officer_assigned_cases():
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            await cursor.execute(*assigned_cases_query(session.get('user_id'), request.args))
+            return jsonify({'cases': await cursor.fetchall()}), 200
+
+        except Exception as e:
+            print(f"Database error in officer_assigned_cases: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+# -- admin --
+
+@app.route('/admin/all_reports', methods=['GET'])
+async def admin_all_reports():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    limit, position, include_total = parse_page_args(request.args)
+    # ?unassigned=1: only reports still waiting for an officer (the assignment page)
+    unassigned = request.args.get('unassigned', '').lower() in ('1', 'true', 'yes')
+    filters = ['r.assigned_officer_id IS NULL'] if unassigned else []
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            after, after_params = keyset_condition('r.date_submitted', 'r.id', position)
+            conditions = filters + ([after] if after else [])
+            await cursor.execute(f"""
+                SELECT r.id, r.crime_type, r.description, r.date_occurred, r.date_submitted, r.location, r.status, r.priority,
+                       u.name as victim_name, u.phone as victim_phone,
+                       o.name as assigned_officer_name
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                LEFT JOIN users o ON r.assigned_officer_id = o.id
+                {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+                ORDER BY r.date_submitted DESC, r.id DESC
+                LIMIT %s
+            """, after_params + [limit + 1])
+            reports, page = page_response(list(await cursor.fetchall()), limit, 'date_submitted')
+
+            if include_total:
+                await cursor.execute(f"""
+                    SELECT COUNT(*) as total FROM reports r
+                    {'WHERE ' + ' AND '.join(filters) if filters else ''}
+                """)
+                page['total'] = (await cursor.fetchone())['total']
+
+            return jsonify({'reports': reports, 'page': page}), 200
+
+        except Exception as e:
+            print(f"Database error in admin_all_reports: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+@app.route('/admin/users', methods=['GET'])
+async def get_all_users():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    limit, position, include_total = parse_page_args(request.args)
+
+    async with db_cursor() as (connection, cursor):
+        try:
+            after, after_params = keyset_condition('u.created_at', 'u.id', position)
+            await cursor.execute(f"""
+                SELECT u.id, u.name, u.email, u.phone, u.role, u.created_at,
+                       o.badge_number, o.department, o.specialization
+                FROM users u
+                LEFT JOIN officers o ON u.id = o.user_id
+                WHERE u.is_active = TRUE {'AND ' + after if after else ''}
+                ORDER BY u.created_at DESC, u.id DESC
+                LIMIT %s
+            """, after_params + [limit + 1])
+            users_list, page = page_response(list(await cursor.fetchall()), limit, 'created_at')
+
+            if include_total:
+                await cursor.execute("SELECT COUNT(*) as total FROM users WHERE is_active = TRUE")
+                page['total'] = (await cursor.fetchone())['total']
+
+            formatted_users = [{
+                'id': user['id'],
+                'name': user['name'],
+                'email': user['email'],
+                'phone': user.get('phone', 'N/A'),
+                'role': user['role'].title(),
+                'joinDate': user['created_at'].date() if user.get('created_at') else '2024-01-01',
+                'specialization': user.get('specialization', 'General'),
+                'department': user.get('department', 'Cyber Crime'),
+                'badge': user.get('badge_number', 'N/A')
+            } for user in users_list]
+            return jsonify({'users': formatted_users, 'page': page}), 200
+
+        except Exception as e:
+            print(f"Database error in get_all_users: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+
+# -- notifications --
+
+class AsyncSubscriber:
+    """
+    NotificationHub subscriber feeding an asyncio.Queue.  publish() may run
+    on any thread (sync routes run in the WSGI thread pool), so items are
+    handed to the loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, loop, maxsize):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._maxsize = maxsize
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put_nowait(self, item):
+        with self._lock:
+            # The end-of-stream marker always fits
+            if item is not None and self._size >= self._maxsize:
+                raise queue.Full
+            self._size += 1
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def get_nowait(self):
+        # Called by the hub to make room for the end-of-stream marker,
+        # which put_nowait() always accepts
+        raise queue.Empty
+
+    async def get(self, timeout):
+        item = await asyncio.wait_for(self._queue.get(), timeout)
+        with self._lock:
+            self._size -= 1
+        return item
+
+
+async def fetch_since(user_id, last_id, limit=RESUME_LIMIT):
+    async with db_cursor() as (connection, cursor):
+        await cursor.execute(FETCH_SINCE_QUERY, fetch_since_args(user_id, last_id, limit))
+        return [format_notification(row) for row in await cursor.fetchall()]
+
+
+@app.route('/notifications/stream', methods=['GET'])
+async def notifications_stream():
+    """
+    Server-Sent Events stream of the user's notifications, as in app.py; an
+    open stream costs a queue and a suspended coroutine, not a thread.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    user_id = session['user_id']
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    hub = notification_hub
+    # Subscribe before reading the backlog so nothing falls between the two
+    subscriber = hub.subscribe(user_id, AsyncSubscriber(asyncio.get_running_loop(), hub.queue_size))
+    try:
+        if last_event_id is None:
+            async with db_cursor() as (connection, cursor):
+                await cursor.execute("SELECT COALESCE(MAX(id), 0) AS last_id FROM notifications WHERE user_id = %s",
+                                     (user_id,))
+                last_event_id = (await cursor.fetchone())['last_id']
+            backlog = []
+        else:
+            backlog = await fetch_since(user_id, last_event_id)
+    except Exception:
+        hub.unsubscribe(user_id, subscriber)
+        raise
+    catch_up = sync_app.config['NOTIFICATIONS_CATCH_UP']
+
+    async def stream():
+        sent = SentIds(last_event_id)
+        try:
+            yield b"retry: 5000\n\n"
+            for notification in backlog:
+                if sent.add(notification['id']):
+                    yield sse_event(notification, sent.last_id).encode()
+            while True:
+                try:
+                    notification = await subscriber.get(HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    if catch_up:
+                        for missed in await fetch_since(user_id, sent.last_id):
+                            if sent.add(missed['id']):
+                                yield sse_event(missed, sent.last_id).encode()
+                    yield b": keepalive\n\n"
+                    continue
+                if notification is None:
+                    return
+                if sent.add(notification['id']):
+                    yield sse_event(notification, sent.last_id).encode()
+        finally:
+            hub.unsubscribe(user_id, subscriber)
+
+    response = await make_response(stream(), 200, {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    response.timeout = None
+    return response
+
+
+class AsyncServer:
+    """
+    ASGI entry point: requests for the routes above go to the Quart app,
+    everything else (and CORS preflights) to the Flask app in a thread pool.
+    """
+
+    def __init__(self, async_app, wsgi_app, max_body_size):
+        self.async_app = async_app
+        self.fallback = AsyncioWSGIMiddleware(self.leading_chunk(wsgi_app), max_body_size)
+        self.routes = async_app.url_map.bind('')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and not self.is_async_route(scope):
+            return await self.fallback(scope, receive, send)
+        return await self.async_app(scope, receive, send)
+
+    @staticmethod
+    def leading_chunk(wsgi_app):
+        # Hypercorn's WSGI bridge starts the response on its first body
+        # chunk, so an empty body (a preflight, a 204) would never start
+        def wrapped(environ, start_response):
+            body = wsgi_app(environ, start_response)
+            return ClosingIterator(itertools.chain([b''], body), getattr(body, 'close', None))
+        return wrapped
+
+    def is_async_route(self, scope):
+        if scope['method'] == 'OPTIONS':
+            return False
+        try:
+            self.routes.match(scope['path'], method=scope['method'])
+        except (NotFound, MethodNotAllowed):
+            return False
+        return True
+
+
+asgi_app = AsyncServer(app, sync_app, sync_app.config['MAX_CONTENT_LENGTH'])
+
+
+def main(argv):
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [argv[0] if argv else "0.0.0.0:5000"]
+    try:
+        resources.schema()
+    except SchemaOutOfDate as e:
+        print(f"Refusing to start: {e}")
+        return 1
+    asyncio.run(serve(asgi_app, config))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
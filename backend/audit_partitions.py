@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Partition maintenance, retention and archives for audit_logs.
+
+audit_logs is partitioned by month (migration 0008): pYYYYMM holds that
+month's rows and p_future catches anything beyond the last month.  This
+module
+
+  * keeps a few months of empty partitions ahead of time, split off
+    p_future (cheap while p_future is empty);
+  * applies the retention policy: partitions entirely older than
+    `retention_months` are written to a gzipped NDJSON file in the archive
+    folder (audit_logs-pYYYYMM-<unix time>.ndjson.gz) and then dropped,
+    which is a metadata operation instead of a DELETE of millions of rows;
+  * reads archived rows back for a time range.
+
+Usage:
+    python audit_partitions.py status
+    python audit_partitions.py maintain [--retention-months N] [--no-archive]
+    python audit_partitions.py query FROM TO     (dates, TO exclusive)
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import date, datetime
+
+from exports import EXPORTS, ndjson_chunks, gzip_chunks
+
+PARTITION_NAME = re.compile(r'^p(\d{4})(\d{2})$')
+ARCHIVE_FILE = re.compile(r'^audit_logs-p(\d{4})(\d{2})-\d+\.ndjson\.gz$')
+ARCHIVE_QUERY = EXPORTS['audit_logs']['query']
+
+
+def _month_start(day, offset=0):
+    month = day.year * 12 + day.month - 1 + offset
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def list_partitions(cursor):
+    """[(name, upper bound as unix time or None for MAXVALUE, estimated rows)] in order"""
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs'
+          AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    partitions = []
+    for name, bound, rows in cursor.fetchall():
+        bound = None if bound in (None, 'MAXVALUE') else int(bound)
+        partitions.append((name, bound, int(rows or 0)))
+    return partitions
+
+
+def ensure_future_partitions(cursor, months_ahead=3, today=None):
+    """Split monthly partitions off p_future up to `months_ahead` months from now"""
+    partitions = list_partitions(cursor)
+    if not partitions:
+        raise RuntimeError("audit_logs is not partitioned; apply migration 0008")
+    monthly = [PARTITION_NAME.match(name) for name, _, _ in partitions]
+    last = max((date(int(m.group(1)), int(m.group(2)), 1) for m in monthly if m), default=None)
+    today = today or date.today()
+    month = _month_start(last, 1) if last else _month_start(today)
+    target = _month_start(today, months_ahead)
+
+    new = []
+    while month <= target:
+        new.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN (UNIX_TIMESTAMP('{_month_start(month, 1)}'))")
+        month = _month_start(month, 1)
+    if new:
+        cursor.execute(f"""
+            ALTER TABLE audit_logs REORGANIZE PARTITION p_future INTO (
+                {', '.join(new)},
+                PARTITION p_future VALUES LESS THAN MAXVALUE
+            )
+        """)
+    return len(new)
+
+
+def expired_partitions(cursor, retention_months, today=None):
+    """Monthly partitions whose whole month is older than the retention window"""
+    cutoff = _month_start(today or date.today(), -retention_months)
+    expired = []
+    for name, _, rows in list_partitions(cursor):
+        m = PARTITION_NAME.match(name)
+        if m and date(int(m.group(1)), int(m.group(2)), 1) < cutoff:
+            expired.append((name, rows))
+    return expired
+
+
+def archive_partition(connection, name, archive_dir, batch_size=1000):
+    """
+    Write one partition's rows to a gzipped NDJSON file; returns (path, rows).
+    The file appears under its final name only once it is complete.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"audit_logs-{name}-{int(time.time())}.ndjson.gz")
+    temp_path = path + ".tmp"
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(ARCHIVE_QUERY.replace("FROM audit_logs al", f"FROM audit_logs PARTITION ({name}) al")
+                       + " ORDER BY al.id")
+        rows = 0
+
+        def counted(chunks):
+            nonlocal rows
+            for chunk in chunks:
+                rows += chunk.count(b'\n')
+                yield chunk
+
+        with open(temp_path, 'wb') as file:
+            for chunk in gzip_chunks(counted(ndjson_chunks(cursor, batch_size))):
+                file.write(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        cursor.close()
+    if rows:
+        os.replace(temp_path, path)
+        return path, rows
+    os.remove(temp_path)
+    return None, 0
+
+
+def drop_partitions(cursor, names):
+    if names:
+        cursor.execute(f"ALTER TABLE audit_logs DROP PARTITION {', '.join(names)}")
+
+
+def apply_retention(connection, retention_months, archive_dir=None, today=None):
+    """
+    Archive (if archive_dir is given) and drop expired partitions.  Returns a
+    list of (partition, rows archived, archive path).
+    """
+    cursor = connection.cursor()
+    try:
+        expired = expired_partitions(cursor, retention_months, today)
+    finally:
+        cursor.close()
+
+    done = []
+    for name, _ in expired:
+        path, rows = archive_partition(connection, name, archive_dir) if archive_dir else (None, 0)
+        cursor = connection.cursor()
+        try:
+            drop_partitions(cursor, [name])
+        finally:
+            cursor.close()
+        done.append((name, rows, path))
+    return done
+
+
+def truncate_all(connection, archive_dir=None):
+    """Empty audit_logs partition by partition, archiving each one first"""
+    cursor = connection.cursor()
+    try:
+        partitions = list_partitions(cursor)
+    finally:
+        cursor.close()
+
+    archived = []
+    for name, _, _ in partitions:
+        if archive_dir:
+            path, rows = archive_partition(connection, name, archive_dir)
+            if path:
+                archived.append((name, rows, path))
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"ALTER TABLE audit_logs TRUNCATE PARTITION {name}")
+        finally:
+            cursor.close()
+    return archived
+
+
+def list_archives(archive_dir):
+    """[(file name, month start, size in bytes)] of the archive folder"""
+    if not archive_dir or not os.path.isdir(archive_dir):
+        return []
+    archives = []
+    for filename in sorted(os.listdir(archive_dir)):
+        m = ARCHIVE_FILE.match(filename)
+        if m:
+            size = os.path.getsize(os.path.join(archive_dir, filename))
+            archives.append((filename, date(int(m.group(1)), int(m.group(2)), 1), size))
+    return archives
+
+
+def query_archives(archive_dir, start, end, action=None, status=None, user_id=None):
+    """
+    Archived rows with start <= timestamp < end (datetimes), oldest file
+    first.  Only files whose month overlaps the range are opened, and they
+    are read line by line.
+    """
+    start_text = start.strftime('%Y-%m-%d %H:%M:%S')
+    end_text = end.strftime('%Y-%m-%d %H:%M:%S')
+    for filename, month, _ in list_archives(archive_dir):
+        month_start = datetime.combine(month, datetime.min.time())
+        month_end = datetime.combine(_month_start(month, 1), datetime.min.time())
+        if month_end <= start or month_start >= end:
+            continue
+        with gzip.open(os.path.join(archive_dir, filename), 'rt', encoding='utf-8') as file:
+            for line in file:
+                row = json.loads(line)
+                if not start_text <= (row.get('timestamp') or '') < end_text:
+                    continue
+                if action and row.get('action') != action:
+                    continue
+                if status and row.get('status') != status:
+                    continue
+                if user_id and row.get('user_id') != user_id:
+                    continue
+                yield row
+
+
+def maintain(connection, retention_months, archive_dir=None, months_ahead=3):
+    """Add future partitions and apply retention; returns (added, retired)"""
+    cursor = connection.cursor()
+    try:
+        added = ensure_future_partitions(cursor, months_ahead)
+    finally:
+        cursor.close()
+    retired = apply_retention(connection, retention_months, archive_dir) if retention_months else []
+    return added, retired
+
+
+def start_maintenance(connection_factory, interval, retention_months, archive_dir=None):
+    """Run maintain() now and then every `interval` seconds on a daemon thread"""
+
+    def run():
+        while True:
+            connection = None
+            try:
+                connection = connection_factory()
+                if connection:
+                    added, retired = maintain(connection, retention_months, archive_dir)
+                    if added or retired:
+                        print(f"Audit log partitions: added {added}, retired "
+                              f"{', '.join(f'{name} ({rows} rows)' for name, rows, _ in retired) or 'none'}")
+            except Exception as e:
+                print(f"Audit log partitions: maintenance error: {e}")
+            finally:
+                if connection:
+                    connection.close()
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="audit-partition-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv):
+    import mysql.connector
+    from app import create_app
+
+    if not argv or argv[0] not in ('status', 'maintain', 'query'):
+        print(__doc__)
+        return 1
+
+    # The app's settings (settings.py and CCRS_* overrides)
+    app = create_app()
+    archive_dir = app.config['AUDIT_ARCHIVE_FOLDER']
+
+    if argv[0] == 'query':
+        if len(argv) < 3:
+            print(__doc__)
+            return 1
+        start, end = (datetime.fromisoformat(value) for value in argv[1:3])
+        for row in query_archives(archive_dir, start, end):
+            print(json.dumps(row))
+        return 0
+
+    connection = mysql.connector.connect(**app.extensions['resources'].db_config())
+    try:
+        if argv[0] == 'status':
+            cursor = connection.cursor()
+            for name, bound, rows in list_partitions(cursor):
+                until = datetime.fromtimestamp(bound).strftime('%Y-%m-%d') if bound else 'MAXVALUE'
+                print(f"{name:<10} < {until:<10} ~{rows} rows")
+            cursor.close()
+            for filename, _, size in list_archives(archive_dir):
+                print(f"archive  {filename} ({size} bytes)")
+        else:
+            months = int(argv[argv.index('--retention-months') + 1]) if '--retention-months' in argv \
+                else app.config['AUDIT_RETENTION_MONTHS']
+            added, retired = maintain(connection, months, None if '--no-archive' in argv else archive_dir)
+            print(f"Added {added} partitions; retired {len(retired)}")
+            for name, rows, path in retired:
+                print(f"  {name}: {rows} rows" + (f" -> {path}" if path else ""))
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,377 @@
+"""
+Background audit log writer for the CyberCrime Reporting System backend.
+
+Routes used to write every audit event inline, with up to two database round
+trips per event.  Events are now queued in process and written by a worker
+thread as multi-row INSERTs once a batch fills up or the flush interval
+passes.  When the queue is full or MySQL is unreachable, events are appended
+to a local spill file and replayed on a later successful flush, so nothing is
+dropped.
+
+Several worker processes may share one spill file.  Appends and the rename
+that claims the file for replay are serialized with flock() where it is
+available, and each replay works on its own uniquely named copy.  Replay
+copies left behind by a process that died are put back in the spill file
+when a writer starts.  A spilled event the database keeps refusing (bad
+data rather than an outage) is moved to <spill>.rejected after
+MAX_REPLAY_FAILURES replays, so it cannot hold back the others forever.
+"""
+
+import glob
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from mysql.connector import errors
+
+try:
+    import fcntl
+except ImportError:  # Windows: only one process writes the spill file
+    fcntl = None
+
+INSERT_COLUMNS = ("user_id", "action", "details", "ip_address", "status", "timestamp",
+                  "actor_name", "actor_email", "actor_role")
+MAX_REPLAY_FAILURES = 3
+
+# _insert_batch() outcomes: the events themselves are refused (bad data, or a
+# malformed spill line), or the database could not be reached
+WRITTEN, REFUSED, UNAVAILABLE = "written", "refused", "unavailable"
+REFUSED_ERRORS = (errors.DataError, errors.IntegrityError, errors.ProgrammingError,
+                  KeyError, TypeError, ValueError)
+
+
+class AuditWriter:
+    """
+    Batches audit events and writes them from a daemon thread.
+
+    connection_factory -- callable returning a DB connection (or None)
+    batch_size         -- flush as soon as this many events are queued
+    flush_interval     -- flush at least this often (seconds) when idle
+    max_queue          -- events held in memory before spilling to disk
+    spill_path         -- append-only JSON-lines file for overflow/outages
+    """
+
+    def __init__(self, connection_factory, batch_size=100, flush_interval=1.0,
+                 max_queue=10000, spill_path="audit_spill.jsonl"):
+        self.connection_factory = connection_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self._stopping = False
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "spilled": 0, "replayed": 0, "rejected": 0}
+        self._stats_lock = threading.Lock()
+        self._replay_ids = itertools.count(1)
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, action, details, status="Success", ip_address=None,
+               user_id=None, email=None, timestamp=None, actor_name=None, actor_role=None):
+        """
+        Queue an audit event; never blocks the caller.  The actor's name,
+        email and role are stored with the row, taken from users when the
+        user can be resolved and from the arguments otherwise.
+        """
+        event = {
+            "user_id": user_id,
+            "email": email,
+            "actor_name": actor_name,
+            "actor_role": actor_role,
+            "action": action,
+            "details": details,
+            "ip_address": ip_address,
+            "status": status,
+            "timestamp": (timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self._flushed:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(event)
+            self._count("queued", 1)
+        except queue.Full:
+            self._spill([event])
+            self._done(1)
+
+    def flush(self, timeout=5.0):
+        """Wait until every event queued so far has been written or spilled"""
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def close(self, timeout=5.0):
+        """Flush outstanding events and stop the worker thread"""
+        self.flush(timeout)
+        self._stopping = True
+        self._thread.join(timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+    def _run(self):
+        try:
+            self._recover_replays()
+        except Exception as e:
+            print(f"Error recovering audit replay files: {e}")
+        while not self._stopping:
+            batch = self._collect()
+            if not batch:
+                continue
+            # Nothing may end this thread: later events would never be written
+            written = False
+            try:
+                written = self._write(batch)
+            except Exception as e:
+                print(f"Error in audit writer, {len(batch)} events lost: {e}")
+            finally:
+                self._done(len(batch))
+            if written:
+                try:
+                    self._replay_spill()
+                except Exception as e:
+                    print(f"Error replaying spilled audit events: {e}")
+
+    def _collect(self):
+        """Gather up to batch_size events, waiting at most flush_interval"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _done(self, count):
+        with self._flushed:
+            self._pending -= count
+            self._flushed.notify_all()
+
+    def _write(self, batch):
+        """Write a batch, or spill it; True if it was written"""
+        if self._insert_batch(batch) != WRITTEN:
+            self._spill(batch)
+            return False
+        self._count("written", len(batch))
+        self._count("batches", 1)
+        return True
+
+    def _count(self, name, count):
+        with self._stats_lock:
+            self._stats[name] += count
+
+    def _insert_batch(self, batch):
+        """Write events in one transaction; returns WRITTEN, REFUSED or UNAVAILABLE"""
+        connection = self.connection_factory()
+        if not connection:
+            return UNAVAILABLE
+        try:
+            cursor = connection.cursor()
+            try:
+                self._resolve_user_ids(cursor, batch)
+                self._insert(cursor, batch)
+            finally:
+                cursor.close()
+            connection.commit()
+            return WRITTEN
+        except Exception as e:
+            print(f"Error writing audit batch: {e}")
+            # The connection may be gone, in which case so is the transaction
+            try:
+                connection.rollback()
+            except Exception as e:
+                print(f"Error rolling back audit batch: {e}")
+            return REFUSED if isinstance(e, REFUSED_ERRORS) else UNAVAILABLE
+        finally:
+            try:
+                connection.close()
+            except Exception as e:
+                print(f"Error closing audit writer connection: {e}")
+
+    @staticmethod
+    def _resolve_user_ids(cursor, batch):
+        """Fill in user_id and the actor columns with one lookup for the whole batch"""
+        ids = {e["user_id"] for e in batch if e["user_id"]}
+        emails = {e["email"] for e in batch if not e["user_id"] and e["email"]}
+        users_by_id = {}
+        users_by_email = {}
+        if ids or emails:
+            conditions = []
+            if ids:
+                conditions.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+            if emails:
+                conditions.append(f"email IN ({', '.join(['%s'] * len(emails))})")
+            cursor.execute(f"SELECT id, name, email, role FROM users WHERE {' OR '.join(conditions)}",
+                           tuple(ids) + tuple(emails))
+            for user in cursor.fetchall():
+                users_by_id[user[0]] = users_by_email[user[2]] = user
+        for event in batch:
+            user = users_by_id.get(event["user_id"]) or users_by_email.get(event.get("email"))
+            if user:
+                event["user_id"], event["actor_name"], event["actor_email"], event["actor_role"] = user
+            else:
+                event.setdefault("actor_name", None)
+                event.setdefault("actor_role", None)
+                event["actor_email"] = event.get("email")
+
+    @staticmethod
+    def _insert(cursor, batch):
+        row = "(" + ", ".join(["%s"] * len(INSERT_COLUMNS)) + ")"
+        values = []
+        for event in batch:
+            values.extend(event.get(column) for column in INSERT_COLUMNS)
+        cursor.execute(
+            f"INSERT INTO audit_logs ({', '.join(INSERT_COLUMNS)}) VALUES "
+            + ", ".join([row] * len(batch)),
+            values,
+        )
+
+    def _spill(self, events):
+        with self._spill_lock:
+            self._append_spill("".join(json.dumps(event) + "\n" for event in events))
+        self._count("spilled", len(events))
+
+    def _reject(self, events):
+        """Set aside events the database keeps refusing, for someone to look at"""
+        path = self.spill_path + ".rejected"
+        with open(path, "a") as file:
+            _lock(file)
+            file.write("".join(json.dumps(event) + "\n" for event in events))
+        self._count("rejected", len(events))
+        print(f"Moved {len(events)} audit events the database refuses to {path}")
+
+    def _append_spill(self, text):
+        """Append to the spill file, unless another process claims it first"""
+        while True:
+            with open(self.spill_path, "a") as file:
+                _lock(file)
+                # Renamed for replay while we waited: append to a fresh file
+                if _same_file(file, self.spill_path):
+                    file.write(text)
+                    return
+
+    def _replay_spill(self):
+        """Move spilled events back into the database after an outage"""
+        with self._spill_lock:
+            try:
+                file = open(self.spill_path)
+            except FileNotFoundError:
+                return
+            with file:
+                _lock(file)
+                if not _same_file(file, self.spill_path):
+                    return
+                replay_path = f"{self.spill_path}.replay.{os.getpid()}.{next(self._replay_ids)}"
+                os.replace(self.spill_path, replay_path)
+
+        events = _read_events(replay_path)
+        retry, rejected = [], []
+        for start in range(0, len(events), self.batch_size):
+            if not self._replay_batch(events[start:start + self.batch_size], retry, rejected):
+                retry.extend(events[start + self.batch_size:])
+                break
+        if retry:
+            self._spill(retry)
+        if rejected:
+            self._reject(rejected)
+        os.remove(replay_path)
+
+    def _replay_batch(self, batch, retry, rejected):
+        """
+        Write one batch of spilled events.  Events to spill again go to
+        `retry`, those refused too often to `rejected`.  False once the
+        database is unreachable.
+        """
+        result = self._insert_batch(batch)
+        if result == WRITTEN:
+            self._count("replayed", len(batch))
+            return True
+        if result == UNAVAILABLE:
+            retry.extend(batch)
+            return False
+        # Some event in it is refused: write the others one at a time
+        for index, event in enumerate(batch):
+            result = self._insert_batch([event]) if len(batch) > 1 else REFUSED
+            if result == WRITTEN:
+                self._count("replayed", 1)
+            elif result == UNAVAILABLE:
+                retry.extend(batch[index:])
+                return False
+            else:
+                event["replay_failures"] = event.get("replay_failures", 0) + 1
+                (rejected if event["replay_failures"] >= MAX_REPLAY_FAILURES else retry).append(event)
+        return True
+
+    def _recover_replays(self):
+        """Put back replay copies whose process died before finishing them"""
+        for path in glob.glob(glob.escape(self.spill_path) + ".replay*"):
+            if _replaying_process_alive(path):
+                continue
+            events = _read_events(path)
+            if events:
+                self._spill(events)
+            os.remove(path)
+            print(f"Recovered {len(events)} audit events from {path}")
+
+
+def _lock(file):
+    if fcntl is not None:
+        fcntl.flock(file, fcntl.LOCK_EX)
+
+
+def _same_file(file, path):
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(file.fileno())
+    return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+
+def _replaying_process_alive(path):
+    """Whether the process named in a <spill>.replay.<pid>.<n> file still runs"""
+    parts = path.rsplit(".", 2)
+    if len(parts) != 3 or not parts[1].isdigit():
+        return False  # the old fixed .replay name
+    pid = int(parts[1])
+    if pid == os.getpid() or os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_events(path):
+    events = []
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                # A line cut short by a crash mid-append
+                print(f"Skipping malformed audit event in {path}: {line[:200]!r}")
+    return events
@@ -0,0 +1,431 @@
+"""
+Account routes: login, signup, the user's profile and password change.
+"""
+
+from flask import Blueprint, request, jsonify, session
+
+from dashboard_counters import get_counters, profile_stats
+from rate_limit import limit
+from extensions import db_cursor, get_password_hasher, log_audit_event, response_cache
+
+bp = Blueprint('auth', __name__)
+
+def login_email():
+    """Per-account bucket key for the auth routes: the email in the request body"""
+    return (request.get_json(silent=True) or {}).get('email') or None
+
+@bp.route('/auth/login', methods=['POST'])
+@limit('auth', user_key=login_email)
+def login():
+    data = request.json
+    email = data.get('email')
+    password = data.get('password')
+    
+    print(f"Login attempt for email: {email}")
+    
+    # Get user from database
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            cursor.execute("""
+                SELECT u.id, u.name, u.email, u.password, u.role, u.phone
+                FROM users u WHERE u.email = %s AND u.is_active = TRUE
+            """, (email,))
+            user = cursor.fetchone()
+        except Exception as e:
+            print(f"Database error during login: {e}")
+            return jsonify({"error": "Database error"}), 500
+    
+    if not user:
+        print(f"User not found: {email}")
+        return jsonify({"error": "Invalid credentials"}), 401
+    
+    # Check password in the hashing pool, without holding a connection
+    matches, new_hash = get_password_hasher().verify(user['password'], password or '')
+    if not matches:
+        print(f"Password mismatch for user: {email}")
+        return jsonify({"error": "Invalid credentials"}), 401
+    
+    # Upgrade a hash made under an older cost policy; the login succeeds either way
+    if new_hash:
+        try:
+            with db_cursor() as (connection, cursor):
+                cursor.execute("UPDATE users SET password = %s WHERE id = %s AND password = %s",
+                               (new_hash, user['id'], user['password']))
+                connection.commit()
+        except Exception as e:
+            print(f"Error upgrading password hash for {email}: {e}")
+    
+    # Set session
+    session['user_id'] = user['id']
+    session['email'] = user['email']
+    session['role'] = user['role']
+    
+    print(f"Login successful for {user['role']}: {email}")
+    
+    # Log the login event
+    log_audit_event(user['name'], "User Login", f"Login successful for {user['role']}", "Success", request.remote_addr)
+    
+    return jsonify({
+        "message": "Login successful",
+        "role": user['role'],
+        "name": user['name']
+    }), 200
+
+@bp.route('/auth/signup', methods=['POST'])
+@limit('auth', user_key=login_email)
+def signup():
+    data = request.json
+    name = data.get('name')
+    email = data.get('email')
+    password = data.get('password')
+    confirm_password = data.get('confirmPassword')
+    role = data.get('role')
+    phone = data.get('phone')
+    nid = data.get('nid')  # For victim
+    # Officer fields
+    badge = data.get('badge')
+    department = data.get('department')
+    specialization = data.get('specialization')
+    # Admin fields
+    admin_code = data.get('adminCode')
+    position = data.get('position')
+
+    # Validate passwords
+    if password != confirm_password:
+        return jsonify({'error': 'Passwords do not match'}), 400
+    
+    # Check if user already exists
+    with db_cursor(dictionary=True) as (connection, cursor):
+        cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
+        if cursor.fetchone():
+            return jsonify({'error': 'User already exists'}), 400
+
+    # Role-specific validation
+    if role == 'victim':
+        if not all([name, email, phone, nid, password]):
+            return jsonify({'error': 'All fields are required'}), 400
+    elif role == 'officer':
+        if not all([name, email, phone, badge, department, specialization, password]):
+            return jsonify({'error': 'All fields are required'}), 400
+    elif role == 'admin':
+        if not all([name, email, phone, admin_code, position, password]):
+            return jsonify({'error': 'All fields are required'}), 400
+    else:
+        return jsonify({'error': 'Invalid role'}), 400
+
+    # Hash password
+    password_hash = get_password_hasher().hash(password)
+    
+    # Save to database
+    with db_cursor() as (connection, cursor):
+        try:
+            # Insert into users table
+            cursor.execute("""
+                INSERT INTO users (name, email, password, phone, role)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (name, email, password_hash, phone, role))
+            
+            user_id = cursor.lastrowid
+            
+            # Insert role-specific data
+            if role == 'victim':
+                cursor.execute("""
+                    INSERT INTO victims (user_id, nid)
+                    VALUES (%s, %s)
+                """, (user_id, nid))
+            elif role == 'officer':
+                cursor.execute("""
+                    INSERT INTO officers (user_id, badge_number, department, specialization)
+                    VALUES (%s, %s, %s, %s)
+                """, (user_id, badge, department, specialization))
+            elif role == 'admin':
+                cursor.execute("""
+                    INSERT INTO admins (user_id, admin_code, position)
+                    VALUES (%s, %s, %s)
+                """, (user_id, admin_code, position))
+            
+            connection.commit()
+            response_cache.invalidate('users')
+            print(f"Signup successful for {role}: {email}")
+            
+            # Log the user creation event
+            log_audit_event(name, "User Created", f"New {role} account created", "Success", request.remote_addr)
+            
+            return jsonify({"message": "Signup successful", "role": role}), 200
+            
+        except Exception as e:
+            print(f"Database error during signup: {e}")
+            connection.rollback()
+            return jsonify({'error': 'Database error'}), 500
+
+@bp.route('/profile', methods=['GET', 'PUT'])
+def profile():
+    user_id = session.get('user_id')
+    email = session.get('email')
+    if not user_id or not email:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            if request.method == 'GET':
+                # Get user data with role-specific information
+                if session.get('role') == 'victim':
+                    cursor.execute("""
+                        SELECT u.*, v.nid
+                        FROM users u
+                        LEFT JOIN victims v ON u.id = v.user_id
+                        WHERE u.id = %s
+                    """, (user_id,))
+                elif session.get('role') == 'officer':
+                    cursor.execute("""
+                        SELECT u.*, o.badge_number, o.department, o.specialization
+                        FROM users u
+                        LEFT JOIN officers o ON u.id = o.user_id
+                        WHERE u.id = %s
+                    """, (user_id,))
+                elif session.get('role') == 'admin':
+                    cursor.execute("""
+                        SELECT u.*, a.admin_code, a.position
+                        FROM users u
+                        LEFT JOIN admins a ON u.id = a.user_id
+                        WHERE u.id = %s
+                    """, (user_id,))
+                else:
+                    cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
+            
+                user = cursor.fetchone()
+                if not user:
+                    return jsonify({"error": "User not found"}), 404
+            
+                # Build profile data
+                profile_data = {
+                    "name": user["name"],
+                    "email": user["email"],
+                    "role": user["role"],
+                    "phone": user.get("phone", ""),
+                    "id": user["id"],
+                    "join_date": user.get("created_at", "2024-01-01")
+                }
+            
+                # Add role-specific information
+                if user["role"] == "officer":
+                    profile_data.update({
+                        "badge": user.get("badge_number", ""),
+                        "department": user.get("department", ""),
+                        "specialization": user.get("specialization", "")
+                    })
+                elif user["role"] == "admin":
+                    profile_data.update({
+                        "admin_code": user.get("admin_code", ""),
+                        "position": user.get("position", "")
+                    })
+                elif user["role"] == "victim":
+                    profile_data.update({
+                        "nid": user.get("nid", "")
+                    })
+            
+                return jsonify({"profile": profile_data}), 200
+            
+            elif request.method == 'PUT':
+                data = request.json
+            
+                # First, get the current user data to check role and name
+                cursor.execute("SELECT name, role FROM users WHERE id = %s", (user_id,))
+                current_user = cursor.fetchone()
+                if not current_user:
+                    return jsonify({"error": "User not found"}), 404
+            
+                # Update basic user information
+                update_fields = []
+                update_values = []
+            
+                if "name" in data:
+                    update_fields.append("name = %s")
+                    update_values.append(data["name"])
+                if "phone" in data:
+                    update_fields.append("phone = %s")
+                    update_values.append(data["phone"])
+            
+                if update_fields:
+                    update_values.append(user_id)
+                    cursor.execute(f"""
+                        UPDATE users SET {', '.join(update_fields)}
+                        WHERE id = %s
+                    """, update_values)
+            
+                # Update role-specific information
+                if current_user["role"] == "officer":
+                    if "specialization" in data or "department" in data:
+                        officer_fields = []
+                        officer_values = []
+                        if "specialization" in data:
+                            officer_fields.append("specialization = %s")
+                            officer_values.append(data["specialization"])
+                        if "department" in data:
+                            officer_fields.append("department = %s")
+                            officer_values.append(data["department"])
+                    
+                        if officer_fields:
+                            officer_values.append(user_id)
+                            cursor.execute(f"""
+                                UPDATE officers SET {', '.join(officer_fields)}
+                                WHERE user_id = %s
+                            """, officer_values)
+            
+                elif current_user["role"] == "admin":
+                    if "position" in data:
+                        cursor.execute("""
+                            UPDATE admins SET position = %s WHERE user_id = %s
+                        """, (data["position"], user_id))
+            
+                connection.commit()
+                # Names and specializations appear in the officer and user listings
+                response_cache.invalidate('users')
+            
+                # Log the profile update
+                log_audit_event(current_user["name"], "Profile Updated", f"User updated their profile information", "Success", request.remote_addr)
+            
+                # Get updated profile data to return
+                if current_user["role"] == 'victim':
+                    cursor.execute("""
+                        SELECT u.*, v.nid
+                        FROM users u
+                        LEFT JOIN victims v ON u.id = v.user_id
+                        WHERE u.id = %s
+                    """, (user_id,))
+                elif current_user["role"] == 'officer':
+                    cursor.execute("""
+                        SELECT u.*, o.badge_number, o.department, o.specialization
+                        FROM users u
+                        LEFT JOIN officers o ON u.id = o.user_id
+                        WHERE u.id = %s
+                    """, (user_id,))
+                elif current_user["role"] == 'admin':
+                    cursor.execute("""
+                        SELECT u.*, a.admin_code, a.position
+                        FROM users u
+                        LEFT JOIN admins a ON u.id = a.user_id
+                        WHERE u.id = %s
+                    """, (user_id,))
+                else:
+                    cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
+            
+                updated_user = cursor.fetchone()
+                if updated_user:
+                    # Build profile data
+                    profile_data = {
+                        "name": updated_user["name"],
+                        "email": updated_user["email"],
+                        "role": updated_user["role"],
+                        "phone": updated_user.get("phone", ""),
+                        "id": updated_user["id"],
+                        "join_date": updated_user.get("created_at", "2024-01-01")
+                    }
+                
+                    # Add role-specific information
+                    if updated_user["role"] == "officer":
+                        profile_data.update({
+                            "badge": updated_user.get("badge_number", ""),
+                            "department": updated_user.get("department", ""),
+                            "specialization": updated_user.get("specialization", "")
+                        })
+                    elif updated_user["role"] == "admin":
+                        profile_data.update({
+                            "admin_code": updated_user.get("admin_code", ""),
+                            "position": updated_user.get("position", "")
+                        })
+                    elif updated_user["role"] == "victim":
+                        profile_data.update({
+                            "nid": updated_user.get("nid", "")
+                        })
+                
+                    return jsonify({"profile": profile_data}), 200
+            
+                return jsonify({"message": "Profile updated successfully"}), 200
+            
+        except Exception as e:
+            print(f"Database error in profile: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/profile/change-password', methods=['POST'])
+@limit('auth')
+def change_password():
+    user_id = session.get('user_id')
+    email = session.get('email')
+    if not user_id or not email:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    data = request.json
+    current_password = data.get('current_password')
+    new_password = data.get('new_password')
+    confirm_password = data.get('confirm_password')
+    
+    if not all([current_password, new_password, confirm_password]):
+        return jsonify({"error": "All fields are required"}), 400
+    
+    if new_password != confirm_password:
+        return jsonify({"error": "New passwords do not match"}), 400
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Get current user data
+            cursor.execute("SELECT name, password FROM users WHERE id = %s", (user_id,))
+            user = cursor.fetchone()
+        except Exception as e:
+            print(f"Database error in change password: {e}")
+            return jsonify({"error": "Database error"}), 500
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    
+    # Check the current password and hash the new one in the hashing pool,
+    # without holding a connection
+    hasher = get_password_hasher()
+    if not hasher.verify(user['password'], current_password)[0]:
+        return jsonify({"error": "Current password is incorrect"}), 400
+    new_password_hash = hasher.hash(new_password)
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            # Update password
+            cursor.execute("UPDATE users SET password = %s WHERE id = %s", (new_password_hash, user_id))
+            connection.commit()
+        
+            # Log the password change
+            log_audit_event(user["name"], "Password Changed", f"User changed their password", "Success", request.remote_addr)
+        
+            return jsonify({"message": "Password changed successfully"}), 200
+        
+        except Exception as e:
+            print(f"Database error in change password: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/test-session', methods=['GET'])
+def test_session():
+    """Test endpoint to check session data"""
+    return jsonify({
+        'user_id': session.get('user_id'),
+        'role': session.get('role'),
+        'email': session.get('email'),
+        'session_data': dict(session)
+    }), 200
+
+@bp.route('/profile/stats', methods=['GET'])
+def get_profile_stats():
+    user_id = session.get('user_id')
+    role = session.get('role')
+    if not user_id or not role:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # One primary-key lookup in the materialized counters
+            if role == "admin":
+                counters = get_counters(cursor, 'global')
+            else:
+                counters = get_counters(cursor, role, user_id)
+        
+            return jsonify({"stats": profile_stats(counters)}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_profile_stats: {e}")
+            return jsonify({"error": "Database error"}), 500
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark the assignment engine at production scale, in memory.
+
+Usage:
+    python benchmarks/assignment_throughput.py [--officers N] [--reports M]
+
+Loads N officers (default 10,000) with random specializations, assigns M
+reports (default 1,000,000) of random crime types through reserve(), and
+closes a share of them through release() along the way, as status changes
+would.  Prints per-operation latency and compares choose() with the linear
+scan over all officers it replaces.  Needs no database.
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assignment_engine import AssignmentEngine, CRIME_SPECIALIZATIONS, _key
+
+SPECIALIZATIONS = ("Cyber Forensics", "Network Security", "Digital Evidence", "Malware Analysis", "Other")
+CRIME_TYPES = ("Hacking", "Scam", "Cyberbullying", "Phishing", "Other")
+CLOSE_RATIO = 0.3
+
+
+def linear_choice(officers, crime_type):
+    """What a scan of officer_performance_view does: the minimum over every officer"""
+    wanted = {_key(s) for s in CRIME_SPECIALIZATIONS.get(_key(crime_type), ())}
+    best = None
+    for officer_id, (load, specialization) in officers.items():
+        if wanted and _key(specialization) not in wanted:
+            continue
+        if best is None or (load, officer_id) < best:
+            best = (load, officer_id)
+    return best[1] if best else None
+
+
+def percentile(timings, p):
+    return timings[max(0, int(len(timings) * p) - 1)]
+
+
+def main(argv):
+    officers = int(argv[argv.index('--officers') + 1]) if '--officers' in argv else 10000
+    reports = int(argv[argv.index('--reports') + 1]) if '--reports' in argv else 1000000
+    rng = random.Random(42)
+
+    engine = AssignmentEngine()
+    rows = [(i, rng.choice(SPECIALIZATIONS), True, 0) for i in range(1, officers + 1)]
+    started = time.perf_counter()
+    engine.load_rows(rows)
+    print(f"Loaded {officers} officers in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    crime_types = [rng.choice(CRIME_TYPES) for _ in range(reports)]
+    assigned = []
+    timings = []
+    started = time.perf_counter()
+    for crime_type in crime_types:
+        t = time.perf_counter()
+        officer_id = engine.reserve(crime_type)
+        timings.append(time.perf_counter() - t)
+        assigned.append(officer_id)
+        if rng.random() < CLOSE_RATIO:
+            engine.release(assigned[rng.randrange(len(assigned))])
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    print(f"Assigned {reports} reports in {elapsed:.2f} s "
+          f"({reports / elapsed:,.0f}/s incl. {CLOSE_RATIO:.0%} releases)")
+    print(f"reserve(): median {statistics.median(timings) * 1e6:.1f} us, "
+          f"p99 {percentile(timings, 0.99) * 1e6:.1f} us, max {timings[-1] * 1e6:.1f} us")
+    print(f"Engine: {engine.stats()}")
+
+    # The same choices by linear scan, on a sample (it is far too slow for all of them)
+    snapshot = {officer_id: (engine.caseload(officer_id), specialization)
+                for officer_id, specialization, _, _ in rows}
+    sample = crime_types[:200]
+    started = time.perf_counter()
+    for crime_type in sample:
+        engine.choose(crime_type)
+    heap_us = (time.perf_counter() - started) / len(sample) * 1e6
+    started = time.perf_counter()
+    for crime_type in sample:
+        linear_choice(snapshot, crime_type)
+    scan_us = (time.perf_counter() - started) / len(sample) * 1e6
+    print(f"choose(): {heap_us:.1f} us per call vs linear scan {scan_us:.1f} us ({scan_us / heap_us:.0f}x)")
+
+    mismatched = sum(
+        snapshot[engine.choose(c)][0] != snapshot[linear_choice(snapshot, c)][0] for c in CRIME_TYPES
+    )
+    if mismatched:
+        print(f"FAIL: {mismatched} choices differ in caseload from the linear scan")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN the hot queries and check they are served by the migration indexes.
+
+Usage:
+    python benchmarks/explain_hot_queries.py [--seed-reports N]
+
+--seed-reports inserts N synthetic reports (plus evidence, case logs and
+audit rows) first, so the optimizer sees a realistically sized table; the
+indexes only win over a full scan once the tables are large.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+
+from app import create_app
+
+# (description, query, params, index the plan is expected to use)
+HOT_QUERIES = [
+    ("/victim/reports",
+     "SELECT r.* FROM reports r WHERE r.victim_id = %s ORDER BY r.date_submitted DESC",
+     (1,), "idx_reports_victim_submitted"),
+    ("/officer/assigned_cases",
+     "SELECT r.* FROM reports r WHERE r.assigned_officer_id = %s ORDER BY r.date_submitted DESC",
+     (2,), "idx_reports_officer_submitted"),
+    ("/officer/assigned_cases?status=",
+     "SELECT r.* FROM reports r WHERE r.assigned_officer_id = %s AND r.status = %s "
+     "ORDER BY r.date_submitted DESC",
+     (2, 'Open'), "idx_reports_officer_status"),
+    ("/officer/case/<id>/evidence",
+     "SELECT id, upload_date FROM evidence WHERE report_id = %s ORDER BY upload_date DESC",
+     (1,), "idx_evidence_report_upload"),
+    ("/officer/case/<id>/logs",
+     "SELECT cl.* FROM case_logs cl WHERE cl.report_id = %s ORDER BY cl.log_date DESC",
+     (1,), "idx_case_logs_report_date"),
+    ("/admin/audit_logs",
+     "SELECT al.* FROM audit_logs al WHERE al.timestamp >= NOW() - INTERVAL 31 DAY "
+     "ORDER BY al.timestamp DESC, al.id DESC LIMIT 101",
+     (), "idx_audit_logs_time_action"),
+    ("/admin/audit_logs?action=",
+     "SELECT al.* FROM audit_logs al WHERE al.action = %s AND al.timestamp >= NOW() - INTERVAL 31 DAY "
+     "ORDER BY al.timestamp DESC, al.id DESC LIMIT 101",
+     ('LOGIN',), "idx_audit_logs_action_time"),
+    ("/admin/audit_logs?user_id=",
+     "SELECT al.* FROM audit_logs al WHERE al.user_id = %s AND al.timestamp >= NOW() - INTERVAL 31 DAY "
+     "ORDER BY al.timestamp DESC, al.id DESC LIMIT 101",
+     (1,), "idx_audit_logs_user_time"),
+    ("/search (reports)",
+     "SELECT r.id FROM reports r "
+     "WHERE MATCH(r.description, r.location, r.crime_type) AGAINST (%s IN BOOLEAN MODE)",
+     ('+phish*',), "ft_reports_text"),
+    ("/search (case logs)",
+     "SELECT cl.report_id FROM case_logs cl WHERE MATCH(cl.notes, cl.action) AGAINST (%s IN BOOLEAN MODE)",
+     ('+wallet',), "ft_case_logs_text"),
+]
+
+# Words for synthetic descriptions, so full-text queries have realistic selectivity
+VOCABULARY = (
+    "phishing email bank account password stolen wallet crypto bitcoin scam fraud "
+    "invoice transfer social media profile hacked ransomware laptop encrypted files "
+    "identity theft credit card online shopping website fake seller refund sextortion "
+    "threat message harassment impersonation loan app upi payment otp sim swap"
+).split()
+LOCATIONS = ("Dhaka", "Chittagong", "Sylhet", "Khulna", "Rajshahi", "Barisal", "Rangpur", "Online")
+
+
+def seed_reports(connection, count, victims=1000, officers=100, batch=5000):
+    """Insert synthetic users and `count` reports with related rows"""
+    cursor = connection.cursor()
+    run = int(time.time())
+    print(f"Seeding {victims} victims, {officers} officers and {count} reports...")
+
+    def insert_users(role, n):
+        rows = [(f"Bench {role} {i}", f"bench-{run}-{role}-{i}@example.com", "x", role) for i in range(n)]
+        cursor.executemany("INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, %s)", rows)
+        cursor.execute("SELECT id FROM users WHERE email LIKE %s", (f"bench-{run}-{role}-%",))
+        return [row[0] for row in cursor.fetchall()]
+
+    victim_ids = insert_users('victim', victims)
+    officer_ids = insert_users('officer', officers)
+    connection.commit()
+
+    statuses = ['Open', 'Under Investigation', 'Closed', 'Rejected']
+    for start in range(0, count, batch):
+        rows = [
+            (random.choice(victim_ids), 'Phishing', ' '.join(random.choices(VOCABULARY, k=20)), '2024-01-01',
+             random.choice(LOCATIONS), random.choice(statuses), random.choice(officer_ids + [None]))
+            for _ in range(min(batch, count - start))
+        ]
+        cursor.executemany("""
+            INSERT INTO reports (victim_id, crime_type, description, date_occurred, location, status, assigned_officer_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, rows)
+        connection.commit()
+        print(f"  {start + len(rows)} reports")
+
+    cursor.execute("ANALYZE TABLE reports, evidence, case_logs, audit_logs")
+    cursor.fetchall()
+    cursor.close()
+
+
+def explain(connection):
+    """Print the plan for every hot query; return the ones not using their index"""
+    cursor = connection.cursor(dictionary=True)
+    misses = []
+    for description, query, params, expected in HOT_QUERIES:
+        cursor.execute("EXPLAIN " + query, params)
+        plan = cursor.fetchall()
+        first = plan[0]
+        ok = first.get('key') == expected
+        print(f"{'OK  ' if ok else 'MISS'} {description}")
+        for row in plan:
+            print(f"       table={row['table']} type={row['type']} key={row['key']} "
+                  f"rows={row['rows']} extra={row.get('Extra')}")
+        if not ok:
+            misses.append(description)
+    cursor.close()
+    return misses
+
+
+def main(argv):
+    # The database the app is configured for (settings.py and CCRS_* overrides)
+    connection = mysql.connector.connect(**create_app().extensions['resources'].db_config())
+    try:
+        if '--seed-reports' in argv:
+            seed_reports(connection, int(argv[argv.index('--seed-reports') + 1]))
+        misses = explain(connection)
+    finally:
+        connection.close()
+
+    if misses:
+        print(f"\n{len(misses)} query plan(s) do not use the expected index")
+        return 1
+    print("\nAll hot queries use their indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
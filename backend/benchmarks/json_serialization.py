@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare the old and new ways of turning a large result set into a response.
+
+Usage:
+    python benchmarks/json_serialization.py [--rows N] [--runs R]
+
+Builds N (default 50,000) report rows as a tuple cursor returns them and
+times, per run:
+
+    dict cursor + strftime   per-row dicts built with the column names looked
+                             up for every row, each date field converted with
+                             strftime, then Flask's default encoder
+    fetch_dicts + stdlib     fetch_dicts() and AppJSONProvider's encoder on
+                             the standard library json module
+    fetch_dicts + orjson     the same on orjson (if installed)
+
+and checks all three produce the same JSON.  Needs no database.
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+
+import serialization
+from serialization import fetch_dicts
+
+COLUMNS = ('id', 'crime_type', 'description', 'date_occurred', 'date_submitted', 'location',
+           'status', 'priority', 'assignment_date', 'victim_name', 'assigned_officer_name', 'evidence_count')
+
+
+class FakeCursor:
+    """Just enough of a tuple cursor for fetch_dicts()"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.description = [(name,) for name in COLUMNS]
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self.description)
+
+    def fetchall(self):
+        return self.rows
+
+
+def make_rows(count):
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        submitted = start + timedelta(minutes=rng.randrange(500000))
+        rows.append((
+            i + 1, rng.choice(("Hacking", "Scam", "Phishing", "Cyberbullying", "Other")),
+            "Received a message asking for the OTP of my bank account " * 2,
+            (submitted - timedelta(days=rng.randrange(30))).date(), submitted,
+            rng.choice(("Dhaka", "Sylhet", "Online")), rng.choice(("Open", "Under Investigation", "Closed")),
+            "Medium", submitted + timedelta(days=1) if i % 2 else None,
+            f"Victim {i % 1000}", f"Officer {i % 100}" if i % 2 else None, Decimal(i % 7),
+        ))
+    return rows
+
+
+def old_path(cursor):
+    rows = [dict(zip(cursor.column_names, row)) for row in cursor.fetchall()]
+    for report in rows:
+        if report.get('date_submitted'):
+            report['date_submitted'] = report['date_submitted'].strftime('%Y-%m-%d %H:%M:%S')
+        if report.get('date_occurred'):
+            report['date_occurred'] = report['date_occurred'].strftime('%Y-%m-%d')
+        if report.get('assignment_date'):
+            report['assignment_date'] = report['assignment_date'].strftime('%Y-%m-%d %H:%M:%S')
+        # Flask's default encoder would turn Decimal into a string; match the new output
+        report['evidence_count'] = int(report['evidence_count'])
+    return json.dumps({'reports': rows}, default=DefaultJSONProvider.default,
+                      sort_keys=True, separators=(',', ':'))
+
+
+def new_path(cursor, fast):
+    return serialization.dumps({'reports': fetch_dicts(cursor)}, sort_keys=True, fast=fast)
+
+
+def time_path(fn, runs):
+    timings = []
+    output = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), output
+
+
+def main(argv):
+    count = int(argv[argv.index('--rows') + 1]) if '--rows' in argv else 50000
+    runs = int(argv[argv.index('--runs') + 1]) if '--runs' in argv else 5
+    rows = make_rows(count)
+
+    paths = [
+        ("dict cursor + strftime", lambda: old_path(FakeCursor(rows))),
+        ("fetch_dicts + stdlib", lambda: new_path(FakeCursor(rows), fast=False)),
+    ]
+    if serialization.orjson is not None:
+        paths.append(("fetch_dicts + orjson", lambda: new_path(FakeCursor(rows), fast=True)))
+    else:
+        print("orjson not installed; skipping the fast encoder")
+
+    print(f"{count} rows, median of {runs} runs")
+    baseline = None
+    expected = None
+    for name, fn in paths:
+        elapsed, output = time_path(fn, runs)
+        if baseline is None:
+            baseline, expected = elapsed, json.loads(output)
+        elif json.loads(output) != expected:
+            print(f"FAIL: {name} output differs from the old path")
+            return 1
+        print(f"  {name:<24} {elapsed:8.1f} ms  ({baseline / elapsed:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+How much a burst of password checks slows down the rest of the process.
+
+Usage:
+    python benchmarks/password_hashing.py [--logins N] [--threads T] [--workers W]
+
+Runs N (default 40) check_password_hash calls from T (default 8) threads,
+as a login spike would, while another thread does a stand-in for a read
+request (a little pure-Python work, every 5 ms) and records how late each
+one finishes.  Once with the hashing inline on the request threads, once
+through PasswordHasher's process pool.  Needs no database.
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from password_hashing import PasswordHasher
+
+METHOD = 'pbkdf2:sha256:600000'
+
+
+def read_request():
+    return sum(i * i for i in range(2000))
+
+
+def measure(check, logins, threads):
+    stop = threading.Event()
+    latencies = []
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            read_request()
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.005)
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda _: check(), range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    reader_thread.join()
+    assert all(results)
+    latencies.sort()
+    return elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99)], latencies[-1]
+
+
+def main(argv):
+    logins = int(argv[argv.index('--logins') + 1]) if '--logins' in argv else 40
+    threads = int(argv[argv.index('--threads') + 1]) if '--threads' in argv else 8
+    workers = int(argv[argv.index('--workers') + 1]) if '--workers' in argv else 2
+    stored = generate_password_hash('correct horse', method=METHOD)
+
+    hasher = PasswordHasher(METHOD, workers=workers)
+    hasher.verify(stored, 'warm up')  # start the worker processes
+    try:
+        paths = [
+            ("inline", lambda: check_password_hash(stored, 'correct horse')),
+            (f"pool ({workers} workers)", lambda: hasher.verify(stored, 'correct horse')[0]),
+        ]
+        print(f"{logins} logins from {threads} threads; read request latency in ms")
+        for name, check in paths:
+            elapsed, median, p99, worst = measure(check, logins, threads)
+            print(f"  {name:<18} burst {elapsed:6.2f} s   read median {median:6.2f}  "
+                  f"p99 {p99:7.2f}  max {worst:7.2f}")
+        print(f"  pool stats: {hasher.stats()}")
+    finally:
+        hasher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
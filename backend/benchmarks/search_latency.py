@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Time /search queries against the FULLTEXT indexes.
+
+Usage:
+    python benchmarks/search_latency.py [--seed-reports N] [--runs R]
+
+Runs each query in QUERIES R times per scope (admin: all reports, officer:
+one officer's cases) and prints median and p95 latency.  Exits non-zero if
+any p95 is above the 50 ms budget.  Seed a few million reports with
+--seed-reports first to measure at production scale.
+"""
+
+import os
+import statistics
+import sys
+import time
+
+# The backend first: benchmarks/password_hashing.py would shadow the app's module
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+
+from app import create_app
+from explain_hot_queries import seed_reports
+from search import parse_query, search_reports
+
+BUDGET_MS = 50
+QUERIES = [
+    'phishing',
+    'bank transfer',
+    'ransom*',
+    '"credit card"',
+    'crypto -bitcoin',
+    'stolen wallet Dhaka',
+]
+
+
+def time_query(cursor, text, scope_sql, scope_params, runs):
+    expression, _ = parse_query(text)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        search_reports(cursor, expression, scope_sql, scope_params, limit=20)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+def main(argv):
+    runs = int(argv[argv.index('--runs') + 1]) if '--runs' in argv else 20
+    # The database the app is configured for (settings.py and CCRS_* overrides)
+    connection = mysql.connector.connect(**create_app().extensions['resources'].db_config())
+    over_budget = []
+    try:
+        if '--seed-reports' in argv:
+            seed_reports(connection, int(argv[argv.index('--seed-reports') + 1]))
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT COUNT(*) AS n FROM reports")
+        print(f"{cursor.fetchone()['n']} reports")
+        cursor.execute("""
+            SELECT assigned_officer_id FROM reports
+            WHERE assigned_officer_id IS NOT NULL
+            GROUP BY assigned_officer_id ORDER BY COUNT(*) DESC LIMIT 1
+        """)
+        row = cursor.fetchone()
+        scopes = [("admin", "", [])]
+        if row:
+            scopes.append(("officer", "r.assigned_officer_id = %s", [row['assigned_officer_id']]))
+
+        for scope_name, scope_sql, scope_params in scopes:
+            for text in QUERIES:
+                median, p95 = time_query(cursor, text, scope_sql, scope_params, runs)
+                flag = "OK  " if p95 <= BUDGET_MS else "SLOW"
+                print(f"{flag} {scope_name:8} {text!r:28} median={median:7.2f} ms  p95={p95:7.2f} ms")
+                if p95 > BUDGET_MS:
+                    over_budget.append((scope_name, text))
+        cursor.close()
+    finally:
+        connection.close()
+
+    if over_budget:
+        print(f"\n{len(over_budget)} queries over the {BUDGET_MS} ms budget")
+        return 1
+    print(f"\nAll queries within the {BUDGET_MS} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
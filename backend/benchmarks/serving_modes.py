@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request throughput of the sync and async serving modes.
+
+Usage:
+    python benchmarks/serving_modes.py --email E --password P
+        [--path /victim/reports] [--concurrency 50] [--requests 2000]
+        [--streams 0] [--modes sync,async]
+
+For each mode this starts the server on a free local port (the Flask app
+on Werkzeug's threaded server, or async_app on Hypercorn), logs in as E,
+optionally opens --streams notification streams that stay connected for
+the whole run, and then sends --requests GETs for --path from
+--concurrency keep-alive connections.  Prints requests per second and
+latency percentiles.  Needs the local MySQL database from settings.py
+and an existing account; the async mode also needs quart, aiomysql and
+hypercorn.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'sync': "from wsgi import app; app.run(host='127.0.0.1', port={port}, threaded=True)",
+    'async': "import sys, async_app; sys.exit(async_app.main(['127.0.0.1:{port}']))",
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port):
+    process = subprocess.Popen([sys.executable, '-c', SERVERS[mode].format(port=port)], cwd=BACKEND,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def login(port, email, password):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/auth/login",
+                                     data=json.dumps({'email': email, 'password': password}).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        cookie = response.headers['Set-Cookie']
+    return cookie.split(';', 1)[0]
+
+
+async def read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(port, path, cookie, count, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = f"GET {path} HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\n\r\n".encode()
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def open_stream(port, cookie):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET /notifications/stream HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\n\r\n".encode())
+    await reader.readline()
+    return writer
+
+
+async def run_load(port, path, cookie, concurrency, requests, streams):
+    held = [await open_stream(port, cookie) for _ in range(streams)]
+    latencies, errors = [], []
+    per_client = max(1, requests // concurrency)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, path, cookie, per_client, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    for writer in held:
+        writer.close()
+    return elapsed, latencies, errors
+
+
+def main(argv):
+    def option(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    email, password = option('--email', None), option('--password', None)
+    if not email or not password:
+        print(__doc__)
+        return 1
+    path = option('--path', '/victim/reports')
+    concurrency = int(option('--concurrency', 50))
+    requests = int(option('--requests', 2000))
+    streams = int(option('--streams', 0))
+    modes = option('--modes', 'sync,async').split(',')
+
+    print(f"GET {path}: {requests} requests over {concurrency} connections, {streams} open streams")
+    for mode in modes:
+        port = free_port()
+        process = start_server(mode, port)
+        try:
+            cookie = login(port, email, password)
+            elapsed, latencies, errors = asyncio.run(
+                run_load(port, path, cookie, concurrency, requests, streams))
+        finally:
+            process.terminate()
+            process.wait()
+        latencies.sort()
+        print(f"  {mode:<6} {len(latencies) / elapsed:8.1f} req/s   p50 {statistics.median(latencies):7.1f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99)]:7.1f} ms   errors {len(errors)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
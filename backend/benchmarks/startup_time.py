@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+What a fresh process pays before it can serve: import, app creation, first request.
+
+Usage:
+    python benchmarks/startup_time.py [--runs 10] [--top 0]
+
+Each run starts a new interpreter that imports app, calls create_app() and
+serves GET /metrics through the test client, and reports the time of each
+step plus the threads running once the app exists (creating it should
+start none).  Prints the median over --runs.  With --top N, also lists the
+N slowest of app.py's imports by cumulative time from `python -X importtime`.
+Needs no database.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, threading, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+threads = threading.active_count()
+response = application.test_client().get('/metrics')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({'import': imported - started, 'create_app': created - imported,
+                  'first_request': served - created, 'threads': threads}))
+"""
+
+
+def probe():
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=BACKEND, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_times(top):
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=BACKEND,
+                            check=True, capture_output=True, text=True).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative), name.rstrip()))
+    # app's own imports only: deeper ones are counted in their parents
+    modules = [(us, name) for us, name in modules if len(name) - len(name.lstrip()) == 3]
+    return sorted(modules, reverse=True)[:top]
+
+
+def main(argv):
+    runs = int(argv[argv.index('--runs') + 1]) if '--runs' in argv else 10
+    top = int(argv[argv.index('--top') + 1]) if '--top' in argv else 0
+
+    results = [probe() for _ in range(runs)]
+    print(f"median of {runs} fresh processes")
+    for step in ('import', 'create_app', 'first_request'):
+        print(f"  {step:<14} {statistics.median(r[step] for r in results) * 1000:8.1f} ms")
+    print(f"  threads after create_app: {max(r['threads'] for r in results)}")
+
+    if top:
+        print("slowest imports of app.py")
+        for us, name in import_times(top):
+            print(f"  {name.strip():<30} {us / 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Content-addressed evidence blob store.
+
+Evidence bytes are stored once per distinct SHA-256 under a sharded layout,
+root/ab/cd/abcd..., so identical uploads to several reports share one file
+and no directory grows past a few thousand entries.  The evidence table
+references blobs through its sha256 column; a blob with no referencing rows
+is garbage and is removed by collect_garbage().
+
+Usage:
+    python blob_store.py migrate   move legacy uploads/ files into the store
+    python blob_store.py gc        delete blobs no evidence row references
+
+Both use the app's settings, so CCRS_* overrides (CCRS_MYSQL_DB,
+CCRS_BLOB_FOLDER, ...) apply as they do to the server.
+"""
+
+import hashlib
+import os
+import sys
+import time
+
+CHUNK_SIZE = 64 * 1024
+HASH_LENGTH = 64
+
+
+class BlobStore:
+    """Sharded directory of files named by their SHA-256 digest"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, sha256):
+        if len(sha256) != HASH_LENGTH or not all(c in '0123456789abcdef' for c in sha256):
+            raise ValueError(f"Not a SHA-256 digest: {sha256}")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256):
+        return os.path.exists(self.path_for(sha256))
+
+    def put(self, spool):
+        """
+        Store a HashingSpoolFile and return its blob path.
+
+        If the blob is already present the spooled copy is simply discarded.
+        """
+        path = self.path_for(spool.sha256)
+        if self._reuse(path):
+            spool.close()
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        spool.commit(path)
+        return path
+
+    def put_path(self, source_path, sha256=None):
+        """Move an existing file into the store (used by the legacy migration)"""
+        sha256 = sha256 or hash_file(source_path)
+        path = self.path_for(sha256)
+        if self._reuse(path):
+            return sha256, path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.part'
+        with open(source_path, 'rb') as source, open(temp_path, 'wb') as target:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                target.write(chunk)
+            target.flush()
+            os.fsync(target.fileno())
+        os.replace(temp_path, path)
+        return sha256, path
+
+    @staticmethod
+    def _reuse(path):
+        """
+        Whether an identical blob is already stored.  Its mtime is refreshed,
+        so the GC grace period covers the evidence row about to reference it.
+        """
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def iter_blobs(self):
+        """Yield (sha256, path) for every stored blob"""
+        for first in sorted(os.listdir(self.root)):
+            first_dir = os.path.join(self.root, first)
+            if len(first) != 2 or not os.path.isdir(first_dir):
+                continue
+            for second in sorted(os.listdir(first_dir)):
+                second_dir = os.path.join(first_dir, second)
+                if not os.path.isdir(second_dir):
+                    continue
+                for name in os.listdir(second_dir):
+                    if len(name) == HASH_LENGTH:
+                        yield name, os.path.join(second_dir, name)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def reference_counts(cursor, hashes):
+    """Return {sha256: number of evidence rows referencing it}"""
+    if not hashes:
+        return {}
+    placeholders = ", ".join(["%s"] * len(hashes))
+    cursor.execute(f"""
+        SELECT sha256, COUNT(*) FROM evidence
+        WHERE sha256 IN ({placeholders})
+        GROUP BY sha256
+    """, tuple(hashes))
+    return {sha256: count for sha256, count in cursor.fetchall()}
+
+
+def collect_garbage(connection, store, grace_seconds=3600, batch_size=500):
+    """
+    Delete blobs that no evidence row references.
+
+    Blobs younger than `grace_seconds` are kept: an upload writes its blob
+    before the evidence row is committed.  Returns (blobs_removed, bytes_freed).
+    """
+    cursor = connection.cursor()
+    removed = freed = 0
+    cutoff = time.time() - grace_seconds
+
+    def sweep(batch):
+        nonlocal removed, freed
+        counts = reference_counts(cursor, [sha256 for sha256, _ in batch])
+        for sha256, path in batch:
+            if counts.get(sha256):
+                continue
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                os.remove(path)
+                removed += 1
+                freed += stat.st_size
+            except OSError:
+                pass
+
+    try:
+        batch = []
+        for blob in store.iter_blobs():
+            batch.append(blob)
+            if len(batch) >= batch_size:
+                sweep(batch)
+                batch = []
+        if batch:
+            sweep(batch)
+    finally:
+        cursor.close()
+    return removed, freed
+
+
+def migrate_legacy_files(connection, store, upload_folder, batch_size=500):
+    """
+    Hash evidence files stored under the old flat layout and move them into
+    the store, filling in evidence.sha256 and file_path.
+
+    Legacy files are only deleted once every row that pointed at them has
+    been migrated.  Returns (rows_migrated, rows_missing_file).
+    """
+    cursor = connection.cursor(dictionary=True)
+    migrated = missing = 0
+    moved = set()
+    last_id = 0
+    try:
+        while True:
+            cursor.execute("""
+                SELECT id, filename, file_path FROM evidence
+                WHERE sha256 IS NULL AND id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                last_id = row['id']
+                source = row['file_path']
+                if not source or not os.path.exists(source):
+                    source = os.path.join(upload_folder, row['filename'])
+                if not os.path.exists(source):
+                    missing += 1
+                    print(f"  evidence #{row['id']}: file {row['filename']} not found, skipped")
+                    continue
+                sha256, path = store.put_path(source)
+                cursor.execute(
+                    "UPDATE evidence SET sha256 = %s, file_path = %s WHERE id = %s",
+                    (sha256, path, row['id'])
+                )
+                moved.add(source)
+                migrated += 1
+            connection.commit()
+            print(f"  migrated {migrated} evidence rows")
+    finally:
+        cursor.close()
+
+    for source in moved:
+        try:
+            os.remove(source)
+        except OSError:
+            pass
+    return migrated, missing
+
+
+def main(argv):
+    import mysql.connector
+    from app import create_app
+
+    command = argv[0] if argv else None
+    if command not in ('migrate', 'gc'):
+        print(__doc__)
+        return 1
+
+    # The app's settings (settings.py and CCRS_* overrides): the same database and folders it serves
+    app = create_app()
+    upload_folder = app.config['UPLOAD_FOLDER']
+    store = BlobStore(app.config['BLOB_FOLDER'])
+    connection = mysql.connector.connect(**app.extensions['resources'].db_config())
+    try:
+        if command == 'migrate':
+            migrated, missing = migrate_legacy_files(connection, store, upload_folder)
+            print(f"Migrated {migrated} evidence files ({missing} missing)")
+        else:
+            removed, freed = collect_garbage(connection, store)
+            print(f"Removed {removed} unreferenced blobs, freed {freed} bytes")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
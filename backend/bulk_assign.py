@@ -0,0 +1,204 @@
+"""
+Bulk case assignment.
+
+A batch is a list of (report_id, officer_id, note) items, given explicitly
+selected by a report filter for one target officer, or selected by a
+filter and given officers by the assignment engine.  The items are
+staged in bulk_assignment_items and applied by the BulkAssignOfficers
+procedure (migration 0007) in a few set-based statements, inside the
+caller's transaction.  Every item gets a result:
+
+    assigned          the report is now assigned to the officer
+    unchanged         it already was (so a blind retry is harmless)
+    duplicate         a later item in the batch names the same report
+    not_found         no such report
+    invalid_officer   the officer does not exist or is inactive
+    closed            the report is Closed or Rejected
+
+Batches submitted with an idempotency key keep their results, and a retry
+with the same key returns them without applying anything again.
+"""
+
+from notifications import ASSIGNED
+
+STAGE_BATCH_SIZE = 1000
+REPORT_STATUSES = ('Open', 'Under Investigation', 'Closed', 'Rejected')
+RESULT_COLUMNS = ('item_no', 'report_id', 'officer_id', 'result', 'victim_id')
+
+
+class InvalidBatch(ValueError):
+    """Raised for malformed bulk assignment requests"""
+
+
+def _positive_int(value, field, index=None):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number <= 0:
+        where = f" in item {index}" if index is not None else ""
+        raise InvalidBatch(f"{field}{where} must be a positive integer")
+    return number
+
+
+def parse_assignments(assignments, max_items):
+    """Validate an explicit list of {report_id, officer_id, note} items"""
+    if not isinstance(assignments, list) or not assignments:
+        raise InvalidBatch("assignments must be a non-empty list")
+    if len(assignments) > max_items:
+        raise InvalidBatch(f"At most {max_items} assignments per batch")
+    items = []
+    for index, item in enumerate(assignments):
+        if isinstance(item, (list, tuple)):
+            item = dict(zip(('report_id', 'officer_id', 'note'), item))
+        if not isinstance(item, dict):
+            raise InvalidBatch(f"Item {index} must be an object or a [report_id, officer_id, note] list")
+        items.append((
+            _positive_int(item.get('report_id'), 'report_id', index),
+            _positive_int(item.get('officer_id'), 'officer_id', index),
+            item.get('note') or '',
+        ))
+    return items
+
+
+def _filter_conditions(report_filter):
+    if not isinstance(report_filter, dict):
+        raise InvalidBatch("filter must be an object")
+    status = report_filter.get('status', 'Open')
+    if status not in REPORT_STATUSES:
+        raise InvalidBatch(f"status must be one of {', '.join(REPORT_STATUSES)}")
+    conditions = ["status = %s"]
+    params = [status]
+    if report_filter.get('crime_type'):
+        conditions.append("crime_type = %s")
+        params.append(report_filter['crime_type'])
+    if report_filter.get('unassigned_only', True):
+        conditions.append("assigned_officer_id IS NULL")
+    if report_filter.get('submitted_after'):
+        conditions.append("date_submitted >= %s")
+        params.append(report_filter['submitted_after'])
+    if report_filter.get('submitted_before'):
+        conditions.append("date_submitted < %s")
+        params.append(report_filter['submitted_before'])
+    return ' AND '.join(conditions), params
+
+
+def _filtered_reports(cursor, report_filter, max_items):
+    """(id, crime_type) of the reports matching `report_filter`, oldest first"""
+    where, params = _filter_conditions(report_filter)
+    limit = min(_positive_int(report_filter.get('limit', max_items), 'limit'), max_items)
+    cursor.execute(f"""
+        SELECT id, crime_type FROM reports
+        WHERE {where}
+        ORDER BY date_submitted, id
+        LIMIT %s
+    """, params + [limit])
+    return [(row['id'], row['crime_type']) if isinstance(row, dict) else (row[0], row[1])
+            for row in cursor.fetchall()]
+
+
+def select_by_filter(cursor, report_filter, officer_id, note, max_items):
+    """
+    Items assigning every report matching `report_filter` to one officer,
+    oldest first.  Filter keys: status (default Open), crime_type,
+    unassigned_only (default true), submitted_after, submitted_before, limit.
+    """
+    officer_id = _positive_int(officer_id, 'officer_id')
+    return [(report_id, officer_id, note or '')
+            for report_id, _ in _filtered_reports(cursor, report_filter, max_items)]
+
+
+def select_for_auto_assign(cursor, report_filter, engine, note, max_items):
+    """
+    Items giving each report matching `report_filter` (same keys as
+    select_by_filter) to the officer the assignment engine reserves for it.
+    Reports with no officer available are left out; returns (items, skipped).
+    """
+    items = []
+    skipped = 0
+    for report_id, crime_type in _filtered_reports(cursor, report_filter, max_items):
+        officer_id = engine.reserve(crime_type)
+        if officer_id is None:
+            skipped += 1
+        else:
+            items.append((report_id, officer_id, note or ''))
+    return items, skipped
+
+
+def stored_results(cursor, batch_key):
+    """Results of an already applied batch (empty if there is none)"""
+    cursor.execute("""
+        SELECT i.item_no, i.report_id, i.officer_id, i.result, r.victim_id
+        FROM bulk_assignment_items i
+        LEFT JOIN reports r ON r.id = i.report_id
+        WHERE i.batch_key = %s
+        ORDER BY i.item_no
+    """, (batch_key,))
+    return [_as_dict(row) for row in cursor.fetchall()]
+
+
+def current_officers(cursor, report_ids):
+    """{report_id: assigned_officer_id} of the reports, read before a batch reassigns them"""
+    report_ids = list(report_ids)
+    officers = {}
+    for start in range(0, len(report_ids), STAGE_BATCH_SIZE):
+        chunk = report_ids[start:start + STAGE_BATCH_SIZE]
+        cursor.execute(f"SELECT id, assigned_officer_id FROM reports WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                       chunk)
+        for row in cursor.fetchall():
+            report_id, officer_id = (row['id'], row['assigned_officer_id']) if isinstance(row, dict) else row
+            officers[report_id] = officer_id
+    return officers
+
+
+def apply_batch(cursor, batch_key, items):
+    """Stage `items` under `batch_key` and assign them; returns per-item results"""
+    for start in range(0, len(items), STAGE_BATCH_SIZE):
+        chunk = items[start:start + STAGE_BATCH_SIZE]
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk))
+        params = []
+        for offset, (report_id, officer_id, note) in enumerate(chunk):
+            params.extend([batch_key, start + offset, report_id, officer_id, note])
+        cursor.execute(f"""
+            INSERT INTO bulk_assignment_items (batch_key, item_no, report_id, officer_id, note)
+            VALUES {placeholders}
+        """, params)
+
+    cursor.callproc('BulkAssignOfficers', [batch_key])
+    results = []
+    for result in cursor.stored_results():
+        for row in result.fetchall():
+            results.append(row if isinstance(row, dict) else dict(zip(result.column_names, row)))
+    return results
+
+
+def purge_old_batches(cursor, retention_days):
+    cursor.execute("""
+        DELETE FROM bulk_assignment_items
+        WHERE created_at < NOW() - INTERVAL %s DAY
+    """, (retention_days,))
+    return cursor.rowcount
+
+
+def assignment_notices(results):
+    """Notification items for the officer and victim of each assigned report"""
+    notices = []
+    for row in results:
+        if row['result'] != 'assigned':
+            continue
+        notices.append((row['officer_id'], row['report_id'], ASSIGNED,
+                        f"You have been assigned to report #{row['report_id']}"))
+        notices.append((row['victim_id'], row['report_id'], ASSIGNED,
+                        f"An officer has been assigned to your report #{row['report_id']}"))
+    return notices
+
+
+def summarize(results):
+    summary = {}
+    for row in results:
+        summary[row['result']] = summary.get(row['result'], 0) + 1
+    return summary
+
+
+def _as_dict(row):
+    return row if isinstance(row, dict) else dict(zip(RESULT_COLUMNS, row))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Materialized dashboard counters.
+
+The dashboard_counters table (migration 0005) keeps per-victim, per-officer,
+per-report and global tallies that triggers update on every write to reports
+and evidence, so dashboards read one row instead of aggregating the reports
+table.  reconcile() recomputes the tallies from the base tables and applies
+the difference; it repairs drift (e.g. from foreign-key cascades, which fire
+no triggers) and backfills the table on an existing database.
+
+Usage:
+    python dashboard_counters.py reconcile
+"""
+
+import sys
+import threading
+import time
+
+REPORT_COLUMNS = ('total_reports', 'open_reports', 'investigating_reports',
+                  'closed_reports', 'rejected_reports')
+COUNTER_COLUMNS = REPORT_COLUMNS + ('evidence_count', 'evidence_bytes', 'response_days_total')
+
+STATUS_TALLIES = """
+    COUNT(*),
+    SUM(status = 'Open'),
+    SUM(status = 'Under Investigation'),
+    SUM(status = 'Closed'),
+    SUM(status = 'Rejected')
+"""
+
+
+def get_counters(cursor, scope, owner_id=0):
+    """Counter row for one scope/owner as a dict (zeros if there is none)"""
+    cursor.execute(f"""
+        SELECT {', '.join(COUNTER_COLUMNS)} FROM dashboard_counters
+        WHERE scope = %s AND owner_id = %s
+    """, (scope, owner_id))
+    row = cursor.fetchone()
+    if row is None:
+        return dict.fromkeys(COUNTER_COLUMNS, 0)
+    if not isinstance(row, dict):
+        row = dict(zip(COUNTER_COLUMNS, row))
+    return {column: int(row[column] or 0) for column in COUNTER_COLUMNS}
+
+
+def profile_stats(counters):
+    """The /profile/stats figures from a counter row"""
+    return {
+        "total_reports": counters['total_reports'],
+        "active_cases": counters['total_reports'] - counters['closed_reports'],
+        "completed_cases": counters['closed_reports'],
+        "total_evidence": counters['evidence_count'],
+    }
+
+
+def _expected_counters(cursor):
+    """Recompute every counter row from reports and evidence"""
+    expected = {}
+
+    def add(key, columns, values):
+        row = expected.setdefault(key, dict.fromkeys(COUNTER_COLUMNS, 0))
+        for column, value in zip(columns, values):
+            row[column] += int(value or 0)
+
+    cursor.execute(f"SELECT {STATUS_TALLIES} FROM reports")
+    add(('global', 0), REPORT_COLUMNS, cursor.fetchone())
+
+    cursor.execute(f"SELECT victim_id, {STATUS_TALLIES} FROM reports GROUP BY victim_id")
+    for row in cursor.fetchall():
+        add(('victim', row[0]), REPORT_COLUMNS, row[1:])
+
+    cursor.execute(f"""
+        SELECT assigned_officer_id, {STATUS_TALLIES},
+               SUM(COALESCE(DATEDIFF(assignment_date, date_submitted), 0))
+        FROM reports
+        WHERE assigned_officer_id IS NOT NULL
+        GROUP BY assigned_officer_id
+    """)
+    for row in cursor.fetchall():
+        add(('officer', row[0]), REPORT_COLUMNS + ('response_days_total',), row[1:])
+
+    evidence_columns = ('evidence_count', 'evidence_bytes')
+    cursor.execute("""
+        SELECT e.report_id, r.victim_id, r.assigned_officer_id,
+               COUNT(*), COALESCE(SUM(e.file_size), 0)
+        FROM evidence e
+        JOIN reports r ON r.id = e.report_id
+        GROUP BY e.report_id, r.victim_id, r.assigned_officer_id
+    """)
+    for report_id, victim_id, officer_id, count, size in cursor.fetchall():
+        add(('global', 0), evidence_columns, (count, size))
+        add(('report', report_id), evidence_columns, (count, size))
+        add(('victim', victim_id), evidence_columns, (count, size))
+        if officer_id is not None:
+            add(('officer', officer_id), evidence_columns, (count, size))
+    return expected
+
+
+def reconcile(connection, batch_size=500):
+    """
+    Repair drift in dashboard_counters; returns the number of rows adjusted.
+
+    Expected and stored values are read from one consistent snapshot and the
+    difference is applied as an increment, so trigger updates committed while
+    this runs are not overwritten.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        expected = _expected_counters(cursor)
+        cursor.execute(f"SELECT scope, owner_id, {', '.join(COUNTER_COLUMNS)} FROM dashboard_counters")
+        stored = {(row[0], row[1]): dict(zip(COUNTER_COLUMNS, row[2:])) for row in cursor.fetchall()}
+
+        deltas = []
+        for key in set(expected) | set(stored):
+            want = expected.get(key, {})
+            have = stored.get(key, {})
+            delta = [int(want.get(c, 0)) - int(have.get(c, 0)) for c in COUNTER_COLUMNS]
+            if any(delta):
+                deltas.append(key + tuple(delta))
+
+        columns = ('scope', 'owner_id') + COUNTER_COLUMNS
+        updates = ", ".join(f"{c} = {c} + VALUES({c})" for c in COUNTER_COLUMNS)
+        for start in range(0, len(deltas), batch_size):
+            batch = deltas[start:start + batch_size]
+            row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+            cursor.execute(f"""
+                INSERT INTO dashboard_counters ({', '.join(columns)})
+                VALUES {', '.join([row_placeholder] * len(batch))}
+                ON DUPLICATE KEY UPDATE {updates}
+            """, [value for row in batch for value in row])
+
+        # Report rows whose report is gone are left at zero; drop them
+        cursor.execute("""
+            DELETE c FROM dashboard_counters c
+            LEFT JOIN reports r ON r.id = c.owner_id
+            WHERE c.scope = 'report' AND r.id IS NULL AND c.evidence_count = 0
+        """)
+        connection.commit()
+        return len(deltas)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def start_reconciler(connection_factory, interval=3600):
+    """Run reconcile() now and then every `interval` seconds on a daemon thread"""
+
+    def run():
+        while True:
+            connection = None
+            try:
+                connection = connection_factory()
+                if connection:
+                    repaired = reconcile(connection)
+                    if repaired:
+                        print(f"Dashboard counters: repaired {repaired} rows")
+            except Exception as e:
+                print(f"Dashboard counters: reconcile error: {e}")
+            finally:
+                if connection:
+                    connection.close()
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name="dashboard-counter-reconciler", daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv):
+    import mysql.connector
+    from app import create_app
+
+    if argv[:1] != ['reconcile']:
+        print(__doc__)
+        return 1
+
+    # The database the app is configured for (settings.py and CCRS_* overrides)
+    connection = mysql.connector.connect(**create_app().extensions['resources'].db_config())
+    try:
+        repaired = reconcile(connection)
+        print(f"Reconciled dashboard counters ({repaired} rows adjusted)")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
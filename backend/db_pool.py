@@ -0,0 +1,353 @@
+"""
+MySQL connection pool for the CyberCrime Reporting System backend.
+
+Every route used to open a brand new connection (TCP handshake + auth) and
+close it again when it was done.  The pool keeps a bounded set of open
+connections that are handed out to routes and stored-procedure wrappers and
+returned when the caller closes them.  A leak detector flags connections
+that are held for longer than expected, naming the route that borrowed them.
+"""
+
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolExhausted(Error):
+    """Raised when no connection could be checked out before the timeout"""
+
+
+class _PoolEntry:
+    """A physical MySQL connection owned by the pool"""
+
+    def __init__(self, connection, overflow=False):
+        self.connection = connection
+        self.overflow = overflow
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """
+    Checked-out handle around a pooled connection.
+
+    Behaves like a regular mysql.connector connection, except that close()
+    hands the connection back to the pool.  A new handle is created for every
+    checkout, so closing the same handle twice is harmless.
+    """
+
+    def __init__(self, pool, entry, owner=None):
+        self._pool = pool
+        self._entry = entry
+        self.owner = owner or 'unknown'
+        self.checked_out_at = time.monotonic()
+        self.leak_reported = False
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, self)
+
+    def discard(self):
+        """
+        Give the connection back without reusing it, e.g. with a streaming
+        result still unread: the socket is shut down instead of draining it.
+        """
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, self, discard=True)
+
+    @property
+    def held_for(self):
+        return time.monotonic() - self.checked_out_at
+
+    @property
+    def closed(self):
+        return self._entry is None
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise Error("Connection has already been returned to the pool")
+        return getattr(self._entry.connection, name)
+
+
+class DedicatedConnection:
+    """
+    A connection opened outside the pool, for work that holds one for a long
+    time (a streamed export): it takes no pool slot and the leak detector
+    never sees it.  close() and discard() work as on a PooledConnection.
+    """
+
+    def __init__(self, connect_args, owner=None):
+        self._connection = mysql.connector.connect(**connect_args)
+        self.owner = owner or 'unknown'
+
+    def close(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            ConnectionPool._close_quietly(connection)
+
+    def discard(self):
+        """Shut the socket down instead of draining an unread streaming result"""
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.shutdown()
+            except Exception:
+                pass
+
+    @property
+    def closed(self):
+        return self._connection is None
+
+    def __getattr__(self, name):
+        if self._connection is None:
+            raise Error("Connection has already been closed")
+        return getattr(self._connection, name)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of MySQL connections.
+
+    pool_size     -- connections kept open between requests
+    max_overflow  -- extra short-lived connections opened when the pool is
+                     exhausted; they are closed instead of being pooled
+    timeout       -- seconds to wait for a free connection once both the pool
+                     and the overflow are used up
+    pre_ping      -- ping a connection before handing it out and replace it
+                     if the server has gone away
+    recycle       -- close connections older than this many seconds
+                     (0 disables recycling)
+    leak_threshold -- seconds a connection may be held before the leak
+                      detector reports it (0 disables detection)
+    """
+
+    def __init__(self, connect_args, pool_size=10, max_overflow=5, timeout=5.0,
+                 pre_ping=True, recycle=3600, leak_threshold=30):
+        self.connect_args = dict(connect_args)
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.recycle = recycle
+        self.leak_threshold = leak_threshold
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._pooled = 0
+        self._overflow = 0
+        self._checked_out = 0
+        self._waiting = 0
+        self._active = {}
+        self._leak_detector = None
+        self._stats = {
+            "created": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "overflow_checkouts": 0,
+            "timeouts": 0,
+            "leaks_detected": 0,
+        }
+
+    def get_connection(self, owner=None):
+        """
+        Check out a connection, waiting up to `timeout` seconds.
+
+        `owner` names the borrower (usually the route) in leak reports.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._pooled < self.pool_size:
+                    self._pooled += 1
+                    entry = _PoolEntry(None)
+                    break
+                if self._overflow < self.max_overflow:
+                    self._overflow += 1
+                    self._stats["overflow_checkouts"] += 1
+                    entry = _PoolEntry(None, overflow=True)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolExhausted(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool_size={self.pool_size}, max_overflow={self.max_overflow})"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._checked_out += 1
+            self._stats["checkouts"] += 1
+
+        try:
+            entry = self._prepare(entry)
+        except Exception:
+            with self._cond:
+                self._checked_out -= 1
+                self._forget(entry)
+                self._cond.notify()
+            raise
+
+        handle = PooledConnection(self, entry, owner)
+        with self._cond:
+            self._active[id(handle)] = handle
+        return handle
+
+    def _prepare(self, entry):
+        """Make sure the entry holds a live, non-expired connection"""
+        if entry.connection is not None:
+            now = time.monotonic()
+            if self.recycle and now - entry.created_at > self.recycle:
+                self._close_quietly(entry.connection)
+                entry.connection = None
+                self._bump("recycled")
+            elif self.pre_ping and not self._is_alive(entry.connection):
+                self._close_quietly(entry.connection)
+                entry.connection = None
+                self._bump("discarded")
+
+        if entry.connection is None:
+            entry.connection = mysql.connector.connect(**self.connect_args)
+            entry.created_at = time.monotonic()
+            self._bump("created")
+        return entry
+
+    def _release(self, entry, handle, discard=False):
+        """Return a checked-out entry to the pool"""
+        if handle.leak_reported:
+            print(f"DB pool: connection held by {handle.owner} returned after {handle.held_for:.1f}s")
+        connection = entry.connection
+        reusable = not entry.overflow and not discard
+        if discard:
+            self._bump("discarded")
+            if hasattr(connection, 'shutdown'):
+                try:
+                    connection.shutdown()
+                except Exception:
+                    pass
+        elif reusable:
+            try:
+                # Don't leak an open transaction (or its snapshot) to the next user
+                if connection.in_transaction:
+                    connection.rollback()
+            except Exception:
+                reusable = False
+                self._bump("discarded")
+        if not reusable:
+            self._close_quietly(connection)
+
+        with self._cond:
+            self._active.pop(id(handle), None)
+            self._checked_out -= 1
+            if reusable:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            else:
+                self._forget(entry)
+            self._cond.notify()
+
+    def _forget(self, entry):
+        """Drop an entry from the pool accounting (caller holds the lock)"""
+        if entry.overflow:
+            self._overflow -= 1
+        else:
+            self._pooled -= 1
+
+    def _bump(self, stat):
+        with self._cond:
+            self._stats[stat] += 1
+
+    @staticmethod
+    def _is_alive(connection):
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def find_leaks(self, threshold=None):
+        """List checked-out connections held for longer than `threshold` seconds"""
+        threshold = self.leak_threshold if threshold is None else threshold
+        with self._cond:
+            handles = list(self._active.values())
+        leaks = [h for h in handles if h.held_for > threshold]
+        return [
+            {"owner": h.owner, "held_for": round(h.held_for, 3)}
+            for h in sorted(leaks, key=lambda h: h.checked_out_at)
+        ]
+
+    def check_leaks(self):
+        """Report connections that crossed the leak threshold since the last check"""
+        if not self.leak_threshold:
+            return []
+        with self._cond:
+            handles = list(self._active.values())
+        reported = []
+        for handle in handles:
+            if handle.leak_reported or handle.held_for <= self.leak_threshold:
+                continue
+            handle.leak_reported = True
+            self._bump("leaks_detected")
+            reported.append(handle)
+            print(f"DB pool: possible connection leak - held by {handle.owner} "
+                  f"for {handle.held_for:.1f}s (threshold {self.leak_threshold}s)")
+        return reported
+
+    def start_leak_detector(self, interval=10):
+        """Run check_leaks() every `interval` seconds on a daemon thread"""
+        if not self.leak_threshold or self._leak_detector is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check_leaks()
+                except Exception as e:
+                    print(f"DB pool: leak detector error: {e}")
+
+        self._leak_detector = threading.Thread(target=run, name="db-pool-leak-detector", daemon=True)
+        self._leak_detector.start()
+
+    def metrics(self):
+        """Snapshot of pool usage, for sizing against the worker count"""
+        with self._cond:
+            metrics = dict(self._stats)
+            metrics.update({
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._pooled + self._overflow,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "overflow": self._overflow,
+                "waiting": self._waiting,
+                "leak_threshold": self.leak_threshold,
+            })
+        return metrics
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on return)"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            for entry in idle:
+                self._forget(entry)
+        for entry in idle:
+            self._close_quietly(entry.connection)
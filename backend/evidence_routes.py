@@ -0,0 +1,82 @@
+"""
+Evidence files: moving uploads into the blob store with their rows, and
+serving them back.
+"""
+
+from flask import Blueprint, current_app, send_from_directory
+from werkzeug.utils import secure_filename
+
+from uploads import store_upload
+from evidence_serving import serve_blob
+from extensions import db_cursor, get_blob_store
+
+bp = Blueprint('evidence', __name__)
+
+def store_evidence_files(files):
+    """
+    Move spooled uploads into the blob store; returns [(file, size, sha256, blob path)].
+
+    Call this before the transaction's first write: a blob commit fsyncs
+    files of up to MAX_FILE_SIZE, and the report and evidence triggers lock
+    the global dashboard counter row until commit.  Blobs of a transaction
+    that is then rolled back are unreferenced and removed by the blob GC.
+    """
+    blob_store = get_blob_store()
+    stored = []
+    for file in files:
+        if file and file.filename:
+            stored.append((file, *store_upload(file, blob_store)))
+    return stored
+
+def insert_evidence(cursor, report_id, stored, uploaded_by, description):
+    """Insert the evidence rows for files stored by store_evidence_files()"""
+    saved = []
+    for file, file_size, sha256, blob_path in stored:
+        # The digest prefix keeps same-named uploads from colliding
+        unique_filename = f"{report_id}_{sha256[:12]}_{secure_filename(file.filename)}"
+        saved.append({
+            "filename": unique_filename,
+            "original_name": file.filename,
+            "content_type": file.content_type,
+            "file_size": file_size,
+            "sha256": sha256
+        })
+        
+        # Save evidence record to database
+        cursor.execute("""
+            INSERT INTO evidence (report_id, filename, original_name, file_path, file_size, content_type, sha256, uploaded_by, description)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (report_id, unique_filename, file.filename, blob_path, file_size, file.content_type, sha256, uploaded_by, description))
+    return saved
+
+def public_evidence(ev):
+    """Evidence fields safe to return to the client"""
+    return {
+        "filename": ev['filename'],
+        "original_name": ev['original_name'],
+        "content_type": ev['content_type'],
+        "file_size": ev['file_size'],
+        "sha256": ev['sha256']
+    }
+
+@bp.route('/uploads/<filename>')
+def uploaded_file(filename):
+    """
+    Serve uploaded files (for development/testing only).
+    
+    Evidence is resolved to its content-addressed blob and served with
+    Range, ETag and caching support; files that predate the blob store are
+    still served from the flat upload folder.
+    """
+    with db_cursor(dictionary=True) as (connection, cursor):
+        cursor.execute("""
+            SELECT sha256, content_type, original_name FROM evidence
+            WHERE filename = %s AND sha256 IS NOT NULL
+            LIMIT 1
+        """, (filename,))
+        evidence = cursor.fetchone()
+    
+    if evidence:
+        return serve_blob(get_blob_store().path_for(evidence['sha256']), evidence['sha256'],
+                          evidence['content_type'], evidence['original_name'])
+    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
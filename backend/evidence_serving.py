@@ -0,0 +1,166 @@
+"""
+HTTP serving of evidence blobs: conditional GET, byte ranges and offload.
+
+Blobs are immutable and named by their SHA-256, so the digest is used as a
+strong ETag and responses may be cached for a long time.  Single ranges and
+the conditional headers are handled by Werkzeug's send_file; several ranges
+in one request get a multipart/byteranges response, with the unsatisfiable
+ones dropped (RFC 9110 14.2): 416 only when none is left.  Optionally the bytes are
+left to a fronting web server via X-Sendfile (Apache, lighttpd) or
+X-Accel-Redirect (nginx), so the Python worker only produces headers.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+from flask import Response, abort, current_app, request, send_file
+from werkzeug.http import http_date, is_resource_modified
+
+CHUNK_SIZE = 64 * 1024
+CACHE_MAX_AGE = 365 * 24 * 3600
+
+
+def serve_blob(path, sha256, content_type=None, download_name=None):
+    """Build the response for one evidence blob"""
+    content_type = content_type or 'application/octet-stream'
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        # A row whose blob is gone: missing, like a legacy file would be
+        print(f"Evidence blob missing: {path}")
+        abort(404)
+    last_modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+
+    # A cheap 304 before anything else, including the offload modes
+    if not is_resource_modified(request.environ, etag=sha256, last_modified=last_modified):
+        response = Response(status=304)
+        _add_cache_headers(response, sha256, last_modified)
+        return response
+
+    mode = current_app.config.get('EVIDENCE_SENDFILE')
+    if mode:
+        return _offload(mode, path, sha256, content_type, download_name, last_modified)
+
+    ranges = _requested_ranges(sha256, last_modified, stat.st_size)
+    if ranges and len(ranges) > 1:
+        return _multipart_ranges(path, ranges, stat.st_size, sha256, content_type, last_modified)
+    if ranges and len(request.range.ranges) > 1:
+        # Several requested, one satisfiable: send_file would see them all and answer 416
+        return _single_range(path, ranges[0], stat.st_size, sha256, content_type, last_modified)
+
+    response = send_file(
+        path,
+        mimetype=content_type,
+        download_name=download_name,
+        conditional=True,
+        etag=sha256,
+        last_modified=last_modified,
+        max_age=CACHE_MAX_AGE,
+    )
+    _add_cache_headers(response, sha256, last_modified)
+    return response
+
+
+def _add_cache_headers(response, sha256, last_modified):
+    response.set_etag(sha256)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = f'private, max-age={CACHE_MAX_AGE}, immutable'
+    response.headers['Accept-Ranges'] = 'bytes'
+
+
+def _requested_ranges(sha256, last_modified, size):
+    """Return the satisfiable (start, stop) ranges of the request, or None"""
+    header = request.range
+    if header is None or header.units != 'bytes':
+        return None
+
+    # If-Range: only honour the range when the client's copy is current
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != sha256:
+        return None
+    if if_range.date is not None and if_range.date < last_modified.replace(microsecond=0):
+        return None
+
+    ranges = []
+    for start, stop in header.ranges:
+        if start < 0:
+            start, stop = max(size + start, 0), size
+        stop = size if stop is None else min(stop, size)
+        if start < stop:
+            ranges.append((start, stop))
+    return ranges or None
+
+
+def _read_range(file, start, stop):
+    file.seek(start)
+    remaining = stop - start
+    while remaining:
+        chunk = file.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _single_range(path, byte_range, size, sha256, content_type, last_modified):
+    """206 response for one range, streamed from the file"""
+    start, stop = byte_range
+
+    def generate():
+        with open(path, 'rb') as file:
+            yield from _read_range(file, start, stop)
+
+    response = Response(generate(), status=206, mimetype=content_type)
+    response.content_length = stop - start
+    response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+    _add_cache_headers(response, sha256, last_modified)
+    return response
+
+
+def _multipart_ranges(path, ranges, size, sha256, content_type, last_modified):
+    """206 multipart/byteranges response, streamed from the file"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for start, stop in ranges:
+        head = (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n"
+        ).encode()
+        parts.append((head, start, stop))
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    length = sum(len(head) + stop - start for head, start, stop in parts) + len(tail)
+
+    def generate():
+        with open(path, 'rb') as file:
+            for head, start, stop in parts:
+                yield head
+                yield from _read_range(file, start, stop)
+            yield tail
+
+    response = Response(generate(), status=206,
+                        mimetype=f'multipart/byteranges; boundary={boundary}')
+    response.content_length = length
+    _add_cache_headers(response, sha256, last_modified)
+    return response
+
+
+def _offload(mode, path, sha256, content_type, download_name, last_modified):
+    """Let the fronting web server stream the file (it handles Range itself)"""
+    response = Response(mimetype=content_type)
+    if mode == 'x-accel-redirect':
+        # nginx: EVIDENCE_ACCEL_PREFIX is an `internal` location aliased to BLOB_FOLDER
+        relative = os.path.relpath(path, current_app.config['BLOB_FOLDER']).replace(os.sep, '/')
+        prefix = current_app.config.get('EVIDENCE_ACCEL_PREFIX', '/protected-evidence/')
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + relative
+    elif mode == 'x-sendfile':
+        response.headers['X-Sendfile'] = os.path.abspath(path)
+    else:
+        raise ValueError(f"Unknown EVIDENCE_SENDFILE mode: {mode}")
+
+    if download_name:
+        response.headers.set('Content-Disposition', 'inline', filename=download_name)
+    _add_cache_headers(response, sha256, last_modified)
+    response.headers['Date'] = http_date()
+    return response
@@ -0,0 +1,135 @@
+"""
+Streaming exports of reports, evidence metadata and audit logs.
+
+An export runs one SELECT on an unbuffered cursor and turns the rows into
+NDJSON or CSV in batches of fetchmany(), optionally through a gzip stream,
+so memory use does not depend on how many rows are exported.  Rows come
+out in primary-key order.
+
+Filters (query arguments, all optional):
+
+    from, to     date range (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS; `to` is
+                 exclusive) on the submission / upload / log timestamp
+    status       report status (for evidence, the status of its report) or
+                 audit log status
+    officer_id   assigned officer (for audit logs, the acting user)
+"""
+
+import csv
+import io
+import zlib
+from datetime import datetime
+
+from serialization import dumps
+
+EXPORTS = {
+    'reports': {
+        'query': """
+            SELECT r.id, r.victim_id, v.name AS victim_name, r.crime_type, r.description,
+                   r.date_occurred, r.date_submitted, r.location, r.status, r.priority,
+                   r.assigned_officer_id, o.name AS assigned_officer_name,
+                   r.assignment_date, r.assignment_note
+            FROM reports r
+            JOIN users v ON v.id = r.victim_id
+            LEFT JOIN users o ON o.id = r.assigned_officer_id
+        """,
+        'date': 'r.date_submitted', 'status': 'r.status', 'officer': 'r.assigned_officer_id', 'order': 'r.id',
+    },
+    'evidence': {
+        'query': """
+            SELECT e.id, e.report_id, e.original_name, e.content_type, e.file_size, e.sha256,
+                   e.description, e.uploaded_by, e.upload_date,
+                   r.status AS report_status, r.assigned_officer_id
+            FROM evidence e
+            JOIN reports r ON r.id = e.report_id
+        """,
+        'date': 'e.upload_date', 'status': 'r.status', 'officer': 'r.assigned_officer_id', 'order': 'e.id',
+    },
+    'audit_logs': {
+        'query': """
+            SELECT al.id, al.timestamp, al.user_id, al.actor_name AS user_name, al.actor_role AS user_role,
+                   al.action, al.details, al.status, al.ip_address
+            FROM audit_logs al
+        """,
+        'date': 'al.timestamp', 'status': 'al.status', 'officer': 'al.user_id', 'order': 'al.id',
+    },
+}
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+
+class InvalidExport(ValueError):
+    """Raised for unknown export formats and malformed filters"""
+
+
+def _parse_time(value, name):
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise InvalidExport(f"{name} must be a date (YYYY-MM-DD) or datetime (YYYY-MM-DD HH:MM:SS)")
+
+
+def build_export_query(kind, args):
+    """SQL and parameters for export `kind` filtered by the request arguments"""
+    spec = EXPORTS[kind]
+    conditions = []
+    params = []
+    if args.get('from'):
+        conditions.append(f"{spec['date']} >= %s")
+        params.append(_parse_time(args['from'], 'from'))
+    if args.get('to'):
+        conditions.append(f"{spec['date']} < %s")
+        params.append(_parse_time(args['to'], 'to'))
+    if args.get('status'):
+        conditions.append(f"{spec['status']} = %s")
+        params.append(args['status'])
+    if args.get('officer_id'):
+        try:
+            params.append(int(args['officer_id']))
+        except ValueError:
+            raise InvalidExport("officer_id must be an integer")
+        conditions.append(f"{spec['officer']} = %s")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"{spec['query']} {where} ORDER BY {spec['order']}", params
+
+
+def ndjson_chunks(cursor, batch_size=1000):
+    """One JSON object per line, a batch of rows per chunk"""
+    columns = cursor.column_names
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield ''.join(dumps(dict(zip(columns, row))) + '\n' for row in rows).encode()
+
+
+def csv_chunks(cursor, batch_size=1000):
+    """A header line, then a batch of CSV rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(cursor.column_names)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if rows:
+            writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        if not rows:
+            break
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into one gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
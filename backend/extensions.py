@@ -0,0 +1,326 @@
+"""
+Per-app services for the Flask app built by create_app().
+
+The light ones (request profiler, response cache, rate limiter,
+notification hub) are created with the app.  The heavy ones (connection
+pool, schema check and the background jobs it starts, audit writer,
+password hashing pool, blob store, assignment engine) are created by the
+app's Resources on first use, so importing the code or building an app
+opens no connection and starts no thread or process.
+
+Everything lives in app.extensions.  Inside a request the proxies and
+get_*() helpers below find the current app's; background threads and the
+async server hold the Resources object itself.
+"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+
+from flask import current_app, has_request_context, request, session
+from mysql.connector import Error
+from werkzeug.local import LocalProxy
+
+from db_pool import ConnectionPool, DedicatedConnection
+from audit_writer import AuditWriter
+from blob_store import BlobStore
+from profiling import RequestProfiler, InstrumentedCursor
+from schema_check import ensure_schema
+from notifications import NotificationHub
+from dashboard_counters import start_reconciler
+from response_cache import ResponseCache, make_shared_store
+from rate_limit import RateLimiter, make_shared_buckets
+from assignment_engine import AssignmentEngine
+from audit_partitions import start_maintenance
+from password_hashing import PasswordHasher
+
+
+class DatabaseUnavailable(Exception):
+    """Raised by db_cursor when no database connection could be obtained"""
+
+
+def init_extensions(app):
+    """Create the app's services; the heavy ones wait for first use"""
+    config = app.config
+
+    # Per-route SQL counts, DB/serialization/wall time and the slow-query log
+    profiler = RequestProfiler(
+        slow_query_threshold=config['SLOW_QUERY_THRESHOLD'],
+        slow_log_size=config['SLOW_QUERY_LOG_SIZE']
+    )
+    profiler.init_app(app)
+
+    # Cache for read-heavy GET endpoints, invalidated by tag from the write paths
+    cache = ResponseCache(
+        max_entries=config['CACHE_MAX_ENTRIES'],
+        default_ttl=config['CACHE_DEFAULT_TTL'],
+        shared=make_shared_store(config['CACHE_SHARED_URL']),
+        local_ttl=config['CACHE_LOCAL_TTL']
+    )
+    cache.enabled = config['CACHE_ENABLED']
+    profiler.register_gauges('response_cache', 'Response cache counters', cache.stats)
+
+    # Token buckets and concurrency caps for the auth, upload and export routes
+    limiter = RateLimiter(
+        config['RATE_LIMITS'],
+        shared=make_shared_buckets(config['RATE_LIMIT_SHARED_URL']),
+        max_keys=config['RATE_LIMIT_MAX_KEYS'],
+        queue_timeout=config['RATE_LIMIT_QUEUE_TIMEOUT']
+    )
+    limiter.enabled = config['RATE_LIMIT_ENABLED']
+    profiler.register_gauges('rate_limit', 'Rate limiter counters', limiter.stats)
+
+    # In-process fan-out of committed notifications to open SSE streams
+    hub = NotificationHub()
+    profiler.register_gauges('notification_hub', 'Notification stream fan-out', hub.stats)
+
+    app.extensions['profiler'] = profiler
+    app.extensions['response_cache'] = cache
+    app.extensions['rate_limiter'] = limiter
+    app.extensions['notification_hub'] = hub
+    app.extensions['resources'] = Resources(app)
+
+
+profiler = LocalProxy(lambda: current_app.extensions['profiler'])
+response_cache = LocalProxy(lambda: current_app.extensions['response_cache'])
+rate_limiter = LocalProxy(lambda: current_app.extensions['rate_limiter'])
+notification_hub = LocalProxy(lambda: current_app.extensions['notification_hub'])
+
+
+class Resources:
+    """An app's heavy resources, each created on first use"""
+
+    def __init__(self, app):
+        self.config = app.config
+        self.profiler = app.extensions['profiler']
+        self.schema_capabilities = None
+        self._db_pool = None
+        self._audit_writer = None
+        self._password_hasher = None
+        self._blob_store = None
+        self._assignment_engine = None
+        self._db_pool_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._audit_writer_lock = threading.Lock()
+        self._password_hasher_lock = threading.Lock()
+        self._assignment_engine_lock = threading.Lock()
+
+    def db_config(self):
+        """mysql.connector connection arguments from the app config"""
+        return {
+            'host': self.config['MYSQL_HOST'],
+            'user': self.config['MYSQL_USER'],
+            'password': self.config['MYSQL_PASSWORD'],
+            'database': self.config['MYSQL_DB']
+        }
+
+    def db_pool(self):
+        """Get (and lazily create) the shared database connection pool"""
+        if self._db_pool is None:
+            with self._db_pool_lock:
+                if self._db_pool is None:
+                    pool = ConnectionPool(
+                        self.db_config(),
+                        pool_size=self.config['DB_POOL_SIZE'],
+                        max_overflow=self.config['DB_POOL_MAX_OVERFLOW'],
+                        timeout=self.config['DB_POOL_TIMEOUT'],
+                        pre_ping=self.config['DB_POOL_PRE_PING'],
+                        recycle=self.config['DB_POOL_RECYCLE'],
+                        leak_threshold=self.config['DB_POOL_LEAK_THRESHOLD']
+                    )
+                    pool.start_leak_detector()
+                    self.profiler.register_gauges('db_pool', 'Connection pool counters', pool.metrics)
+                    self._db_pool = pool
+        return self._db_pool
+
+    def connection(self, label=None):
+        """Get a pooled database connection; close() returns it to the pool"""
+        try:
+            return self.db_pool().get_connection(owner=connection_owner(label))
+        except Error as e:
+            print(f"Error connecting to MySQL Database: {e}")
+            return None
+
+    def dedicated_connection(self, label=None):
+        """Get a connection of its own, outside the pool; close() closes it"""
+        try:
+            return DedicatedConnection(self.db_config(), owner=connection_owner(label))
+        except Error as e:
+            print(f"Error connecting to MySQL Database: {e}")
+            return None
+
+    def schema(self):
+        """Validate (and auto-migrate) the schema on first call; return its capabilities"""
+        if self.schema_capabilities is None:
+            with self._schema_lock:
+                if self.schema_capabilities is None:
+                    connection = self.connection('schema_check')
+                    if not connection:
+                        raise DatabaseUnavailable()
+                    try:
+                        capabilities = ensure_schema(connection, self.config['SCHEMA_AUTO_MIGRATE'])
+                    finally:
+                        connection.close()
+                    print(f"Database schema validated ({len(capabilities.columns)} tables)")
+                    if self.config['DASHBOARD_RECONCILE_INTERVAL']:
+                        start_reconciler(lambda: self.connection('dashboard_reconcile'),
+                                         self.config['DASHBOARD_RECONCILE_INTERVAL'])
+                    if self.config['AUDIT_MAINTENANCE_INTERVAL']:
+                        start_maintenance(lambda: self.connection('audit_maintenance'),
+                                          self.config['AUDIT_MAINTENANCE_INTERVAL'],
+                                          self.config['AUDIT_RETENTION_MONTHS'],
+                                          self.config['AUDIT_ARCHIVE_FOLDER'])
+                    self.schema_capabilities = capabilities
+        return self.schema_capabilities
+
+    def audit_writer(self):
+        """Get (and lazily start) the background audit log writer"""
+        if self._audit_writer is None:
+            with self._audit_writer_lock:
+                if self._audit_writer is None:
+                    writer = AuditWriter(
+                        lambda: self.connection('audit_writer'),
+                        batch_size=self.config['AUDIT_BATCH_SIZE'],
+                        flush_interval=self.config['AUDIT_FLUSH_INTERVAL'],
+                        max_queue=self.config['AUDIT_QUEUE_SIZE'],
+                        spill_path=self.config['AUDIT_SPILL_FILE']
+                    )
+                    atexit.register(writer.close)
+                    self._audit_writer = writer
+        return self._audit_writer
+
+    def password_hasher(self):
+        """Get (and lazily create) the password hashing pool"""
+        if self._password_hasher is None:
+            with self._password_hasher_lock:
+                if self._password_hasher is None:
+                    hasher = PasswordHasher(
+                        method=self.config['PASSWORD_HASH_METHOD'],
+                        workers=self.config['PASSWORD_HASH_WORKERS'],
+                        max_pending=self.config['PASSWORD_HASH_MAX_PENDING'],
+                        timeout=self.config['PASSWORD_HASH_TIMEOUT']
+                    )
+                    atexit.register(hasher.close)
+                    self.profiler.register_gauges('password_hashing', 'Password hashing pool counters',
+                                                  hasher.stats)
+                    self._password_hasher = hasher
+        return self._password_hasher
+
+    def blob_store(self):
+        """Get (and lazily create) the evidence blob store"""
+        if self._blob_store is None:
+            self._blob_store = BlobStore(self.config['BLOB_FOLDER'])
+        return self._blob_store
+
+    def assignment_engine(self):
+        """Get (and lazily load) the assignment engine, reloading it when stale"""
+        engine = self._assignment_engine
+        if engine is None or engine.age() > self.config['AUTO_ASSIGN_RELOAD_INTERVAL']:
+            with self._assignment_engine_lock:
+                engine = self._assignment_engine
+                if engine is None:
+                    engine = AssignmentEngine(max_caseload=self.config['AUTO_ASSIGN_MAX_CASELOAD'])
+                if engine.age() is None or engine.age() > self.config['AUTO_ASSIGN_RELOAD_INTERVAL']:
+                    with self.cursor(label='assignment_engine') as (connection, cursor):
+                        officers = engine.load(cursor)
+                    print(f"Assignment engine loaded ({officers} active officers)")
+                if self._assignment_engine is None:
+                    self._assignment_engine = engine
+                    self.profiler.register_gauges('assignment_engine', 'Assignment engine counters', engine.stats)
+        return engine
+
+    def refresh_caseloads(self, officer_ids):
+        """Re-read some officers' caseloads into a loaded engine after their cases changed"""
+        if self._assignment_engine is None:
+            return
+        try:
+            with self.cursor(label='assignment_engine') as (connection, cursor):
+                self._assignment_engine.refresh_officers(cursor, officer_ids)
+        except Exception as e:
+            print(f"Error refreshing officer caseloads: {e}")
+
+    def forget_officer(self, user_id):
+        """Drop a deactivated officer from a loaded engine"""
+        if self._assignment_engine is not None:
+            self._assignment_engine.remove(user_id)
+
+    @contextmanager
+    def cursor(self, dictionary=False, label=None):
+        """
+        Borrow a connection and cursor for the duration of a with-block.
+
+        Both are closed (and the connection returned to the pool) on every exit
+        path, including early returns and exceptions.
+        """
+        connection = self.connection(label)
+        if not connection:
+            raise DatabaseUnavailable()
+        try:
+            cursor = InstrumentedCursor(connection.cursor(dictionary=dictionary), self.profiler)
+            try:
+                yield connection, cursor
+            finally:
+                try:
+                    cursor.close()
+                except Error as e:
+                    print(f"Error closing cursor: {e}")
+        finally:
+            connection.close()
+
+
+def connection_owner(label=None):
+    """Describe who is borrowing a connection, for the leak detector"""
+    owner = request.endpoint if has_request_context() else None
+    if label:
+        owner = f"{owner}:{label}" if owner else label
+    return owner or 'background'
+
+
+# -- the current app's resources --
+
+def resources():
+    return current_app.extensions['resources']
+
+def get_db_pool():
+    return resources().db_pool()
+
+def get_db_connection(label=None):
+    return resources().connection(label)
+
+def get_dedicated_connection(label=None):
+    return resources().dedicated_connection(label)
+
+def db_cursor(dictionary=False, label=None):
+    return resources().cursor(dictionary, label)
+
+def get_schema():
+    return resources().schema()
+
+def get_audit_writer():
+    return resources().audit_writer()
+
+def get_password_hasher():
+    return resources().password_hasher()
+
+def get_blob_store():
+    return resources().blob_store()
+
+def get_assignment_engine():
+    return resources().assignment_engine()
+
+def refresh_caseloads(officer_ids):
+    resources().refresh_caseloads(officer_ids)
+
+def forget_officer(user_id):
+    resources().forget_officer(user_id)
+
+def log_audit_event(user, action, details, status="Success", ip_address="127.0.0.1"):
+    """Queue an audit event for the background writer"""
+    # Get user_id from session if available; the writer resolves it from
+    # the email otherwise, with one lookup per batch
+    user_id = session.get('user_id') if has_request_context() else None
+    email = session.get('email') if has_request_context() else None
+    role = session.get('role') if has_request_context() else None
+
+    get_audit_writer().submit(action, details, status, ip_address, user_id=user_id, email=email,
+                              actor_name=user, actor_role=role)
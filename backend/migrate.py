@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for CyberCrime Reporting System
+
+Migrations live in migrations/ as NNNN_description.sql files and are applied
+in version order on top of database_schema.sql.  Applied versions are
+recorded in the schema_migrations table, so running this against an existing
+production database only applies what is missing.
+
+Usage:
+    python migrate.py            apply pending migrations
+    python migrate.py --status   list applied and pending migrations
+
+A new database is created with `flask --app wsgi init-db`, which applies
+the migrations too.
+"""
+
+import hashlib
+import os
+import re
+import sys
+
+import mysql.connector
+from mysql.connector import Error
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def split_sql_statements(sql):
+    """
+    Split a SQL script into statements.
+
+    Understands the mysql client's DELIMITER directive (used around stored
+    procedures and triggers), quoted strings and -- / # comments, which a
+    plain split on ';' does not.
+    """
+    statements = []
+    delimiter = ';'
+    current = []
+    quote = None
+
+    for line in sql.splitlines(keepends=True):
+        if quote is None and not ''.join(current).strip():
+            stripped = line.strip()
+            if stripped.upper().startswith('DELIMITER '):
+                delimiter = stripped.split(None, 1)[1]
+                continue
+            if stripped.startswith('--') or stripped.startswith('#'):
+                continue
+
+        i = 0
+        while i < len(line):
+            char = line[i]
+            if quote:
+                current.append(char)
+                if char == '\\' and quote != '`' and i + 1 < len(line):
+                    current.append(line[i + 1])
+                    i += 1
+                elif char == quote:
+                    quote = None
+            elif char in ("'", '"', '`'):
+                quote = char
+                current.append(char)
+            elif line.startswith('-- ', i) or char == '#':
+                # Trailing comment: drop the rest of the line
+                current.append('\n')
+                break
+            elif line.startswith(delimiter, i):
+                statement = ''.join(current).strip()
+                if statement:
+                    statements.append(statement)
+                current = []
+                i += len(delimiter)
+                continue
+            else:
+                current.append(char)
+            i += 1
+
+    statement = ''.join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def load_migrations(directory=MIGRATIONS_DIR):
+    """Return (version, name, path, checksum) for every migration file, in order"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        path = os.path.join(directory, filename)
+        with open(path, 'rb') as file:
+            checksum = hashlib.sha256(file.read()).hexdigest()
+        migrations.append((int(match.group(1)), match.group(2), path, checksum))
+    migrations.sort()
+
+    versions = [m[0] for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_migrations(cursor):
+    """Return {version: checksum} for migrations already applied"""
+    ensure_migrations_table(cursor)
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return {version: checksum for version, checksum in cursor.fetchall()}
+
+
+def pending_migrations(connection, directory=MIGRATIONS_DIR):
+    """Return the migrations that have not been applied yet"""
+    cursor = connection.cursor()
+    try:
+        applied = applied_migrations(cursor)
+    finally:
+        cursor.close()
+    return [m for m in load_migrations(directory) if m[0] not in applied]
+
+
+def apply_migrations(connection, directory=MIGRATIONS_DIR):
+    """
+    Apply pending migrations in order and return the versions applied.
+
+    MySQL commits DDL implicitly, so a migration is recorded only after all
+    of its statements succeeded; a failure stops the run at that migration.
+    """
+    cursor = connection.cursor()
+    applied_now = []
+    try:
+        applied = applied_migrations(cursor)
+        for version, name, path, checksum in load_migrations(directory):
+            if version in applied:
+                if applied[version] != checksum:
+                    print(f"Warning: migration {version:04d}_{name} was modified after it was applied")
+                continue
+
+            with open(path, 'r') as file:
+                statements = split_sql_statements(file.read())
+
+            print(f"Applying migration {version:04d}_{name} ({len(statements)} statements)")
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("""
+                INSERT INTO schema_migrations (version, name, checksum)
+                VALUES (%s, %s, %s)
+            """, (version, name, checksum))
+            connection.commit()
+            applied_now.append(version)
+    finally:
+        cursor.close()
+    return applied_now
+
+
+def print_status(connection, directory=MIGRATIONS_DIR):
+    cursor = connection.cursor()
+    try:
+        applied = applied_migrations(cursor)
+    finally:
+        cursor.close()
+    for version, name, path, checksum in load_migrations(directory):
+        if version not in applied:
+            state = "pending"
+        elif applied[version] != checksum:
+            state = "applied (modified since)"
+        else:
+            state = "applied"
+        print(f"  {version:04d}_{name}: {state}")
+
+
+def main(argv):
+    from app import create_app
+
+    try:
+        # The database the app is configured for (settings.py and CCRS_* overrides)
+        connection = mysql.connector.connect(**create_app().extensions['resources'].db_config())
+    except Error as e:
+        print(f"Error: {e}")
+        return 1
+
+    try:
+        if '--status' in argv:
+            print_status(connection)
+        else:
+            versions = apply_migrations(connection)
+            if versions:
+                print(f"Applied {len(versions)} migration(s)")
+            else:
+                print("Database schema is up to date")
+        return 0
+    except Error as e:
+        print(f"Migration failed: {e}")
+        return 1
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,33 @@
+-- Secondary indexes for the hot access paths
+--
+-- Added with ALGORITHM=INPLACE, LOCK=NONE so they can be built online on an
+-- existing database while it keeps serving reads and writes.
+--
+--   /victim/reports, /profile/stats (victim)
+--       WHERE victim_id = ? ORDER BY date_submitted DESC
+--   /officer/assigned_cases, /profile/stats (officer)
+--       WHERE assigned_officer_id = ? [AND status = ?] ORDER BY date_submitted DESC
+--   /victim/report/<id>, /officer/case/<id>/evidence
+--       WHERE report_id = ? ORDER BY upload_date DESC
+--   /officer/case/<id>/logs, /victim/report/<id>/logs
+--       WHERE report_id = ? ORDER BY log_date DESC
+--   /admin/audit_logs, audit_trail_view
+--       ORDER BY timestamp DESC LIMIT n
+
+ALTER TABLE reports
+    ADD INDEX idx_reports_victim_submitted (victim_id, date_submitted),
+    ADD INDEX idx_reports_officer_submitted (assigned_officer_id, date_submitted),
+    ADD INDEX idx_reports_officer_status (assigned_officer_id, status, date_submitted),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE evidence
+    ADD INDEX idx_evidence_report_upload (report_id, upload_date),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE case_logs
+    ADD INDEX idx_case_logs_report_date (report_id, log_date),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE audit_logs
+    ADD INDEX idx_audit_logs_timestamp (timestamp),
+    ALGORITHM=INPLACE, LOCK=NONE;
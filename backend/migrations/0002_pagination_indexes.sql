@@ -0,0 +1,15 @@
+-- Keyset pagination indexes
+--
+--   /admin/all_reports   ORDER BY date_submitted DESC, id DESC LIMIT n
+--   /admin/users         WHERE is_active = TRUE ORDER BY created_at DESC, id DESC LIMIT n
+--
+-- InnoDB secondary indexes carry the primary key, so ties on the sort
+-- column are already ordered by id.
+
+ALTER TABLE reports
+    ADD INDEX idx_reports_submitted (date_submitted),
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+ALTER TABLE users
+    ADD INDEX idx_users_active_created (is_active, created_at),
+    ALGORITHM=INPLACE, LOCK=NONE;
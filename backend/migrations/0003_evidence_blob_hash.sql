@@ -0,0 +1,17 @@
+-- Content-addressed evidence storage
+--
+-- evidence.sha256 names the blob holding the file's bytes
+-- (uploads/blobs/ab/cd/<sha256>).  Several rows may share one blob; the
+-- number of rows per digest is the blob's reference count, and blobs with
+-- none are removed by `python blob_store.py gc`.  Rows uploaded before this
+-- migration keep sha256 NULL until `python blob_store.py migrate` rehashes
+-- their files.
+--
+--   /uploads/<filename>   WHERE filename = ?
+--   blob GC               WHERE sha256 IN (...) GROUP BY sha256
+
+ALTER TABLE evidence
+    ADD COLUMN sha256 CHAR(64) NULL AFTER content_type,
+    ADD INDEX idx_evidence_sha256 (sha256),
+    ADD INDEX idx_evidence_filename (filename),
+    ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,25 @@
+-- In-app notifications
+--
+-- One row per recipient, written in the same transaction as the event that
+-- caused it (officer assignment, status change, new evidence, case log).
+-- Ids are monotonic per table and double as SSE event ids, so a client
+-- reconnecting with Last-Event-ID resumes with `id > ?`.
+--
+--   /notifications                 WHERE user_id = ? ORDER BY id DESC LIMIT ?
+--   /notifications/stream resume   WHERE user_id = ? AND id > ? ORDER BY id
+--   unread count                   WHERE user_id = ? AND is_read = FALSE
+--   mark-read by id range          WHERE user_id = ? AND is_read = FALSE AND id BETWEEN ? AND ?
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    report_id INT NULL,
+    type VARCHAR(50) NOT NULL,
+    message VARCHAR(255) NOT NULL,
+    is_read BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_notifications_user_id (user_id, id),
+    INDEX idx_notifications_user_unread (user_id, is_read, id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (report_id) REFERENCES reports(id) ON DELETE CASCADE
+);
@@ -0,0 +1,185 @@
+-- Materialized dashboard counters
+--
+-- One row per (scope, owner_id): 'global' (owner 0), 'victim' and 'officer'
+-- (owner = users.id) hold report tallies by status plus evidence count and
+-- bytes; 'report' rows (owner = reports.id) hold only the evidence figures,
+-- which is what lets a reassignment or delete move them between owners.
+--
+-- The triggers below keep the rows current in the same transaction as the
+-- write, whichever code path makes it (routes, stored procedures, other
+-- triggers).  Foreign-key cascades do not fire triggers, so drift is
+-- possible; `python dashboard_counters.py reconcile` (also run periodically
+-- by the app) recomputes the figures and applies the difference.
+--
+--   /profile/stats     WHERE scope = ? AND owner_id = ?
+--   /admin/analytics   WHERE scope = 'global' AND owner_id = 0
+--                      WHERE scope = 'officer' AND owner_id IN (...)
+--                      WHERE scope = 'report' ORDER BY evidence_count DESC LIMIT 10
+
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    scope ENUM('global', 'victim', 'officer', 'report') NOT NULL,
+    owner_id INT NOT NULL,
+    total_reports INT NOT NULL DEFAULT 0,
+    open_reports INT NOT NULL DEFAULT 0,
+    investigating_reports INT NOT NULL DEFAULT 0,
+    closed_reports INT NOT NULL DEFAULT 0,
+    rejected_reports INT NOT NULL DEFAULT 0,
+    evidence_count INT NOT NULL DEFAULT 0,
+    evidence_bytes BIGINT NOT NULL DEFAULT 0,
+    response_days_total BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (scope, owner_id),
+    INDEX idx_dashboard_counters_evidence (scope, evidence_count)
+);
+
+DELIMITER //
+
+-- Add p_delta reports in p_status to one counter row
+CREATE PROCEDURE BumpReportCounters(
+    IN p_scope VARCHAR(10),
+    IN p_owner_id INT,
+    IN p_status VARCHAR(50),
+    IN p_delta INT,
+    IN p_response_days INT
+)
+BEGIN
+    INSERT INTO dashboard_counters
+        (scope, owner_id, total_reports, open_reports, investigating_reports,
+         closed_reports, rejected_reports, response_days_total)
+    VALUES (
+        p_scope, p_owner_id, p_delta,
+        IF(p_status = 'Open', p_delta, 0),
+        IF(p_status = 'Under Investigation', p_delta, 0),
+        IF(p_status = 'Closed', p_delta, 0),
+        IF(p_status = 'Rejected', p_delta, 0),
+        p_delta * COALESCE(p_response_days, 0)
+    )
+    ON DUPLICATE KEY UPDATE
+        total_reports = total_reports + VALUES(total_reports),
+        open_reports = open_reports + VALUES(open_reports),
+        investigating_reports = investigating_reports + VALUES(investigating_reports),
+        closed_reports = closed_reports + VALUES(closed_reports),
+        rejected_reports = rejected_reports + VALUES(rejected_reports),
+        response_days_total = response_days_total + VALUES(response_days_total);
+END //
+
+-- Add p_count evidence files of p_bytes total to one counter row
+CREATE PROCEDURE BumpEvidenceCounters(
+    IN p_scope VARCHAR(10),
+    IN p_owner_id INT,
+    IN p_count INT,
+    IN p_bytes BIGINT
+)
+BEGIN
+    IF p_owner_id IS NOT NULL AND (p_count <> 0 OR p_bytes <> 0) THEN
+        INSERT INTO dashboard_counters (scope, owner_id, evidence_count, evidence_bytes)
+        VALUES (p_scope, p_owner_id, p_count, p_bytes)
+        ON DUPLICATE KEY UPDATE
+            evidence_count = evidence_count + VALUES(evidence_count),
+            evidence_bytes = evidence_bytes + VALUES(evidence_bytes);
+    END IF;
+END //
+
+CREATE TRIGGER after_report_insert_counters
+AFTER INSERT ON reports
+FOR EACH ROW
+BEGIN
+    CALL BumpReportCounters('global', 0, NEW.status, 1, NULL);
+    CALL BumpReportCounters('victim', NEW.victim_id, NEW.status, 1, NULL);
+    IF NEW.assigned_officer_id IS NOT NULL THEN
+        CALL BumpReportCounters('officer', NEW.assigned_officer_id, NEW.status, 1,
+                                DATEDIFF(NEW.assignment_date, NEW.date_submitted));
+    END IF;
+END //
+
+CREATE TRIGGER after_report_update_counters
+AFTER UPDATE ON reports
+FOR EACH ROW
+BEGIN
+    DECLARE v_count INT DEFAULT 0;
+    DECLARE v_bytes BIGINT DEFAULT 0;
+
+    IF NOT (OLD.status <=> NEW.status)
+       OR NOT (OLD.victim_id <=> NEW.victim_id)
+       OR NOT (OLD.assigned_officer_id <=> NEW.assigned_officer_id)
+       OR NOT (OLD.assignment_date <=> NEW.assignment_date) THEN
+        CALL BumpReportCounters('global', 0, OLD.status, -1, NULL);
+        CALL BumpReportCounters('global', 0, NEW.status, 1, NULL);
+        CALL BumpReportCounters('victim', OLD.victim_id, OLD.status, -1, NULL);
+        CALL BumpReportCounters('victim', NEW.victim_id, NEW.status, 1, NULL);
+        IF OLD.assigned_officer_id IS NOT NULL THEN
+            CALL BumpReportCounters('officer', OLD.assigned_officer_id, OLD.status, -1,
+                                    DATEDIFF(OLD.assignment_date, OLD.date_submitted));
+        END IF;
+        IF NEW.assigned_officer_id IS NOT NULL THEN
+            CALL BumpReportCounters('officer', NEW.assigned_officer_id, NEW.status, 1,
+                                    DATEDIFF(NEW.assignment_date, NEW.date_submitted));
+        END IF;
+    END IF;
+
+    -- Move the report's evidence figures to its new owners
+    IF NOT (OLD.victim_id <=> NEW.victim_id)
+       OR NOT (OLD.assigned_officer_id <=> NEW.assigned_officer_id) THEN
+        SELECT evidence_count, evidence_bytes INTO v_count, v_bytes
+        FROM dashboard_counters WHERE scope = 'report' AND owner_id = NEW.id;
+        CALL BumpEvidenceCounters('victim', OLD.victim_id, -v_count, -v_bytes);
+        CALL BumpEvidenceCounters('victim', NEW.victim_id, v_count, v_bytes);
+        CALL BumpEvidenceCounters('officer', OLD.assigned_officer_id, -v_count, -v_bytes);
+        CALL BumpEvidenceCounters('officer', NEW.assigned_officer_id, v_count, v_bytes);
+    END IF;
+END //
+
+CREATE TRIGGER after_report_delete_counters
+AFTER DELETE ON reports
+FOR EACH ROW
+BEGIN
+    DECLARE v_count INT DEFAULT 0;
+    DECLARE v_bytes BIGINT DEFAULT 0;
+
+    CALL BumpReportCounters('global', 0, OLD.status, -1, NULL);
+    CALL BumpReportCounters('victim', OLD.victim_id, OLD.status, -1, NULL);
+    IF OLD.assigned_officer_id IS NOT NULL THEN
+        CALL BumpReportCounters('officer', OLD.assigned_officer_id, OLD.status, -1,
+                                DATEDIFF(OLD.assignment_date, OLD.date_submitted));
+    END IF;
+
+    -- The report's evidence rows go by FK cascade, which fires no triggers
+    SELECT evidence_count, evidence_bytes INTO v_count, v_bytes
+    FROM dashboard_counters WHERE scope = 'report' AND owner_id = OLD.id;
+    CALL BumpEvidenceCounters('global', 0, -v_count, -v_bytes);
+    CALL BumpEvidenceCounters('victim', OLD.victim_id, -v_count, -v_bytes);
+    CALL BumpEvidenceCounters('officer', OLD.assigned_officer_id, -v_count, -v_bytes);
+    DELETE FROM dashboard_counters WHERE scope = 'report' AND owner_id = OLD.id;
+END //
+
+CREATE TRIGGER after_evidence_insert_counters
+AFTER INSERT ON evidence
+FOR EACH ROW
+BEGIN
+    DECLARE v_victim_id INT;
+    DECLARE v_officer_id INT;
+
+    SELECT victim_id, assigned_officer_id INTO v_victim_id, v_officer_id
+    FROM reports WHERE id = NEW.report_id;
+    CALL BumpEvidenceCounters('global', 0, 1, COALESCE(NEW.file_size, 0));
+    CALL BumpEvidenceCounters('report', NEW.report_id, 1, COALESCE(NEW.file_size, 0));
+    CALL BumpEvidenceCounters('victim', v_victim_id, 1, COALESCE(NEW.file_size, 0));
+    CALL BumpEvidenceCounters('officer', v_officer_id, 1, COALESCE(NEW.file_size, 0));
+END //
+
+CREATE TRIGGER after_evidence_delete_counters
+AFTER DELETE ON evidence
+FOR EACH ROW
+BEGIN
+    DECLARE v_victim_id INT;
+    DECLARE v_officer_id INT;
+
+    SELECT victim_id, assigned_officer_id INTO v_victim_id, v_officer_id
+    FROM reports WHERE id = OLD.report_id;
+    CALL BumpEvidenceCounters('global', 0, -1, -COALESCE(OLD.file_size, 0));
+    CALL BumpEvidenceCounters('report', OLD.report_id, -1, -COALESCE(OLD.file_size, 0));
+    CALL BumpEvidenceCounters('victim', v_victim_id, -1, -COALESCE(OLD.file_size, 0));
+    CALL BumpEvidenceCounters('officer', v_officer_id, -1, -COALESCE(OLD.file_size, 0));
+END //
+
+DELIMITER ;
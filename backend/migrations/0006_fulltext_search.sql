@@ -0,0 +1,18 @@
+-- Full-text search over reports and case logs
+--
+-- InnoDB FULLTEXT indexes are maintained on every insert/update, so new
+-- reports and case-log entries are searchable as soon as they commit.
+-- Adding the first FULLTEXT index to a table rebuilds it (to add the hidden
+-- FTS_DOC_ID column); that is supported in place but not with LOCK=NONE,
+-- so writes to each table wait while its index is built.
+--
+--   /search   MATCH(description, location, crime_type) AGAINST (? IN BOOLEAN MODE)
+--             MATCH(notes, action) AGAINST (? IN BOOLEAN MODE)
+
+ALTER TABLE reports
+    ADD FULLTEXT INDEX ft_reports_text (description, location, crime_type),
+    ALGORITHM=INPLACE, LOCK=SHARED;
+
+ALTER TABLE case_logs
+    ADD FULLTEXT INDEX ft_case_logs_text (notes, action),
+    ALGORITHM=INPLACE, LOCK=SHARED;
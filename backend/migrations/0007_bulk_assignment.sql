@@ -0,0 +1,95 @@
+-- Bulk case assignment
+--
+-- /admin/assign/bulk stages its (report, officer, note) items in
+-- bulk_assignment_items under one batch key and calls BulkAssignOfficers,
+-- which validates and applies the whole batch with a handful of set-based
+-- statements and records a per-item result.  The procedure does not open
+-- or commit a transaction itself: the caller stages, assigns, notifies and
+-- commits in one transaction.  A retry with the same batch key finds the
+-- stored results instead of applying the batch again.
+--
+--   batch lookup / results   WHERE batch_key = ? ORDER BY item_no
+--   retention cleanup        WHERE created_at < ?
+
+CREATE TABLE IF NOT EXISTS bulk_assignment_items (
+    batch_key VARCHAR(64) NOT NULL,
+    item_no INT NOT NULL,
+    report_id INT NOT NULL,
+    officer_id INT NOT NULL,
+    note TEXT,
+    result VARCHAR(20) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (batch_key, item_no),
+    INDEX idx_bulk_assignment_created (created_at)
+);
+
+DELIMITER //
+
+CREATE PROCEDURE BulkAssignOfficers(IN p_batch_key VARCHAR(64))
+BEGIN
+    DECLARE v_locked INT;
+
+    -- Lock the target reports so the checks below still hold at UPDATE time
+    SELECT COUNT(*) INTO v_locked
+    FROM reports r
+    JOIN bulk_assignment_items i ON i.report_id = r.id
+    WHERE i.batch_key = p_batch_key
+    FOR UPDATE;
+
+    UPDATE bulk_assignment_items i
+    LEFT JOIN reports r ON r.id = i.report_id
+    SET i.result = 'not_found'
+    WHERE i.batch_key = p_batch_key AND r.id IS NULL;
+
+    UPDATE bulk_assignment_items i
+    LEFT JOIN users u ON u.id = i.officer_id AND u.role = 'officer' AND u.is_active = TRUE
+    SET i.result = 'invalid_officer'
+    WHERE i.batch_key = p_batch_key AND i.result IS NULL AND u.id IS NULL;
+
+    UPDATE bulk_assignment_items i
+    JOIN reports r ON r.id = i.report_id
+    SET i.result = 'closed'
+    WHERE i.batch_key = p_batch_key AND i.result IS NULL
+      AND r.status IN ('Closed', 'Rejected');
+
+    -- The same report listed twice: the last valid item wins
+    UPDATE bulk_assignment_items i
+    JOIN bulk_assignment_items later
+      ON later.batch_key = i.batch_key AND later.report_id = i.report_id
+     AND later.item_no > i.item_no AND later.result IS NULL
+    SET i.result = 'duplicate'
+    WHERE i.batch_key = p_batch_key AND i.result IS NULL;
+
+    UPDATE bulk_assignment_items i
+    JOIN reports r ON r.id = i.report_id
+    SET i.result = 'unchanged'
+    WHERE i.batch_key = p_batch_key AND i.result IS NULL
+      AND r.assigned_officer_id = i.officer_id;
+
+    UPDATE reports r
+    JOIN bulk_assignment_items i ON i.report_id = r.id
+    SET r.assigned_officer_id = i.officer_id,
+        r.assignment_date = NOW(),
+        r.assignment_note = i.note,
+        r.status = 'Under Investigation'
+    WHERE i.batch_key = p_batch_key AND i.result IS NULL;
+
+    UPDATE bulk_assignment_items
+    SET result = 'assigned'
+    WHERE batch_key = p_batch_key AND result IS NULL;
+
+    -- One multi-row audit insert for the whole batch
+    INSERT INTO audit_logs (user_id, action, details, status)
+    SELECT officer_id, 'Officer Assigned',
+           CONCAT('Officer assigned to report #', report_id), 'Success'
+    FROM bulk_assignment_items
+    WHERE batch_key = p_batch_key AND result = 'assigned';
+
+    SELECT i.item_no, i.report_id, i.officer_id, i.result, r.victim_id
+    FROM bulk_assignment_items i
+    LEFT JOIN reports r ON r.id = i.report_id
+    WHERE i.batch_key = p_batch_key
+    ORDER BY i.item_no;
+END //
+
+DELIMITER ;
@@ -0,0 +1,84 @@
+-- Monthly partitions for audit_logs
+--
+-- audit_logs is RANGE-partitioned on UNIX_TIMESTAMP(timestamp), one
+-- partition per calendar month (pYYYYMM) plus a catch-all p_future.
+-- Retention then drops (after archiving) whole partitions instead of
+-- deleting rows, and reads bounded by timestamp only touch the partitions
+-- in range.  audit_partitions.py adds the coming months' partitions ahead
+-- of time and applies the retention policy.
+--
+-- Partitioned InnoDB tables cannot have foreign keys, and every unique key
+-- must include the partitioning column, so the user_id foreign key is
+-- dropped (a deleted user's rows keep the stale id; reads LEFT JOIN users)
+-- and the primary key becomes (id, timestamp).  Repartitioning copies the
+-- table once; writes wait while it runs.
+--
+--   /admin/audit_logs, audit_trail_view
+--       WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT n
+--   retention / archival   one partition at a time
+
+DELIMITER //
+
+CREATE PROCEDURE PartitionAuditLogs()
+BEGIN
+    DECLARE v_fk VARCHAR(64);
+    DECLARE v_month DATE;
+    DECLARE v_last DATE;
+    DECLARE v_partitions TEXT DEFAULT '';
+
+    SELECT CONSTRAINT_NAME INTO v_fk
+    FROM information_schema.REFERENTIAL_CONSTRAINTS
+    WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs'
+    LIMIT 1;
+    IF v_fk IS NOT NULL THEN
+        SET @drop_fk = CONCAT('ALTER TABLE audit_logs DROP FOREIGN KEY `', v_fk, '`');
+        PREPARE stmt FROM @drop_fk;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+
+    UPDATE audit_logs SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL;
+    ALTER TABLE audit_logs
+        MODIFY timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        DROP PRIMARY KEY,
+        ADD PRIMARY KEY (id, timestamp);
+
+    -- One partition per month from the oldest row through three months ahead
+    SELECT DATE_FORMAT(COALESCE(MIN(timestamp), CURRENT_DATE), '%Y-%m-01') INTO v_month FROM audit_logs;
+    SET v_last = DATE_FORMAT(CURRENT_DATE + INTERVAL 3 MONTH, '%Y-%m-01');
+    WHILE v_month <= v_last DO
+        SET v_partitions = CONCAT(v_partitions,
+            'PARTITION p', DATE_FORMAT(v_month, '%Y%m'),
+            ' VALUES LESS THAN (', UNIX_TIMESTAMP(v_month + INTERVAL 1 MONTH), '), ');
+        SET v_month = v_month + INTERVAL 1 MONTH;
+    END WHILE;
+
+    SET @partition_sql = CONCAT(
+        'ALTER TABLE audit_logs PARTITION BY RANGE (UNIX_TIMESTAMP(timestamp)) (',
+        v_partitions, 'PARTITION p_future VALUES LESS THAN MAXVALUE)');
+    PREPARE stmt FROM @partition_sql;
+    EXECUTE stmt;
+    DEALLOCATE PREPARE stmt;
+END //
+
+DELIMITER ;
+
+CALL PartitionAuditLogs();
+DROP PROCEDURE PartitionAuditLogs;
+
+-- Only the current and previous month: the view's readers want recent activity
+CREATE OR REPLACE VIEW audit_trail_view AS
+SELECT
+    al.id,
+    al.timestamp,
+    al.action,
+    al.details,
+    al.status,
+    al.ip_address,
+    u.name as user_name,
+    u.email as user_email,
+    u.role as user_role
+FROM audit_logs al
+LEFT JOIN users u ON al.user_id = u.id
+WHERE al.timestamp >= DATE_FORMAT(CURRENT_DATE - INTERVAL 1 MONTH, '%Y-%m-01')
+ORDER BY al.timestamp DESC;
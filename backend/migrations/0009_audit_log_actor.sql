@@ -0,0 +1,57 @@
+-- Actor identity on audit rows, and indexes for the audit log query API
+--
+-- actor_name / actor_email / actor_role record who acted at write time, so
+-- reads need no join to users (which may since have changed or been
+-- deleted) and no guessing from the details text.  The audit writer fills
+-- them in for events it writes; the trigger below fills them from users for
+-- rows inserted by triggers and stored procedures, which only set user_id.
+--
+--   /admin/audit_logs           [WHERE filter = ?] AND timestamp >= ?
+--                               ORDER BY timestamp DESC, id DESC LIMIT n
+--   /admin/audit_logs/stats     WHERE timestamp >= ? GROUP BY hour, action
+--
+-- idx_audit_logs_time_action covers the per-hour aggregation and replaces
+-- idx_audit_logs_timestamp for the unfiltered listing.
+
+ALTER TABLE audit_logs
+    ADD COLUMN actor_name VARCHAR(100) NULL,
+    ADD COLUMN actor_email VARCHAR(100) NULL,
+    ADD COLUMN actor_role VARCHAR(20) NULL;
+
+ALTER TABLE audit_logs
+    ADD INDEX idx_audit_logs_time_action (timestamp, action),
+    ADD INDEX idx_audit_logs_user_time (user_id, timestamp),
+    ADD INDEX idx_audit_logs_action_time (action, timestamp),
+    ADD INDEX idx_audit_logs_status_time (status, timestamp),
+    DROP INDEX idx_audit_logs_timestamp,
+    ALGORITHM=INPLACE, LOCK=NONE;
+
+-- Backfill existing rows
+UPDATE audit_logs al
+JOIN users u ON u.id = al.user_id
+SET al.actor_name = u.name, al.actor_email = u.email, al.actor_role = u.role;
+
+-- Rows without a user: recover the role logins recorded in their details
+UPDATE audit_logs
+SET actor_role = LOWER(SUBSTRING_INDEX(SUBSTRING_INDEX(details, 'Login successful for ', -1), ' ', 1))
+WHERE actor_role IS NULL AND details LIKE '%Login successful for %';
+
+DELIMITER //
+
+CREATE TRIGGER audit_logs_actor BEFORE INSERT ON audit_logs
+FOR EACH ROW
+BEGIN
+    DECLARE v_name VARCHAR(100);
+    DECLARE v_email VARCHAR(100);
+    DECLARE v_role VARCHAR(20);
+    DECLARE CONTINUE HANDLER FOR NOT FOUND BEGIN END;
+    IF NEW.user_id IS NOT NULL AND NEW.actor_name IS NULL THEN
+        SELECT name, email, role INTO v_name, v_email, v_role
+        FROM users WHERE id = NEW.user_id;
+        SET NEW.actor_name = v_name,
+            NEW.actor_email = COALESCE(NEW.actor_email, v_email),
+            NEW.actor_role = COALESCE(NEW.actor_role, v_role);
+    END IF;
+END //
+
+DELIMITER ;
@@ -0,0 +1,155 @@
+"""
+Notification routes: the inbox, unread counts and the Server-Sent Events
+stream (see notifications.py).
+"""
+
+from flask import Blueprint, Response, current_app, request, jsonify, session
+
+from notifications import fetch_since, unread_count, format_notification, event_stream
+from extensions import db_cursor, notification_hub, resources
+
+bp = Blueprint('notifications', __name__)
+
+# Seconds a client turned away for lack of a stream slot waits before retrying
+STREAM_BUSY_RETRY = 30
+
+@bp.route('/notifications', methods=['GET'])
+def get_notifications():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    user_id = session['user_id']
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    before_id = request.args.get('before_id', type=int)
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        query = """
+            SELECT id, report_id, type, message, is_read, created_at
+            FROM notifications
+            WHERE user_id = %s
+        """
+        params = [user_id]
+        if before_id:
+            query += " AND id < %s"
+            params.append(before_id)
+        query += " ORDER BY id DESC LIMIT %s"
+        params.append(limit)
+        cursor.execute(query, params)
+        notifications = [format_notification(row) for row in cursor.fetchall()]
+        
+        return jsonify({
+            'notifications': notifications,
+            'unread_count': unread_count(cursor, user_id)
+        }), 200
+
+@bp.route('/notifications/unread_count', methods=['GET'])
+def get_unread_notification_count():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    with db_cursor() as (connection, cursor):
+        return jsonify({'unread_count': unread_count(cursor, session['user_id'])}), 200
+
+@bp.route('/notifications/mark-read', methods=['POST'])
+def mark_notifications_read():
+    """
+    Mark notifications read, either by id (`notification_ids`) or by id range
+    (`up_to_id`, optionally `from_id`), e.g. "everything I have seen".
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    user_id = session['user_id']
+    data = request.get_json(silent=True) or {}
+    notification_ids = [int(i) for i in data.get('notification_ids', []) if str(i).isdigit()]
+    try:
+        up_to_id = int(data['up_to_id']) if data.get('up_to_id') is not None else None
+        from_id = int(data.get('from_id', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'up_to_id and from_id must be integers'}), 400
+    
+    if not notification_ids and up_to_id is None:
+        return jsonify({'error': 'notification_ids or up_to_id is required'}), 400
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            if up_to_id is not None:
+                cursor.execute("""
+                    UPDATE notifications SET is_read = TRUE
+                    WHERE user_id = %s AND is_read = FALSE AND id BETWEEN %s AND %s
+                """, (user_id, from_id, up_to_id))
+            else:
+                placeholders = ", ".join(["%s"] * len(notification_ids))
+                cursor.execute(f"""
+                    UPDATE notifications SET is_read = TRUE
+                    WHERE user_id = %s AND id IN ({placeholders})
+                """, [user_id] + notification_ids)
+            updated = cursor.rowcount
+            connection.commit()
+            
+            return jsonify({
+                'message': 'Notifications marked as read',
+                'updated': updated,
+                'unread_count': unread_count(cursor, user_id)
+            }), 200
+        
+        except Exception as e:
+            print(f"Database error in mark_notifications_read: {e}")
+            connection.rollback()
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/notifications/stream', methods=['GET'])
+def notifications_stream():
+    """
+    Server-Sent Events stream of the user's notifications.
+
+    EventSource sends Last-Event-ID when it reconnects; anything newer (and
+    the overlap below it, see notifications.py) is replayed from the table
+    before live events from the hub.
+    
+    Under serve.py's threaded workers the stream gives up its request thread
+    for one of the worker's stream slots; with none free it gets a 503.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    release_slot = request.environ.get('serve.release_slot')
+    if release_slot is not None and not release_slot():
+        response = Response(f"retry: {STREAM_BUSY_RETRY * 1000}\n\n", status=503, mimetype='text/event-stream')
+        response.headers['Retry-After'] = str(STREAM_BUSY_RETRY)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    user_id = session['user_id']
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    
+    # Subscribe before reading the backlog so nothing falls between the two
+    subscriber = notification_hub.subscribe(user_id)
+    try:
+        with db_cursor(dictionary=True) as (connection, cursor):
+            if last_event_id is None:
+                # Fresh connection: only events from now on
+                cursor.execute("SELECT COALESCE(MAX(id), 0) AS last_id FROM notifications WHERE user_id = %s",
+                               (user_id,))
+                last_event_id = cursor.fetchone()['last_id']
+                backlog = []
+            else:
+                backlog = fetch_since(cursor, user_id, last_event_id)
+    except Exception:
+        notification_hub.unsubscribe(user_id, subscriber)
+        raise
+    
+    # The stream runs after the request context is gone
+    app_resources = resources()
+    
+    def catch_up(last_id):
+        with app_resources.cursor(dictionary=True, label='notifications_catch_up') as (connection, cursor):
+            return fetch_since(cursor, user_id, last_id)
+    
+    stream = event_stream(notification_hub._get_current_object(), user_id, subscriber, last_event_id, backlog,
+                          catch_up if current_app.config['NOTIFICATIONS_CATCH_UP'] else None)
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,283 @@
+"""
+In-app notifications: storage helpers and Server-Sent Events delivery.
+
+Notifications are rows in the notifications table, inserted in the same
+transaction as the event that caused them.  After commit they are handed to
+the NotificationHub, an in-process fan-out that pushes each one to the open
+SSE streams of its recipient.  A stream that falls behind (or a client that
+reconnects) catches up from the table using the Last-Event-ID it last saw,
+so the hub itself never needs to remember anything.
+
+Ids are allocated at insert but become visible at commit, so a lower id can
+commit after a higher one was delivered.  Reads from the table therefore
+start RESUME_OVERLAP ids below the last id sent, a stream skips the ids it
+has already sent rather than every id below the last one, and clients
+de-duplicate by id.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+# Event types
+ASSIGNED = 'assigned'
+STATUS_CHANGED = 'status_changed'
+NEW_EVIDENCE = 'new_evidence'
+CASE_LOG = 'case_log'
+
+STREAM_QUEUE_SIZE = 100
+HEARTBEAT_INTERVAL = 25
+RESUME_LIMIT = 200
+# Ids (across all users) re-read below the last one sent, for transactions
+# that committed out of id order
+RESUME_OVERLAP = 1000
+MESSAGE_LENGTH = 255
+
+
+class NotificationHub:
+    """Fan-out of committed notifications to the open streams in this process"""
+
+    def __init__(self, queue_size=STREAM_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped_streams = 0
+
+    def subscribe(self, user_id, subscriber=None):
+        """
+        Register a stream.  `subscriber` defaults to a bounded queue.Queue;
+        any object with put_nowait() raising queue.Full and get_nowait()
+        raising queue.Empty will do (the async server passes its own).
+        """
+        if subscriber is None:
+            subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def publish(self, notifications):
+        for notification in notifications:
+            with self._lock:
+                subscribers = list(self._subscribers.get(notification['user_id'], ()))
+            for subscriber in subscribers:
+                try:
+                    subscriber.put_nowait(notification)
+                except queue.Full:
+                    # A stalled client: end its stream, it resumes from the table
+                    self.unsubscribe(notification['user_id'], subscriber)
+                    self.dropped_streams += 1
+                    _close_subscriber(subscriber)
+            self.published += 1
+
+    def close_all(self):
+        """End every open stream; the clients reconnect and resume from the table"""
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+            self._subscribers.clear()
+        for subscriber in subscribers:
+            _close_subscriber(subscriber)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users_connected': len(self._subscribers),
+                'streams_open': sum(len(s) for s in self._subscribers.values()),
+                'published': self.published,
+                'dropped_streams': self.dropped_streams,
+            }
+
+
+def _close_subscriber(subscriber):
+    # Make room for the end-of-stream marker
+    try:
+        while True:
+            subscriber.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        subscriber.put_nowait(None)
+    except queue.Full:
+        pass
+
+
+def notification_insert(items):
+    """
+    (sql, params, items) inserting `items` in one multi-row INSERT, or None
+    if there is nobody to notify.  Recipients that are None are skipped.
+    """
+    items = [(user_id, report_id, kind, message[:MESSAGE_LENGTH])
+             for user_id, report_id, kind, message in items if user_id]
+    if not items:
+        return None
+    placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(items))
+    params = [value for item in items for value in item]
+    return f"""
+        INSERT INTO notifications (user_id, report_id, type, message)
+        VALUES {placeholders}
+    """, params, items
+
+
+def create_notifications(cursor, items):
+    """
+    Insert notifications and return them as dicts (with ids) for publish().
+
+    `items` is a list of (user_id, report_id, type, message); recipients that
+    are None are skipped.  All rows go in one multi-row INSERT, whose
+    auto-increment ids are consecutive.
+    """
+    insert = notification_insert(items)
+    if insert is None:
+        return []
+    sql, params, items = insert
+    cursor.execute(sql, params)
+    return inserted_notifications(cursor.lastrowid, items)
+
+
+def inserted_notifications(first_id, items):
+    """The notifications of a notification_insert() as dicts for publish()"""
+    created_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    return [{
+        'id': first_id + i,
+        'user_id': user_id,
+        'report_id': report_id,
+        'type': kind,
+        'message': message,
+        'read': False,
+        'timestamp': created_at,
+    } for i, (user_id, report_id, kind, message) in enumerate(items)]
+
+
+def report_parties(cursor, report_id):
+    """Return (victim_id, assigned_officer_id) for a report, or (None, None)"""
+    cursor.execute("SELECT victim_id, assigned_officer_id FROM reports WHERE id = %s", (report_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None, None
+    if isinstance(row, dict):
+        return row['victim_id'], row['assigned_officer_id']
+    return row[0], row[1]
+
+
+def format_notification(row):
+    """Client representation of a notifications row"""
+    return {
+        'id': row['id'],
+        'report_id': row['report_id'],
+        'type': row['type'],
+        'message': row['message'],
+        'read': bool(row['is_read']),
+        'timestamp': row['created_at'].strftime('%Y-%m-%d %H:%M:%S') if row.get('created_at') else None,
+    }
+
+
+FETCH_SINCE_QUERY = """
+    SELECT id, report_id, type, message, is_read, created_at
+    FROM notifications
+    WHERE user_id = %s AND id > %s
+    ORDER BY id
+    LIMIT %s
+"""
+
+
+def fetch_since_args(user_id, last_id, limit=RESUME_LIMIT):
+    """
+    FETCH_SINCE_QUERY parameters: from RESUME_OVERLAP ids below `last_id`,
+    with room for `limit` rows above it (the overlap holds at most
+    RESUME_OVERLAP rows)
+    """
+    return user_id, max(last_id - RESUME_OVERLAP, 0), limit + RESUME_OVERLAP
+
+
+def fetch_since(cursor, user_id, last_id, limit=RESUME_LIMIT):
+    """
+    Notifications for `user_id` newer than `last_id` plus the overlap below
+    it, oldest first; pass them through SentIds to drop the ones already sent
+    """
+    cursor.execute(FETCH_SINCE_QUERY, fetch_since_args(user_id, last_id, limit))
+    return [format_notification(row) for row in cursor.fetchall()]
+
+
+class SentIds:
+    """The ids a stream has sent: the highest (its resume point) and the recent ones"""
+
+    def __init__(self, last_id, size=RESUME_LIMIT + RESUME_OVERLAP):
+        self.last_id = last_id
+        self._recent = deque()
+        self._ids = set()
+        self.size = size
+
+    def add(self, notification_id):
+        """Record an id; False if it was already sent"""
+        if notification_id in self._ids:
+            return False
+        if len(self._recent) >= self.size:
+            self._ids.discard(self._recent.popleft())
+        self._recent.append(notification_id)
+        self._ids.add(notification_id)
+        self.last_id = max(self.last_id, notification_id)
+        return True
+
+
+def unread_count(cursor, user_id):
+    cursor.execute("""
+        SELECT COUNT(*) AS unread FROM notifications
+        WHERE user_id = %s AND is_read = FALSE
+    """, (user_id,))
+    row = cursor.fetchone()
+    return row['unread'] if isinstance(row, dict) else row[0]
+
+
+def sse_event(notification, event_id=None):
+    """
+    One SSE event.  `event_id` is what the client sends back as Last-Event-ID:
+    the highest id sent so far, which a late lower id must not lower.
+    """
+    data = json.dumps({k: v for k, v in notification.items() if k != 'user_id'})
+    event_id = notification['id'] if event_id is None else event_id
+    return f"id: {event_id}\nevent: notification\ndata: {data}\n\n"
+
+
+def event_stream(hub, user_id, subscriber, last_event_id, backlog, catch_up=None,
+                 heartbeat=HEARTBEAT_INTERVAL):
+    """
+    Generator for a text/event-stream response.
+
+    `backlog` holds the notifications missed since Last-Event-ID, read before
+    the response started; after it, events come from the hub.  `catch_up`,
+    if given, is called with the last id sent on every heartbeat and returns
+    newer notifications (see fetch_since); it covers events published by
+    other processes.
+    """
+    sent = SentIds(last_event_id)
+    try:
+        yield "retry: 5000\n\n"
+        for notification in backlog:
+            if sent.add(notification['id']):
+                yield sse_event(notification, sent.last_id)
+        while True:
+            try:
+                notification = subscriber.get(timeout=heartbeat)
+            except queue.Empty:
+                if catch_up is not None:
+                    for missed in catch_up(sent.last_id):
+                        if sent.add(missed['id']):
+                            yield sse_event(missed, sent.last_id)
+                yield ": keepalive\n\n"
+                continue
+            if notification is None:
+                return
+            if sent.add(notification['id']):
+                yield sse_event(notification, sent.last_id)
+    finally:
+        hub.unsubscribe(user_id, subscriber)
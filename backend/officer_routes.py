@@ -0,0 +1,372 @@
+"""
+Officer routes: assigned cases, case logs and status, evidence and workload.
+"""
+
+from flask import Blueprint, request, jsonify, session
+
+from pagination import parse_page_args, keyset_condition, page_response
+from serialization import fetch_dicts
+from notifications import NEW_EVIDENCE, CASE_LOG, create_notifications, report_parties
+from response_cache import cached
+from rate_limit import limit
+from extensions import db_cursor, refresh_caseloads, response_cache, notification_hub
+from evidence_routes import store_evidence_files, insert_evidence, public_evidence
+import procedures
+from procedures import update_report_status, notify_status_change
+
+bp = Blueprint('officer', __name__)
+
+@bp.route('/officer/all_evidence', methods=['GET'])
+def officer_all_evidence():
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    officer_id = session.get('user_id')
+    limit, position, include_total = parse_page_args(request.args)
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            after, after_params = keyset_condition('e.upload_date', 'e.id', position)
+            cursor.execute(f"""
+                SELECT e.id, e.report_id as case_id, e.filename, e.original_name, e.content_type, e.file_size, e.upload_date,
+                       r.crime_type, r.status, u.name as victim_name
+                FROM evidence e
+                JOIN reports r ON e.report_id = r.id
+                JOIN users u ON r.victim_id = u.id
+                WHERE r.assigned_officer_id = %s {'AND ' + after if after else ''}
+                ORDER BY e.upload_date DESC, e.id DESC
+                LIMIT %s
+            """, [officer_id] + after_params + [limit + 1])
+        
+            evidence_list, page = page_response(fetch_dicts(cursor), limit, 'upload_date')
+            
+            if include_total:
+                cursor.execute("""
+                    SELECT COUNT(*) as total FROM evidence e
+                    JOIN reports r ON e.report_id = r.id
+                    WHERE r.assigned_officer_id = %s
+                """, (officer_id,))
+                page['total'] = cursor.fetchone()[0]
+        
+            return jsonify({'evidence': evidence_list, 'page': page}), 200
+        
+        except Exception as e:
+            print(f"Database error in officer_all_evidence: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/officer/case/<int:case_id>', methods=['GET'])
+def get_case_details(case_id):
+    print(f"get_case_details called - Case ID: {case_id}")
+    print(f"Session: {session}")
+    print(f"User ID in session: {session.get('user_id')}")
+    print(f"Role in session: {session.get('role')}")
+    
+    if 'user_id' not in session or session.get('role') != 'officer':
+        print(f"Unauthorized access attempt to case details - Session: {session}")
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    officer_id = session.get('user_id')
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            cursor.execute("""
+                SELECT r.id, r.crime_type, r.description, r.date_occurred, r.date_submitted, r.location, r.status, r.priority,
+                       u.name as victim_name, u.phone as victim_phone
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                WHERE r.id = %s AND r.assigned_officer_id = %s
+            """, (case_id, officer_id))
+        
+            case = cursor.fetchone()
+            if not case:
+                return jsonify({'error': 'Case not found'}), 404
+        
+            return jsonify({'case': case}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_case_details: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/officer/case/<int:case_id>/logs', methods=['POST'])
+def add_case_log(case_id):
+    print(f"add_case_log called for case_id: {case_id}")
+    print(f"Session data: {session}")
+    
+    if 'user_id' not in session or session.get('role') != 'officer':
+        print("Unauthorized access attempt")
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json()
+    print(f"Received data: {data}")
+    
+    action = data.get('action')
+    notes = data.get('notes')
+    
+    if not all([action, notes]):
+        print("Missing required fields")
+        return jsonify({'error': 'Action and notes are required'}), 400
+    
+    officer_id = session.get('user_id')
+    print(f"Officer ID: {officer_id}")
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Check if case is assigned to this officer
+            cursor.execute("""
+                SELECT id FROM reports 
+                WHERE id = %s AND assigned_officer_id = %s
+            """, (case_id, officer_id))
+        
+            case = cursor.fetchone()
+            if not case:
+                print(f"Case {case_id} not found or not assigned to officer {officer_id}")
+                return jsonify({'error': 'Case not found or not assigned to you'}), 404
+        
+            # Insert the log entry
+            try:
+                print(f"Inserting log entry with values: report_id={case_id}, officer_id={officer_id}, action={action}, notes={notes[:50]}...")
+                cursor.execute("""
+                    INSERT INTO case_logs (report_id, officer_id, action, notes, log_date)
+                    VALUES (%s, %s, %s, %s, NOW())
+                """, (case_id, officer_id, action, notes))
+                victim_id, _ = report_parties(cursor, case_id)
+                created = create_notifications(cursor, [
+                    (victim_id, case_id, CASE_LOG, f"New update on report #{case_id}: {action}")
+                ])
+            
+                connection.commit()
+                response_cache.invalidate(f'report:{case_id}')
+                notification_hub.publish(created)
+                print(f"Log added for case {case_id}: {action} - {notes}")
+                return jsonify({'message': 'Log entry saved successfully.'}), 200
+            
+            except Exception as insert_error:
+                print(f"Insert error: {insert_error}")
+                connection.rollback()
+                return jsonify({"error": f"Failed to insert log entry: {str(insert_error)}"}), 500
+        
+        except Exception as e:
+            print(f"Database error in add_case_log: {e}")
+            connection.rollback()
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+@bp.route('/officer/case/<int:case_id>/logs', methods=['GET'])
+def get_case_logs(case_id):
+    print(f"get_case_logs called for case_id: {case_id}")
+    print(f"Session data: {session}")
+    
+    if 'user_id' not in session or session.get('role') != 'officer':
+        print("Unauthorized access attempt")
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    officer_id = session.get('user_id')
+    print(f"Officer ID: {officer_id}")
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Check if case is assigned to this officer
+            cursor.execute("""
+                SELECT id FROM reports 
+                WHERE id = %s AND assigned_officer_id = %s
+            """, (case_id, officer_id))
+        
+            case = cursor.fetchone()
+            if not case:
+                return jsonify({'error': 'Case not found or not assigned to you'}), 404
+        
+            # Get logs for this case
+            print(f"Fetching logs for case_id: {case_id}")
+            cursor.execute("""
+                SELECT cl.*, DATE(cl.log_date) as date, u.name as officer_name, u.email as officer_email
+                FROM case_logs cl
+                LEFT JOIN users u ON cl.officer_id = u.id
+                WHERE cl.report_id = %s
+                ORDER BY cl.log_date DESC
+            """, (case_id,))
+        
+            logs = cursor.fetchall()
+            print(f"Found {len(logs)} logs for case {case_id}")
+        
+            return jsonify({'logs': logs}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_case_logs: {e}")
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+@bp.route('/officer/case/<int:case_id>/evidence', methods=['GET', 'POST'])
+@limit('upload', methods=('POST',))
+@cached(tags=['report:{case_id}'])
+def officer_case_evidence(case_id):
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    officer_id = session.get('user_id')
+    
+    # Parse (and spool to disk) any upload before borrowing a connection
+    files = request.files.getlist('files') if request.method == 'POST' else []
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Check if case is assigned to this officer
+            cursor.execute("""
+                SELECT id FROM reports 
+                WHERE id = %s AND assigned_officer_id = %s
+            """, (case_id, officer_id))
+        
+            case = cursor.fetchone()
+            if not case:
+                return jsonify({'error': 'Case not found or not assigned to you'}), 404
+        
+            if request.method == 'GET':
+                # Get evidence for this case
+                cursor.execute("""
+                    SELECT id, filename, original_name, content_type, file_size, description, upload_date
+                    FROM evidence 
+                    WHERE report_id = %s
+                    ORDER BY upload_date DESC
+                """, (case_id,))
+            
+                evidence = cursor.fetchall()
+            
+                return jsonify({'evidence': evidence}), 200
+            elif request.method == 'POST':
+                from datetime import datetime
+                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+                if not files:
+                    return jsonify({'error': 'No files provided'}), 400
+            
+                # Blobs first, so no row lock is held while they are flushed to disk
+                stored = store_evidence_files(files)
+                saved = insert_evidence(cursor, case_id, stored, officer_id, "Evidence uploaded by officer")
+                evidence = []
+                for ev in saved:
+                    evidence.append({
+                        **public_evidence(ev),
+                        "description": f"Evidence file: {ev['original_name']}",
+                        "uploaded_by": officer_id,
+                        "upload_date": current_time
+                    })
+            
+                if evidence:
+                    victim_id, _ = report_parties(cursor, case_id)
+                    created = create_notifications(cursor, [
+                        (victim_id, case_id, NEW_EVIDENCE,
+                         f"The investigating officer added {len(evidence)} evidence file(s) to report #{case_id}")
+                    ])
+                    connection.commit()
+                    response_cache.invalidate(f'report:{case_id}', 'reports')
+                    notification_hub.publish(created)
+                    return jsonify({'message': 'Evidence added successfully', 'evidence': evidence}), 200
+                else:
+                    return jsonify({'error': 'No valid files were uploaded'}), 400
+            
+        except Exception as e:
+            print(f"Database error in officer_case_evidence: {e}")
+            connection.rollback()
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/officer/case/<int:case_id>', methods=['PUT'])
+def update_case_status(case_id):
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json()
+    new_status = data.get('status')
+    if not new_status:
+        return jsonify({'error': 'Status is required'}), 400
+    
+    officer_id = session.get('user_id')
+    
+    # Use stored procedure to update status
+    try:
+        result = update_report_status(case_id, new_status, officer_id)
+        if result is not None:
+            response_cache.invalidate(f'report:{case_id}', 'reports')
+            refresh_caseloads([officer_id])
+            notify_status_change(case_id, new_status, officer_id)
+            return jsonify({'message': 'Status updated successfully'}), 200
+        else:
+            return jsonify({'error': 'Case not found or not assigned to you'}), 404
+    except Exception as e:
+        print(f"Error in stored procedure call: {e}")
+        return jsonify({"error": "Database error"}), 500
+
+@bp.route('/officer/workload', methods=['GET'])
+def get_officer_workload():
+    if 'user_id' not in session or session.get('role') != 'officer':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    officer_id = session.get('user_id')
+    workload = procedures.get_officer_workload(officer_id)
+    
+    if workload:
+        return jsonify({'workload': workload}), 200
+    else:
+        return jsonify({'error': 'Unable to get workload data'}), 500
+
+ASSIGNED_CASES_ORDER = {
+    'Victim Name': "u.name",
+    'Case ID': "r.id",
+    'Date Reported': "r.date_submitted DESC",
+    'Crime Type': "r.crime_type",
+    'Status': "r.status",
+}
+
+def assigned_cases_query(officer_id, args):
+    """SQL and params for an officer's cases, filtered and sorted by the request args"""
+    status_filter = args.get('status', 'All Status')
+    crime_type_filter = args.get('crimeType', 'All Types')
+    search_query = args.get('search', '')
+    sort_by = args.get('sortBy', 'Date Reported')
+    
+    # Build the base query
+    base_query = """
+        SELECT r.id, r.crime_type, r.description, r.date_occurred, r.date_submitted, r.location, r.status, r.priority,
+               u.name as victim_name, u.phone as victim_phone
+        FROM reports r
+        JOIN users u ON r.victim_id = u.id
+        WHERE r.assigned_officer_id = %s
+    """
+    query_params = [officer_id]
+    
+    # Add filters
+    if status_filter != 'All Status':
+        base_query += " AND r.status = %s"
+        query_params.append(status_filter)
+    
+    if crime_type_filter != 'All Types':
+        base_query += " AND r.crime_type = %s"
+        query_params.append(crime_type_filter)
+    
+    if search_query:
+        base_query += " AND (u.name LIKE %s OR r.crime_type LIKE %s)"
+        search_param = f"%{search_query}%"
+        query_params.extend([search_param, search_param])
+    
+    # Add sorting
+    base_query += " ORDER BY " + ASSIGNED_CASES_ORDER.get(sort_by, "r.date_submitted DESC")
+    return base_query, query_params
+
+@bp.route('/officer/assigned_cases', methods=['GET'])
+def officer_assigned_cases():
+    print(f"Officer assigned_cases called - Session: {session}")
+    print(f"User ID in session: {session.get('user_id')}")
+    print(f"Role in session: {session.get('role')}")
+    
+    if 'user_id' not in session or session.get('role') != 'officer':
+        print(f"Unauthorized access attempt - Session: {session}")
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    officer_id = session.get('user_id')
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            cursor.execute(*assigned_cases_query(officer_id, request.args))
+            assigned = fetch_dicts(cursor)
+        
+            return jsonify({'cases': assigned}), 200
+        
+        except Exception as e:
+            print(f"Database error in officer_assigned_cases: {e}")
+            return jsonify({"error": "Database error"}), 500
@@ -0,0 +1,91 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+Instead of OFFSET, each page continues after the (sort_key, id) of the last
+row returned, so a page costs the same index range scan no matter how deep
+into the table it is.  The position is handed to clients as an opaque,
+URL-safe cursor string.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_cursor(sort_value, row_id):
+    """Encode the position of the last row on a page"""
+    if isinstance(sort_value, (datetime, date)):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (sort_value, row_id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def parse_page_args(args, default_limit=DEFAULT_PAGE_SIZE, max_limit=MAX_PAGE_SIZE):
+    """
+    Read `limit`, `cursor` and `include_total` from request args.
+
+    Returns (limit, position, include_total); position is None on the first
+    page.  Raises InvalidCursor for malformed cursors.
+    """
+    try:
+        limit = int(args.get('limit', default_limit))
+    except (TypeError, ValueError):
+        limit = default_limit
+    limit = max(1, min(limit, max_limit))
+
+    cursor = args.get('cursor')
+    position = decode_cursor(cursor) if cursor else None
+    include_total = args.get('include_total', '').lower() in ('1', 'true', 'yes')
+    return limit, position, include_total
+
+
+def keyset_condition(sort_column, id_column, position):
+    """
+    SQL condition (and params) selecting rows after `position` for an
+    ORDER BY sort_column DESC, id_column DESC listing.
+
+    Spelled out rather than as a row comparison so MySQL can use it as an
+    index range.
+    """
+    if position is None:
+        return "", []
+    sort_value, row_id = position
+    return (
+        f"({sort_column} < %s OR ({sort_column} = %s AND {id_column} < %s))",
+        [sort_value, sort_value, row_id],
+    )
+
+
+def page_response(rows, limit, sort_key, id_key='id'):
+    """
+    Trim the extra look-ahead row and build the pagination envelope.
+
+    Callers fetch limit + 1 rows; the extra row only tells us whether there
+    is a next page.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[sort_key], last[id_key])
+    return rows, {'next_cursor': next_cursor, 'has_more': has_more, 'limit': limit}
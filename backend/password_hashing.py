@@ -0,0 +1,179 @@
+"""
+Password hashing off the request threads.
+
+PBKDF2 with Werkzeug's default 600,000 iterations costs hundreds of
+milliseconds of CPU per call.  Inline on the request threads, a burst of
+logins put one hash on every thread at once and took every core the process
+could get.  PasswordHasher runs generate_password_hash / check_password_hash
+in a small process pool instead, so hashing never uses more than `workers`
+cores.  At most `max_pending` calls are queued or running at once; callers
+beyond that wait up to `timeout` seconds for a slot and then get
+HashingBusy, so an auth burst cannot pile up unbounded work.
+
+`method` is the hash-cost policy, in Werkzeug's notation (for example
+'pbkdf2:sha256:600000' or 'scrypt:32768:8:1').  New hashes use it, and
+verify() also returns a fresh hash when the stored one was made with a
+different method, so logins upgrade old hashes transparently.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+
+class HashingBusy(Exception):
+    """Raised when no hashing slot became free before the timeout"""
+
+
+def normalize_method(method):
+    """Spell out Werkzeug's defaults: 'pbkdf2' -> 'pbkdf2:sha256:600000'"""
+    name, *args = method.split(":")
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    if name == "scrypt" and not args:
+        return "scrypt:32768:8:1"
+    return method
+
+
+def needs_rehash(stored_hash, method):
+    """Whether `stored_hash` was made with something other than `method`"""
+    return stored_hash.split("$", 1)[0] != normalize_method(method)
+
+
+def hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(stored_hash, password, method):
+    """(matches, new hash if it matched but uses an outdated method)"""
+    if not check_password_hash(stored_hash, password):
+        return False, None
+    if needs_rehash(stored_hash, method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for password hashing.
+
+    method      -- hash-cost policy for new and upgraded hashes
+    workers     -- worker processes (0 hashes inline on the calling thread)
+    max_pending -- calls queued or running at once
+    timeout     -- seconds to wait for a free slot before HashingBusy
+    """
+
+    def __init__(self, method="pbkdf2:sha256:600000", workers=2, max_pending=64, timeout=10):
+        self.method = normalize_method(method)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self.waiting = 0
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.pool_restarts = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def hash(self, password):
+        """Hash a new password with the current policy"""
+        return self._run(hash_password, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """
+        Check `password` against `stored_hash`.  Returns (matches, new_hash);
+        new_hash is set when the password matched but the stored hash should
+        be replaced with one made under the current policy.
+        """
+        matches, new_hash = self._run(verify_password, stored_hash, password, self.method)
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return matches, new_hash
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'waiting': self.waiting,
+                'pending': self.pending,
+                'queued': max(0, self.pending - self.workers),
+                'peak_pending': self.peak_pending,
+                'max_pending': self.max_pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'rehashed': self.rehashed,
+                'pool_restarts': self.pool_restarts,
+                'wait_seconds_total': round(self.wait_seconds, 6),
+                'hash_seconds_total': round(self.hash_seconds, 6),
+            }
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # -- internals --
+
+    def _run(self, fn, *args):
+        queued = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+        acquired = self._slots.acquire(timeout=self.timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+        if not acquired:
+            raise HashingBusy("Too many password checks in progress")
+        with self._lock:
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        started = time.monotonic()
+        try:
+            if not self.workers:
+                return fn(*args)
+            try:
+                return self._get_executor().submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A worker died (OOM killer, signal); start a fresh pool next
+                # time and finish this call inline
+                self._reset_executor()
+                return fn(*args)
+        finally:
+            finished = time.monotonic()
+            self._slots.release()
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.wait_seconds += started - queued
+                self.hash_seconds += finished - started
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: workers import only this module, not the app, and
+                # never inherit the parent's threads or DB connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self.pool_restarts += 1
+        if executor:
+            executor.shutdown(wait=False)
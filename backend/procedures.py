@@ -0,0 +1,93 @@
+"""
+Helpers around the database's stored procedures, and the notifications
+sent after the ones that assign officers and change case status.
+"""
+
+from notifications import ASSIGNED, STATUS_CHANGED, create_notifications, report_parties
+from extensions import db_cursor, notification_hub
+
+def send_notifications(items):
+    """Insert notifications in their own transaction and push them to open streams"""
+    try:
+        with db_cursor() as (connection, cursor):
+            created = create_notifications(cursor, items)
+            connection.commit()
+        notification_hub.publish(created)
+    except Exception as e:
+        # Notifications must never fail the action that caused them
+        print(f"Error sending notifications: {e}")
+
+# New functions to use stored procedures
+def call_stored_procedure(procedure_name, params=None):
+    """Generic function to call stored procedures"""
+    try:
+        with db_cursor(dictionary=True, label=procedure_name) as (connection, cursor):
+            if params:
+                cursor.callproc(procedure_name, params)
+            else:
+                cursor.callproc(procedure_name)
+            
+            # Get results from all result sets
+            results = []
+            for result in cursor.stored_results():
+                results.extend(result.fetchall())
+            
+            return results
+    except Exception as e:
+        print(f"Error calling stored procedure {procedure_name}: {e}")
+        return None
+
+def get_user_statistics():
+    """Get user statistics using stored procedure"""
+    results = call_stored_procedure('GetUserStats')
+    if results and len(results) > 0:
+        return results[0]
+    return None
+
+def get_report_statistics():
+    """Get report statistics using stored procedure"""
+    results = call_stored_procedure('GetReportStats')
+    if results and len(results) > 0:
+        return results[0]
+    return None
+
+def assign_officer_to_report(report_id, officer_id, assignment_note):
+    """Assign officer to report using stored procedure"""
+    return call_stored_procedure('AssignOfficerToReport', [report_id, officer_id, assignment_note])
+
+def update_report_status(report_id, new_status, officer_id):
+    """Update report status using stored procedure"""
+    return call_stored_procedure('UpdateReportStatus', [report_id, new_status, officer_id])
+
+def notify_assignment(report_id, officer_id):
+    """Tell the officer and the victim about a new assignment"""
+    try:
+        with db_cursor() as (connection, cursor):
+            victim_id, _ = report_parties(cursor, report_id)
+    except Exception as e:
+        print(f"Error looking up report #{report_id} for notifications: {e}")
+        return
+    send_notifications([
+        (officer_id, report_id, ASSIGNED, f"You have been assigned to report #{report_id}"),
+        (victim_id, report_id, ASSIGNED, f"An officer has been assigned to your report #{report_id}"),
+    ])
+
+def notify_status_change(report_id, new_status, officer_id):
+    """Tell the victim their report's status changed (UpdateReportStatus only updates assigned cases)"""
+    try:
+        with db_cursor() as (connection, cursor):
+            victim_id, assigned_officer_id = report_parties(cursor, report_id)
+    except Exception as e:
+        print(f"Error looking up report #{report_id} for notifications: {e}")
+        return
+    if assigned_officer_id == officer_id:
+        send_notifications([
+            (victim_id, report_id, STATUS_CHANGED, f"Your report #{report_id} is now {new_status}"),
+        ])
+
+def get_officer_workload(officer_id):
+    """Get officer workload using stored procedure"""
+    results = call_stored_procedure('GetOfficerWorkload', [officer_id])
+    if results and len(results) > 0:
+        return results[0]
+    return None
@@ -0,0 +1,251 @@
+"""
+Per-request profiling for the CyberCrime Reporting System backend.
+
+For every request the profiler records the number of SQL statements, time
+spent in the database, rows fetched, time spent encoding JSON and wall time,
+aggregated per route into Prometheus-style histograms.  Statements slower
+than a threshold go to a slow-query log together with their parameters.
+
+Database work is measured by wrapping cursors in InstrumentedCursor (see
+db_cursor in app.py); JSON encoding by wrapping the app's JSON provider
+class with TimedJSONProvider.
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            label_text = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RequestProfile:
+    """Counters for the request currently being handled"""
+
+    __slots__ = ('started', 'queries', 'db_time', 'rows', 'serialize_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.serialize_time = 0.0
+
+
+def current_profile():
+    if has_request_context():
+        return g.get('_profile')
+    return None
+
+
+class RequestProfiler:
+    """
+    Collects per-route metrics and the slow-query log.
+
+    slow_query_threshold -- seconds after which a statement is logged
+    slow_log_size        -- number of slow statements kept in memory
+    """
+
+    def __init__(self, slow_query_threshold=0.5, slow_log_size=200):
+        self.slow_query_threshold = slow_query_threshold
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        labels = ('endpoint', 'method')
+        self.wall = Histogram('http_request_duration_seconds', 'Wall time per request', labels, TIME_BUCKETS)
+        self.db = Histogram('http_request_db_seconds', 'Time spent in SQL per request', labels, TIME_BUCKETS)
+        self.serialize = Histogram('http_request_serialize_seconds', 'Time spent encoding JSON per request',
+                                   labels, TIME_BUCKETS)
+        self.queries = Histogram('http_request_sql_statements', 'SQL statements per request', labels, COUNT_BUCKETS)
+        self.rows = Histogram('http_request_rows_fetched', 'Rows fetched per request', labels, ROW_BUCKETS)
+        self.gauges = {}
+
+    def init_app(self, app):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        provider_class = type(app.json)
+        if not issubclass(provider_class, TimedJSONProvider):
+            timed_class = type('Timed' + provider_class.__name__, (TimedJSONProvider, provider_class), {})
+            app.json = timed_class(app)
+
+    def _before_request(self):
+        g._profile = RequestProfile()
+
+    def _after_request(self, response):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return response
+        wall = time.perf_counter() - profile.started
+        labels = (request.endpoint or 'unknown', request.method)
+        with self._lock:
+            self.wall.observe(labels, wall)
+            self.db.observe(labels, profile.db_time)
+            self.serialize.observe(labels, profile.serialize_time)
+            self.queries.observe(labels, profile.queries)
+            self.rows.observe(labels, profile.rows)
+        response.headers['Server-Timing'] = (
+            f"db;dur={profile.db_time * 1000:.1f};desc=\"{profile.queries} queries\", "
+            f"serialize;dur={profile.serialize_time * 1000:.1f}, "
+            f"total;dur={wall * 1000:.1f}"
+        )
+        return response
+
+    def record_query(self, statement, params, duration, rows=0):
+        profile = current_profile()
+        if profile is not None:
+            profile.queries += 1
+            profile.db_time += duration
+            profile.rows += rows
+        if duration >= self.slow_query_threshold:
+            entry = {
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'endpoint': request.endpoint if has_request_context() else None,
+                'duration_ms': round(duration * 1000, 2),
+                'statement': ' '.join(str(statement).split()),
+                'params': [repr(p) for p in params] if isinstance(params, (list, tuple)) else repr(params),
+            }
+            with self._lock:
+                self._slow_log.append(entry)
+            print(f"Slow query ({entry['duration_ms']} ms) in {entry['endpoint']}: {entry['statement'][:200]}")
+
+    def record_fetch(self, duration, rows):
+        profile = current_profile()
+        if profile is not None:
+            profile.db_time += duration
+            profile.rows += rows
+
+    def register_gauges(self, name, help_text, callback):
+        """Expose a dict of values returned by `callback` as labelled gauges"""
+        self.gauges[name] = (help_text, callback)
+
+    def slow_queries(self):
+        with self._lock:
+            return list(reversed(self._slow_log))
+
+    def render_prometheus(self):
+        with self._lock:
+            lines = []
+            for histogram in (self.wall, self.db, self.serialize, self.queries, self.rows):
+                lines.extend(histogram.render())
+        for name, (help_text, callback) in self.gauges.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in sorted(callback().items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'{name}{{key="{_escape(key)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedCursor:
+    """Cursor proxy that reports statement and fetch timings to the profiler"""
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._profiler.record_query(operation, params, time.perf_counter() - started)
+
+    def executemany(self, operation, seq_params):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params)
+        finally:
+            self._profiler.record_query(operation, f"<{len(seq_params)} rows>", time.perf_counter() - started)
+
+    def callproc(self, procname, args=()):
+        started = time.perf_counter()
+        try:
+            return self._cursor.callproc(procname, args)
+        finally:
+            self._profiler.record_query(f"CALL {procname}", args, time.perf_counter() - started)
+
+    def stored_results(self):
+        for result in self._cursor.stored_results():
+            yield InstrumentedCursor(result, self._profiler)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._profiler.record_fetch(time.perf_counter() - started, 1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=1):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._profiler.record_fetch(time.perf_counter() - started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._profiler.record_fetch(time.perf_counter() - started, len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that charges encoding time to the request profile.  Used
+    as a mixin in front of the provider class the app has installed.
+    """
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            profile = current_profile()
+            if profile is not None:
+                profile.serialize_time += time.perf_counter() - started
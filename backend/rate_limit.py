@@ -0,0 +1,265 @@
+"""
+Rate limiting and admission control for expensive routes.
+
+Routes are grouped into classes ('auth', 'upload', ...), each with its own
+limits:
+
+    ip           token bucket per client address, e.g. '20/minute'
+    user         token bucket per user (the session user, or a key the
+                 route supplies, such as the email being logged in to)
+    concurrency  requests of the class running at once in this process
+
+A client over a bucket gets 429 with Retry-After; a request that finds its
+class at the concurrency cap waits up to `queue_timeout` seconds for a slot
+and then gets 503 with Retry-After, so a handful of slow uploads cannot
+occupy every worker thread while dashboard reads queue behind them.
+
+Buckets live in a bounded in-process table; entries expire once their
+bucket would be full again, which is the same as having no entry.  With a
+shared store (Redis) the buckets are shared by all worker processes; if the
+store is unreachable the local table stands in until it is back.
+Concurrency caps are always per process.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, make_response, request, session
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(rate):
+    """'20/minute' -> (tokens per second, burst of 20); None stays None"""
+    if not rate:
+        return None
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count / PERIODS[period.strip().rstrip('s')], count
+
+
+class LocalBuckets:
+    """Token buckets in an LRU table of key -> [tokens, updated, expires]"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def take(self, key, rate, burst, cost=1):
+        """Take `cost` tokens; returns (allowed, seconds until they would be available)"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket[2] <= now:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = [tokens, now, now + (burst - tokens) / rate]
+            self._expire(now)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _expire(self, now):
+        # Least recently used first: drop expired entries from the front,
+        # then anything over the size bound
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if bucket[2] > now and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+            if bucket[2] > now:
+                self.evictions += 1
+
+
+TAKE_SCRIPT = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+if state[2] then
+    tokens = math.min(burst, tokens + (now - tonumber(state[2])) * rate)
+end
+local allowed = 0
+local wait = (cost - tokens) / rate
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+    wait = 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+class RedisBuckets:
+    """Shared token buckets, updated atomically by a Lua script"""
+
+    def __init__(self, url, prefix='ccrs:rate:'):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._take = self._redis.register_script(TAKE_SCRIPT)
+        self.prefix = prefix
+
+    def take(self, key, rate, burst, cost=1):
+        allowed, wait = self._take(keys=[self.prefix + key], args=[rate, burst, cost])
+        return bool(allowed), float(wait)
+
+
+def make_shared_buckets(url):
+    """RedisBuckets for `url`, or None (local buckets only) if unavailable"""
+    if not url:
+        return None
+    try:
+        return RedisBuckets(url)
+    except ImportError:
+        print("Rate limiter: redis package not installed, using local buckets only")
+        return None
+
+
+class RateLimiter:
+    """
+    Per-class token buckets and concurrency caps.
+
+    rules         -- {class: {'ip': '20/minute', 'user': '10/minute',
+                     'concurrency': 4}}; any of the three may be left out
+    queue_timeout -- seconds to wait for a concurrency slot before 503
+    """
+
+    def __init__(self, rules, shared=None, max_keys=100000, queue_timeout=2):
+        self.local = LocalBuckets(max_keys)
+        self.shared = shared
+        self.queue_timeout = queue_timeout
+        self.enabled = True
+        self.rules = {}
+        self._slots = {}
+        for route_class, rule in rules.items():
+            self.rules[route_class] = {'ip': parse_rate(rule.get('ip')), 'user': parse_rate(rule.get('user'))}
+            if rule.get('concurrency'):
+                self._slots[route_class] = threading.BoundedSemaphore(rule['concurrency'])
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.active = {route_class: 0 for route_class in self.rules}
+        self.shared_errors = 0
+
+    def check(self, route_class, ip, user_key=None):
+        """Take a token from each of the class's buckets; returns seconds to wait, or 0"""
+        wait = 0.0
+        rules = self.rules[route_class]
+        for scope, key in (('ip', ip), ('user', user_key)):
+            if rules[scope] is None or key is None:
+                continue
+            rate, burst = rules[scope]
+            allowed, retry_after = self._take(f"{route_class}:{scope}:{key}", rate, burst)
+            if not allowed:
+                self.count(route_class, f'limited_{scope}')
+                wait = max(wait, retry_after)
+        return wait
+
+    def acquire(self, route_class):
+        """Wait for a concurrency slot; False if none became free in time"""
+        slots = self._slots.get(route_class)
+        if slots is not None and not slots.acquire(timeout=self.queue_timeout):
+            self.count(route_class, 'rejected_busy')
+            return False
+        with self._lock:
+            self.active[route_class] += 1
+        return True
+
+    def release(self, route_class):
+        with self._lock:
+            self.active[route_class] -= 1
+        slots = self._slots.get(route_class)
+        if slots is not None:
+            slots.release()
+
+    def stats(self):
+        with self._lock:
+            stats = {f'{route_class}.{name}': value for (route_class, name), value in self.counters.items()}
+            stats.update({f'{route_class}.active': value for route_class, value in self.active.items()})
+        stats['local_keys'] = len(self.local)
+        stats['local_evictions'] = self.local.evictions
+        stats['shared_store'] = self.shared is not None
+        stats['shared_errors'] = self.shared_errors
+        return stats
+
+    def call(self, view, args, kwargs, route_class, user_key=None, methods=None):
+        """Run a view under the class's limits (see limit())"""
+        if not self.enabled or (methods and request.method not in methods):
+            return view(*args, **kwargs)
+
+        key = user_key() if user_key else session.get('user_id')
+        wait = self.check(route_class, request.remote_addr, key)
+        if wait:
+            return too_many_requests(wait)
+        if not self.acquire(route_class):
+            return jsonify({"error": "Server busy, please try again"}), 503, \
+                {'Retry-After': str(max(1, math.ceil(self.queue_timeout)))}
+
+        try:
+            response = view(*args, **kwargs)
+        except BaseException:
+            self.release(route_class)
+            raise
+        self.count(route_class, 'allowed')
+        return self._release_after(response, route_class)
+
+    # -- internals --
+
+    def _take(self, key, rate, burst):
+        if self.shared is not None:
+            try:
+                return self.shared.take(key, rate, burst)
+            except Exception as e:
+                with self._lock:
+                    self.shared_errors += 1
+                print(f"Rate limiter: shared store error, using local buckets: {e}")
+        return self.local.take(key, rate, burst)
+
+    def count(self, route_class, name):
+        with self._lock:
+            self.counters[(route_class, name)] = self.counters.get((route_class, name), 0) + 1
+
+    def _release_after(self, response, route_class):
+        # A streamed response still occupies the worker until it is closed
+        response = make_response(response)
+        if response.is_streamed:
+            response.call_on_close(lambda: self.release(route_class))
+        else:
+            self.release(route_class)
+        return response
+
+
+def limit(route_class, user_key=None, methods=None):
+    """
+    Apply a route class's limits to a view, using the limiter of the app
+    serving the request (app.extensions['rate_limiter']).
+
+    `user_key` is a callable giving the per-user bucket key; by default
+    the session's user id.  `methods` restricts the limits to some HTTP
+    methods of a view that serves several.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limiter = current_app.extensions['rate_limiter']
+            return limiter.call(view, args, kwargs, route_class, user_key, methods)
+        return wrapper
+    return decorator
+
+
+def too_many_requests(wait):
+    return jsonify({"error": "Too many requests, please slow down"}), 429, \
+        {'Retry-After': str(max(1, math.ceil(wait)))}
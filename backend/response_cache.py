@@ -0,0 +1,340 @@
+"""
+Response cache for read-heavy GET endpoints.
+
+Responses are cached per endpoint, arguments, role and user id, and tagged
+with the data they were built from (e.g. 'reports', 'report:42').  Write
+paths call invalidate() with the tags they touched instead of waiting for
+the TTL.
+
+The cache is two-level: a bounded in-process LRU with TTL, optionally in
+front of a shared store (Redis) so several worker processes share entries
+and invalidations.  Without a shared store the local LRU is used alone; in a
+multi-process deployment each worker then only sees its own invalidations,
+and the TTL bounds how stale another worker's copy can get.
+
+Every invalidation also bumps a generation counter per tag.  A miss records
+the generations of its tags before running the view and only stores the
+result if none changed meanwhile, so a read that started before a write
+cannot cache what it read after the write invalidated it.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, make_response, request, session
+
+
+class LocalStore:
+    """Bounded LRU with per-entry TTL and a tag -> keys index"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tags = {}
+        # Tag -> invalidation count; `_epoch` moves on when the map is pruned
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, tags = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def generations(self, tags):
+        with self._lock:
+            return self._generations_of(tags)
+
+    def set(self, key, value, ttl, tags=(), generations=None):
+        """Store an entry; with `generations`, only if none of its tags was invalidated since"""
+        with self._lock:
+            if generations is not None and self._generations_of(tags) != generations:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, tags):
+        removed = 0
+        with self._lock:
+            if len(self._generations) > self.max_entries * 4:
+                # Forget old tags; in-flight misses then just skip their set
+                self._generations.clear()
+                self._epoch += 1
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def _generations_of(self, tags):
+        return (self._epoch,) + tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Seconds a tag's generation is kept in Redis after its last invalidation;
+# longer than any view takes to run (an expired one only skips a set)
+GENERATION_TTL = 3600
+
+
+class RedisStore:
+    """Shared store: entries as strings with TTL, tags as sets of keys"""
+
+    def __init__(self, url, prefix='ccrs:cache:'):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self._redis.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def generations(self, tags):
+        if not tags:
+            return ()
+        return tuple(self._redis.mget([self._generation_key(tag) for tag in tags]))
+
+    def set(self, key, value, ttl, tags=(), generations=None):
+        """Store an entry; with `generations`, only if none of its tags was invalidated since"""
+        with self._redis.pipeline() as pipe:
+            try:
+                if generations is not None and tags:
+                    generation_keys = [self._generation_key(tag) for tag in tags]
+                    pipe.watch(*generation_keys)
+                    if tuple(pipe.mget(generation_keys)) != generations:
+                        return False
+                    pipe.multi()
+                pipe.set(self.prefix + key, json.dumps(value), ex=int(ttl))
+                for tag in tags:
+                    tag_key = self.prefix + 'tag:' + tag
+                    pipe.sadd(tag_key, key)
+                    pipe.expire(tag_key, int(ttl) * 2)
+                pipe.execute()
+            except self._watch_error:
+                return False
+        return True
+
+    def invalidate(self, tags):
+        removed = 0
+        for tag in tags:
+            generation_key = self._generation_key(tag)
+            self._redis.incr(generation_key)
+            self._redis.expire(generation_key, GENERATION_TTL)
+            tag_key = self.prefix + 'tag:' + tag
+            keys = self._redis.smembers(tag_key)
+            if keys:
+                removed += self._redis.delete(*[self.prefix + k.decode() for k in keys])
+            self._redis.delete(tag_key)
+        return removed
+
+    def _generation_key(self, tag):
+        return self.prefix + 'gen:' + tag
+
+    def clear(self):
+        keys = list(self._redis.scan_iter(self.prefix + '*'))
+        if keys:
+            self._redis.delete(*keys)
+
+
+def make_shared_store(url):
+    """RedisStore for `url`, or None (local cache only) if unavailable"""
+    if not url:
+        return None
+    try:
+        return RedisStore(url)
+    except ImportError:
+        print("Response cache: redis package not installed, using the local cache only")
+        return None
+
+
+class ResponseCache:
+    """
+    Two-level response cache.
+
+    default_ttl -- seconds an entry lives in the shared store (or locally,
+                   when there is none)
+    local_ttl   -- cap on local entry lifetime when a shared store is used,
+                   bounding staleness after another process invalidates
+    """
+
+    def __init__(self, max_entries=1024, default_ttl=60, shared=None, local_ttl=5):
+        self.local = LocalStore(max_entries)
+        self.shared = shared
+        self.default_ttl = default_ttl
+        self.local_ttl = local_ttl
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_skips = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                print(f"Response cache: shared store error: {e}")
+                value = None
+            if value is not None:
+                self.local.set(key, value, self.local_ttl, value.get('tags', ()))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def generations(self, tags):
+        """Tag generations to pass to set() after computing a value"""
+        shared = None
+        if self.shared is not None:
+            try:
+                shared = self.shared.generations(tags)
+            except Exception as e:
+                print(f"Response cache: shared store error: {e}")
+        return self.local.generations(tags), shared
+
+    def set(self, key, value, ttl=None, tags=(), generations=None):
+        """
+        Store a value.  With `generations` (from generations(), taken before
+        the value was computed) it is dropped if any tag was invalidated since.
+        """
+        ttl = ttl or self.default_ttl
+        value['tags'] = list(tags)
+        local_generations, shared_generations = generations or (None, None)
+        if self.shared is not None:
+            if generations is not None and shared_generations is None:
+                # The shared store was unreachable when the read began
+                stored = False
+            else:
+                try:
+                    stored = self.shared.set(key, value, ttl, tags, shared_generations)
+                except Exception as e:
+                    print(f"Response cache: shared store error: {e}")
+                    stored = True
+            stored = stored and self.local.set(key, value, min(ttl, self.local_ttl), tags, local_generations)
+        else:
+            stored = self.local.set(key, value, ttl, tags, local_generations)
+        if not stored:
+            with self._lock:
+                self.stale_skips += 1
+        return stored
+
+    def invalidate(self, *tags):
+        removed = self.local.invalidate(tags)
+        if self.shared is not None:
+            try:
+                removed += self.shared.invalidate(tags)
+            except Exception as e:
+                print(f"Response cache: shared store error: {e}")
+        with self._lock:
+            self.invalidations += 1
+        return removed
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.local.evictions,
+                'expirations': self.local.expirations,
+                'invalidations': self.invalidations,
+                'stale_skips': self.stale_skips,
+                'entries': len(self.local),
+                'shared_store': self.shared is not None,
+            }
+
+    def call(self, view, kwargs, tags=(), ttl=None):
+        """Serve a view from the cache, or run it and cache a successful GET (see cached())"""
+        if not self.enabled or request.method != 'GET' or 'user_id' not in session:
+            return view(**kwargs)
+
+        key = cache_key(kwargs)
+        entry = self.get(key)
+        if entry is not None:
+            response = Response(entry['body'], status=200, mimetype=entry['mimetype'])
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        tags = [tag.format(**kwargs) for tag in tags]
+        generations = self.generations(tags)
+        response = make_response(view(**kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            self.set(key, {
+                'body': response.get_data(as_text=True),
+                'mimetype': response.mimetype,
+            }, ttl, tags, generations)
+            response.headers['X-Cache'] = 'MISS'
+        return response
+
+
+def cached(tags=(), ttl=None):
+    """
+    Cache successful GET responses of a view in the response cache of the
+    app serving the request (app.extensions['response_cache']).
+
+    `tags` is a list of tag templates formatted with the view arguments,
+    e.g. ['reports', 'report:{report_id}'].  Keys include the user's role
+    and id, so nobody is ever served another user's copy.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            return current_app.extensions['response_cache'].call(view, kwargs, tags, ttl)
+        return wrapper
+    return decorator
+
+
+def cache_key(view_args):
+    """endpoint|role|user id|view args|sorted query string"""
+    args = ",".join(f"{k}={view_args[k]}" for k in sorted(view_args))
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    return f"{request.endpoint}|{session.get('role')}|{session.get('user_id')}|{args}|{query}"
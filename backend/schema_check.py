@@ -0,0 +1,126 @@
+"""
+Startup schema validation for CyberCrime Reporting System.
+
+Run once when the app starts: bring the database up to date (legacy column
+repairs, then pending migrations), read the columns of every table in one
+information_schema query, and check that everything the request handlers
+rely on is present.  The result is cached by the app as a SchemaCapabilities
+object, so hot paths never issue DDL or SHOW COLUMNS.  If the schema is
+behind and cannot be fixed automatically, SchemaOutOfDate says exactly what
+is missing.
+"""
+
+from mysql.connector import Error
+
+from migrate import MIGRATIONS_DIR, apply_migrations, pending_migrations
+
+# Columns the request handlers read or write, per table
+REQUIRED_COLUMNS = {
+    'users': ('id', 'name', 'email', 'password', 'role', 'is_active', 'created_at'),
+    'reports': ('id', 'victim_id', 'crime_type', 'description', 'date_submitted', 'status',
+                'priority', 'assigned_officer_id', 'assignment_date', 'assignment_note'),
+    'evidence': ('id', 'report_id', 'filename', 'original_name', 'file_path', 'file_size',
+                 'content_type', 'sha256', 'uploaded_by', 'upload_date'),
+    'case_logs': ('id', 'report_id', 'officer_id', 'action', 'notes', 'log_date'),
+    'audit_logs': ('id', 'user_id', 'action', 'details', 'ip_address', 'status', 'timestamp',
+                   'actor_name', 'actor_email', 'actor_role'),
+    'notifications': ('id', 'user_id', 'report_id', 'type', 'message', 'is_read', 'created_at'),
+    'dashboard_counters': ('scope', 'owner_id', 'total_reports', 'open_reports', 'investigating_reports',
+                           'closed_reports', 'rejected_reports', 'evidence_count', 'evidence_bytes',
+                           'response_days_total'),
+    'bulk_assignment_items': ('batch_key', 'item_no', 'report_id', 'officer_id', 'note', 'result', 'created_at'),
+}
+
+# Columns that older databases may lack and that can be added in place.
+# Applied before the versioned migrations, which may index them.
+LEGACY_REPAIRS = (
+    ('case_logs', 'log_date',
+     "ALTER TABLE case_logs ADD COLUMN log_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP AFTER notes"),
+)
+
+
+class SchemaOutOfDate(Exception):
+    """Raised when the database schema is missing tables or columns we need"""
+
+
+class SchemaCapabilities:
+    """Tables and columns present in the connected database"""
+
+    def __init__(self, columns, migrations_applied=()):
+        self.columns = columns
+        self.migrations_applied = list(migrations_applied)
+
+    def has_table(self, table):
+        return table in self.columns
+
+    def has_column(self, table, column):
+        return column in self.columns.get(table, ())
+
+    def missing(self, required=REQUIRED_COLUMNS):
+        """Return ['table', 'table.column', ...] for everything not present"""
+        missing = []
+        for table, columns in required.items():
+            if not self.has_table(table):
+                missing.append(table)
+                continue
+            missing.extend(f"{table}.{c}" for c in columns if not self.has_column(table, c))
+        return missing
+
+
+def inspect_schema(cursor):
+    """Read {table: set(columns)} for the current database"""
+    cursor.execute("""
+        SELECT TABLE_NAME, COLUMN_NAME
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    columns = {}
+    for table, column in cursor.fetchall():
+        columns.setdefault(table, set()).add(column)
+    return columns
+
+
+def ensure_schema(connection, auto_migrate=True, directory=MIGRATIONS_DIR):
+    """
+    Validate (and with auto_migrate, upgrade) the schema; return SchemaCapabilities.
+
+    Raises SchemaOutOfDate if required tables or columns are still missing,
+    or if migrations are pending and auto_migrate is off.
+    """
+    cursor = connection.cursor()
+    try:
+        columns = inspect_schema(cursor)
+        for table, column, ddl in LEGACY_REPAIRS:
+            if table in columns and column not in columns[table]:
+                if not auto_migrate:
+                    raise SchemaOutOfDate(f"Column {table}.{column} is missing")
+                print(f"Adding missing '{column}' column to {table} table")
+                cursor.execute(ddl)
+                connection.commit()
+    finally:
+        cursor.close()
+
+    applied = []
+    pending = pending_migrations(connection, directory)
+    if pending:
+        names = ", ".join(f"{version:04d}_{name}" for version, name, _, _ in pending)
+        if not auto_migrate:
+            raise SchemaOutOfDate(f"Pending migrations: {names}; run `python migrate.py`")
+        try:
+            applied = apply_migrations(connection, directory)
+        except Error as e:
+            raise SchemaOutOfDate(f"Applying migrations ({names}) failed: {e}") from e
+
+    cursor = connection.cursor()
+    try:
+        capabilities = SchemaCapabilities(inspect_schema(cursor), applied)
+    finally:
+        cursor.close()
+
+    missing = capabilities.missing()
+    if missing:
+        raise SchemaOutOfDate(
+            f"Database schema is missing {', '.join(missing)}; "
+            "run `flask --app wsgi init-db`"
+        )
+    return capabilities
@@ -0,0 +1,141 @@
+"""
+Full-text search over report descriptions, locations, crime types and
+case-log notes.
+
+Queries run against the InnoDB FULLTEXT indexes added by migration 0006 in
+BOOLEAN MODE.  The user's text is translated into that syntax here, so the
+query language is small and safe:
+
+    word        must match (all words are required)
+    word*       prefix match
+    "a phrase"  exact phrase
+    -word       must not match (also -"a phrase")
+
+Reports are ranked by their own relevance plus the best-matching case-log
+entry, and paginated with a keyset cursor on (score, id); the score is
+rounded in SQL so the cursor compares exactly.
+"""
+
+import re
+
+# innodb_ft_min_token_size and the default InnoDB stopword list: such words
+# are not indexed, so requiring them would match nothing
+MIN_TOKEN_SIZE = 3
+STOPWORDS = frozenset("""
+    a about an are as at be by com de en for from how i in is it la of on or
+    that the this to was what when where who will with und www
+""".split())
+
+TOKEN = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+WORD = re.compile(r'\w+', re.UNICODE)
+
+REPORT_MATCH = "MATCH(r.description, r.location, r.crime_type) AGAINST (%s IN BOOLEAN MODE)"
+LOG_MATCH = "MATCH(cl.notes, cl.action) AGAINST (%s IN BOOLEAN MODE)"
+
+
+class InvalidSearch(ValueError):
+    """Raised for queries with nothing searchable in them"""
+
+
+def _indexed(word):
+    return len(word) >= MIN_TOKEN_SIZE and word.lower() not in STOPWORDS
+
+
+def parse_query(text):
+    """
+    Translate a user query into a BOOLEAN MODE expression.
+
+    Returns (expression, ignored_words).  Raises InvalidSearch if no
+    required term is left.
+    """
+    parts = []
+    ignored = []
+    required = 0
+    for match in TOKEN.finditer(text or ''):
+        negate, phrase, raw = match.groups()
+        if phrase is not None:
+            words = WORD.findall(phrase)
+            prefix = False
+        else:
+            negate = raw.startswith('-')
+            prefix = raw.endswith('*')
+            words = WORD.findall(raw)
+        if not words:
+            continue
+
+        if len(words) > 1:
+            if not any(_indexed(w) for w in words):
+                ignored.extend(words)
+                continue
+            term = '"' + ' '.join(words) + '"'
+        else:
+            word = words[0]
+            if prefix:
+                term = word + '*'
+            elif _indexed(word):
+                term = word
+            else:
+                ignored.append(word)
+                continue
+
+        if negate:
+            parts.append('-' + term)
+        else:
+            parts.append('+' + term)
+            required += 1
+
+    if not required:
+        raise InvalidSearch("Search query has no searchable words "
+                            f"(words need at least {MIN_TOKEN_SIZE} letters and common words are ignored)")
+    return ' '.join(parts), ignored
+
+
+def search_reports(cursor, expression, scope_sql, scope_params, limit, position=None):
+    """
+    Ranked report ids for `expression` within the scope condition.
+
+    `scope_sql` is a condition on reports aliased r (e.g. "r.victim_id = %s")
+    or "" for no restriction.  Returns a list of dicts with id, score,
+    report_score and log_score, at most limit + 1 long (for page_response).
+    """
+    scope = f" AND {scope_sql}" if scope_sql else ""
+    after = ""
+    after_params = []
+    if position is not None:
+        score, row_id = position
+        after = "WHERE m.score < %s OR (m.score = %s AND m.id < %s)"
+        after_params = [score, score, row_id]
+
+    cursor.execute(f"""
+        SELECT m.id, m.score, m.report_score, m.log_score
+        FROM (
+            SELECT id, ROUND(SUM(report_score) + SUM(log_score), 6) AS score,
+                   SUM(report_score) AS report_score, SUM(log_score) AS log_score
+            FROM (
+                SELECT r.id, {REPORT_MATCH} AS report_score, 0 AS log_score
+                FROM reports r
+                WHERE {REPORT_MATCH}{scope}
+                UNION ALL
+                SELECT cl.report_id, 0, MAX({LOG_MATCH})
+                FROM case_logs cl
+                JOIN reports r ON r.id = cl.report_id
+                WHERE {LOG_MATCH}{scope}
+                GROUP BY cl.report_id
+            ) hits
+            GROUP BY id
+        ) m
+        {after}
+        ORDER BY m.score DESC, m.id DESC
+        LIMIT %s
+    """, [expression, expression] + list(scope_params)
+         + [expression, expression] + list(scope_params)
+         + after_params + [limit + 1])
+    rows = cursor.fetchall()
+    if rows and not isinstance(rows[0], dict):
+        rows = [dict(zip(('id', 'score', 'report_score', 'log_score'), row)) for row in rows]
+    for row in rows:
+        row['score'] = float(row['score'])
+        row['report_score'] = float(row['report_score'])
+        row['log_score'] = float(row['log_score'])
+    return rows
+
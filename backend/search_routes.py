@@ -0,0 +1,75 @@
+"""
+Report search, limited to the reports the user may see (see search.py).
+"""
+
+from flask import Blueprint, request, jsonify, session
+
+from pagination import parse_page_args, page_response
+from search import parse_query, search_reports
+from extensions import db_cursor
+
+bp = Blueprint('search', __name__)
+
+@bp.route('/search', methods=['GET'])
+def search():
+    """
+    Ranked full-text search over reports and their case logs.
+
+    Victims search their own reports, officers their assigned cases and
+    admins everything.  `q` supports word, word*, "phrase" and -word.
+    """
+    user_id = session.get('user_id')
+    role = session.get('role')
+    if not user_id or role not in ('victim', 'officer', 'admin'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    expression, ignored = parse_query(request.args.get('q', ''))
+    limit, position, _ = parse_page_args(request.args, default_limit=20, max_limit=100)
+    
+    if role == 'victim':
+        scope_sql, scope_params = "r.victim_id = %s", [user_id]
+    elif role == 'officer':
+        scope_sql, scope_params = "r.assigned_officer_id = %s", [user_id]
+    else:
+        scope_sql, scope_params = "", []
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            hits, page = page_response(
+                search_reports(cursor, expression, scope_sql, scope_params, limit, position),
+                limit, 'score'
+            )
+            
+            results = []
+            if hits:
+                placeholders = ", ".join(["%s"] * len(hits))
+                cursor.execute(f"""
+                    SELECT r.id, r.crime_type, r.description, r.date_occurred, r.date_submitted,
+                           r.location, r.status, r.priority,
+                           u.name as victim_name, o.name as assigned_officer_name
+                    FROM reports r
+                    JOIN users u ON r.victim_id = u.id
+                    LEFT JOIN users o ON r.assigned_officer_id = o.id
+                    WHERE r.id IN ({placeholders})
+                """, [hit['id'] for hit in hits])
+                reports = {report['id']: report for report in cursor.fetchall()}
+                
+                for hit in hits:
+                    report = reports.get(hit['id'])
+                    if not report:
+                        continue
+                    report['score'] = hit['score']
+                    report['matched_in'] = [name for name, score in
+                                            (('report', hit['report_score']), ('case_logs', hit['log_score']))
+                                            if score > 0]
+                    results.append(report)
+            
+            return jsonify({
+                'results': results,
+                'page': page,
+                'query': {'expression': expression, 'ignored_words': ignored}
+            }), 200
+        
+        except Exception as e:
+            print(f"Database error in search: {e}")
+            return jsonify({"error": "Database error"}), 500
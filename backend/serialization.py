@@ -0,0 +1,77 @@
+"""
+JSON serialization for API responses.
+
+AppJSONProvider encodes the types rows come back from MySQL with --
+datetime, date and Decimal -- itself, so handlers return rows as fetched
+instead of converting fields one row at a time.  Datetimes keep the format
+the API has always used ('YYYY-MM-DD HH:MM:SS', dates 'YYYY-MM-DD'), and
+Decimals (SUM/AVG results) become numbers.
+
+With orjson installed (and JSON_FAST_ENCODER on), encoding goes through it;
+otherwise through the standard library json module.
+
+fetch_dicts() maps the rows of a plain tuple cursor to dicts with the
+column names looked up once; the dictionary cursor rebuilds the column-name
+tuple for every row.  It still creates one dict per row (about a quarter of
+the encode time of a 50,000-row response on orjson).  Encoding the tuples
+directly, with the keys written per value, measured slower than building the
+dicts and encoding them in one call, so rows are not serialized that way.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_value(o):
+    """JSON value for the non-JSON types that come out of the database"""
+    if isinstance(o, datetime):
+        return o.isoformat(' ', 'seconds')
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return int(o) if o == o.to_integral_value() else float(o)
+    return DefaultJSONProvider.default(o)
+
+
+def dumps(obj, sort_keys=False, fast=True):
+    """Compact JSON text for `obj`, through orjson when available"""
+    if fast and orjson is not None:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=encode_value, option=option).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; the standard library copes
+            pass
+    return json.dumps(obj, default=encode_value, sort_keys=sort_keys, separators=(',', ':'))
+
+
+def fetch_dicts(cursor):
+    """All remaining rows of a tuple cursor as dicts (one per row; see above)"""
+    columns = cursor.column_names
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using encode_value and, if enabled, orjson"""
+
+    default = staticmethod(encode_value)
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.fast = app.config.get('JSON_FAST_ENCODER', True)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Explicit json.dumps options (indent etc.): use the standard path
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=self.sort_keys, fast=self.fast)
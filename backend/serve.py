@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Production launcher: a pre-forking master process and its workers.
+
+Usage:
+    python serve.py [--bind 0.0.0.0:5000] [--workers N] [--worker-class sync|threaded|green]
+        [--threads 8] [--streams 64] [--connections 1000] [--max-requests 5000] [--max-requests-jitter 500]
+        [--graceful-timeout 120] [--timeout 60] [--pid serve.pid] [--app wsgi:app]
+
+The defaults come from the SERVER_* settings in the app's config.
+
+The master imports the application once, before forking, so a broken
+import fails the launch and the workers share the loaded code
+copy-on-write.  The module's on_preload(app) hook runs then too (app.py
+validates and migrates the schema there).  The master then binds the
+listening socket and forks the workers; each one calls
+on_worker_start(app, worker_id, workers) and accepts connections from the
+shared socket:
+
+    sync      one request at a time, no threads
+    threaded  up to --threads requests at once on a thread pool, plus up
+              to --streams long-lived responses (see below)
+    green     gevent greenlets, up to --connections at once (needs gevent;
+              the master patches the standard library before the import)
+
+Without --workers: 2 x CPUs + 1 sync workers, or one threaded/green worker
+per CPU.  After --max-requests (plus a random part of the jitter) a worker
+stops accepting, finishes what it is serving and exits, and the master
+forks a fresh one, so a slow leak never outlives a worker.
+
+Signals to the master:
+
+    TERM, INT  graceful shutdown: the workers stop accepting, call
+               on_worker_drain(app), finish the requests in flight (uploads
+               included) for up to --graceful-timeout seconds, and exit
+    HUP        zero-downtime reload: start a new master on the same socket,
+               which imports the code afresh and forks its workers, then
+               shuts this one down gracefully.  If the new master fails to
+               start, this one keeps serving.  The master's pid changes.
+    QUIT       immediate shutdown
+
+Connections are HTTP/1.0, one request each: run the launcher behind a
+reverse proxy that keeps the client connections alive.
+
+A long-lived response (a Server-Sent Events stream) would hold one of a
+threaded worker's --threads for its whole life.  It can call
+environ['serve.release_slot']() first: the worker then stops counting it
+against --threads and runs it as one of its --streams.  The call returns
+False when there is no stream slot free (and always under sync workers),
+and the app should then turn the request away.
+"""
+
+import atexit
+import importlib
+import os
+import random
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+WORKER_CLASSES = ('sync', 'threaded', 'green')
+POLL_INTERVAL = 0.5
+# Seconds a new master's workers must stay up before it retires the old master
+READY_AFTER = 2
+# Seconds to wait before replacing a worker that died straight after starting
+RESPAWN_BACKOFF = 1
+LISTEN_FD_ENV = 'SERVE_LISTEN_FD'
+PARENT_PID_ENV = 'SERVE_PARENT_PID'
+
+
+def default_workers(worker_class):
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return 2 * cpus + 1 if worker_class == 'sync' else cpus
+
+
+def listen(bind, backlog=2048):
+    """A listening socket for 'host:port', shared by all the workers"""
+    inherited = os.environ.get(LISTEN_FD_ENV)
+    if inherited:
+        listener = socket.socket(fileno=int(inherited))
+    else:
+        host, _, port = bind.rpartition(':')
+        host = host.strip('[]') or '0.0.0.0'
+        listener = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((host, int(port)))
+        listener.listen(backlog)
+    # Idle workers all wake up for a new connection; the ones that lose the
+    # race must not block in accept()
+    listener.setblocking(False)
+    listener.set_inheritable(True)
+    return listener
+
+
+class RequestHandler(WSGIRequestHandler):
+    # One request per connection: keep-alive would pin a worker (or a worker
+    # thread) to an idle client
+    protocol_version = 'HTTP/1.0'
+
+    def setup(self):
+        self.timeout = self.server.request_timeout
+        super().setup()
+
+    def make_environ(self):
+        environ = super().make_environ()
+        environ['serve.release_slot'] = self.server.release_slot
+        return environ
+
+
+class RequestCounter:
+    """WSGI middleware calling `on_limit` once `max_requests` requests have started"""
+
+    def __init__(self, app, max_requests, on_limit):
+        self.app = app
+        self.max_requests = max_requests
+        self.on_limit = on_limit
+        self.handled = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.handled += 1
+            reached = self.handled == self.max_requests
+        if reached:
+            self.on_limit()
+        return self.app(environ, start_response)
+
+
+class WorkerServer(BaseWSGIServer):
+    """
+    A sync or threaded worker's server on the inherited listening socket.
+
+    With `threads`, a connection is only accepted while a thread is free,
+    so a busy worker leaves new connections to its idle siblings.  Up to
+    `streams` more threads run the responses that released their slot.
+    """
+
+    def __init__(self, listener, app, threads=None, request_timeout=60, streams=0):
+        self.multithread = bool(threads)
+        self.request_timeout = request_timeout
+        host, port = listener.getsockname()[:2]
+        super().__init__(host, port, app, handler=RequestHandler, fd=listener.fileno())
+        self.slots = threading.BoundedSemaphore(threads) if threads else None
+        self.stream_slots = threading.BoundedSemaphore(streams) if threads and streams else None
+        self.executor = ThreadPoolExecutor(threads + streams, thread_name_prefix='request') if threads else None
+        self._connection = threading.local()
+
+    def serve(self, worker):
+        try:
+            while not worker.stopping:
+                if self.slots is not None and not self.slots.acquire(timeout=POLL_INTERVAL):
+                    continue
+                connection = None
+                try:
+                    if select.select([self.socket], [], [], POLL_INTERVAL)[0]:
+                        connection, address = self.socket.accept()
+                except (BlockingIOError, InterruptedError):
+                    pass  # another worker took it
+                if connection is None:
+                    if self.slots is not None:
+                        self.slots.release()
+                    worker.check_master()
+                elif self.executor is not None:
+                    self.executor.submit(self.handle_connection, connection, address)
+                else:
+                    self.handle_connection(connection, address)
+        finally:
+            self.server_close()
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+
+    def handle_connection(self, connection, address):
+        self._connection.streaming = False
+        try:
+            self.finish_request(connection, address)
+        except Exception:
+            self.handle_error(connection, address)
+        finally:
+            self.shutdown_request(connection)
+            if self._connection.streaming:
+                self.stream_slots.release()
+            elif self.slots is not None:
+                self.slots.release()
+
+    def release_slot(self):
+        """Move the current connection from its thread slot to a stream slot; False if none is free"""
+        if getattr(self._connection, 'streaming', False):
+            return True
+        if self.stream_slots is None or not self.stream_slots.acquire(blocking=False):
+            return False
+        self._connection.streaming = True
+        self.slots.release()
+        return True
+
+
+def serve_green(worker, listener, app, connections):
+    from gevent import sleep
+    from gevent.pool import Pool
+    from gevent.pywsgi import WSGIServer
+
+    server = WSGIServer(listener, app, spawn=Pool(connections))
+    server.start()
+    while not worker.stopping:
+        sleep(POLL_INTERVAL)
+        worker.check_master()
+    server.stop(timeout=worker.graceful_timeout)
+
+
+class Worker:
+    """State of one forked worker process"""
+
+    def __init__(self, worker_id, master_pid, options):
+        self.worker_id = worker_id
+        self.master_pid = master_pid
+        self.options = options
+        self.graceful_timeout = options['graceful_timeout']
+        self.module = None
+        self.application = None
+        self.stopping = False
+
+    def run(self, module, application, listener):
+        self.module = module
+        self.application = application
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.drain_soon('shutting down'))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # the master handles Ctrl-C
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGQUIT, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        random.seed()
+
+        options = self.options
+        hook = getattr(module, 'on_worker_start', None)
+        if hook:
+            hook(application, self.worker_id, options['workers'])
+        max_requests = options['max_requests']
+        if max_requests:
+            max_requests += random.randint(0, options['max_requests_jitter'])
+            application = RequestCounter(application, max_requests,
+                                         lambda: self.drain_soon(f'served {max_requests} requests'))
+        print(f"Worker {os.getpid()}: started ({options['worker_class']})")
+
+        if options['worker_class'] == 'green':
+            serve_green(self, listener, application, options['connections'])
+        else:
+            threads = options['threads'] if options['worker_class'] == 'threaded' else None
+            WorkerServer(listener, application, threads, options['timeout'], options['streams']).serve(self)
+        print(f"Worker {os.getpid()}: exiting")
+
+    def check_master(self):
+        if os.getppid() != self.master_pid:
+            self.drain_soon('master has gone away')
+
+    def drain_soon(self, reason):
+        # Stop accepting now, but leave the drain hook to a thread: a signal
+        # handler or request thread may hold a lock the hook needs
+        if self.stopping:
+            return
+        self.stopping = True
+        threading.Thread(target=self.drain, args=(reason,), daemon=True).start()
+
+    def drain(self, reason):
+        print(f"Worker {os.getpid()}: {reason}, finishing requests in flight")
+        timer = threading.Timer(self.graceful_timeout, self.force_exit)
+        timer.daemon = True
+        timer.start()
+        hook = getattr(self.module, 'on_worker_drain', None)
+        if hook:
+            hook(self.application)
+
+    def force_exit(self):
+        print(f"Worker {os.getpid()}: requests still running after {self.graceful_timeout}s, exiting")
+        os._exit(1)
+
+
+class Master:
+    """Forks the workers, replaces the ones that exit, and handles the signals"""
+
+    def __init__(self, module, application, listener, options):
+        self.module = module
+        self.application = application
+        self.listener = listener
+        self.options = options
+        self.workers = {}  # pid -> (worker id, started)
+        self.signals = []
+        self.reloading = None
+        self.wake = ()
+        self.parent_pid = int(os.environ.pop(PARENT_PID_ENV, 0)) or None
+        os.environ.pop(LISTEN_FD_ENV, None)
+        self.cwd = os.getcwd()
+
+    def run(self):
+        wake_read, wake_write = self.wake = os.pipe()
+        os.set_blocking(wake_write, False)
+        signal.set_wakeup_fd(wake_write)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT, signal.SIGCHLD):
+            signal.signal(signum, lambda signum, frame: self.signals.append(signum))
+        self.write_pid()
+        print(f"Master {os.getpid()}: listening on {self.options['bind']}, "
+              f"{self.options['workers']} {self.options['worker_class']} workers")
+
+        try:
+            for worker_id in range(self.options['workers']):
+                self.spawn(worker_id)
+            while True:
+                if select.select([wake_read], [], [], POLL_INTERVAL)[0]:
+                    os.read(wake_read, 64)
+                while self.signals:
+                    signum = self.signals.pop(0)
+                    if signum in (signal.SIGTERM, signal.SIGINT):
+                        return self.stop(graceful=True)
+                    if signum == signal.SIGQUIT:
+                        return self.stop(graceful=False)
+                    if signum == signal.SIGHUP:
+                        self.reload()
+                self.reap()
+                self.retire_parent()
+        finally:
+            self.remove_pid()
+
+    def spawn(self, worker_id):
+        worker = Worker(worker_id, os.getpid(), self.options)
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = (worker_id, time.monotonic())
+            return
+        code = 0
+        try:
+            signal.set_wakeup_fd(-1)
+            for fd in self.wake:
+                os.close(fd)
+            worker.run(self.module, self.application, self.listener)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # Run the worker's own exit handlers (the audit writer's flush),
+            # then leave without unwinding into the master's code
+            atexit._run_exitfuncs()
+            sys.stdout.flush()
+            os._exit(code)
+
+    def reap(self, respawn=True):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            code = os.waitstatus_to_exitcode(status)
+            if self.reloading is not None and pid == self.reloading.pid:
+                self.reloading.returncode = code
+                self.reloading = None
+                print(f"Master {os.getpid()}: reload failed (exit {code}), keeping the current workers")
+                continue
+            worker_id, started = self.workers.pop(pid, (None, None))
+            if worker_id is None:
+                continue
+            if code:
+                print(f"Master {os.getpid()}: worker {pid} exited with {code}")
+            if respawn:
+                if code and time.monotonic() - started < RESPAWN_BACKOFF:
+                    time.sleep(RESPAWN_BACKOFF)
+                self.spawn(worker_id)
+
+    def reload(self):
+        if self.reloading is not None:
+            return
+        print(f"Master {os.getpid()}: reloading")
+        fd = self.listener.fileno()
+        env = dict(os.environ, **{LISTEN_FD_ENV: str(fd), PARENT_PID_ENV: str(os.getpid())})
+        self.reloading = subprocess.Popen([sys.executable] + sys.argv, env=env, cwd=self.cwd, pass_fds=(fd,))
+
+    def retire_parent(self):
+        # After a reload: once this master's workers are up, stop the old one
+        if self.parent_pid is None or len(self.workers) < self.options['workers']:
+            return
+        now = time.monotonic()
+        if all(now - started >= READY_AFTER for worker_id, started in self.workers.values()):
+            print(f"Master {os.getpid()}: workers ready, stopping the old master {self.parent_pid}")
+            try:
+                os.kill(self.parent_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self.parent_pid = None
+
+    def stop(self, graceful):
+        print(f"Master {os.getpid()}: {'graceful' if graceful else 'immediate'} shutdown")
+        self.listener.close()
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM if graceful else signal.SIGKILL)
+        deadline = time.monotonic() + (self.options['graceful_timeout'] + 5 if graceful else 5)
+        while self.workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self.reap(respawn=False)
+        for pid in self.workers:
+            os.kill(pid, signal.SIGKILL)
+        print(f"Master {os.getpid()}: stopped")
+
+    def write_pid(self):
+        if self.options['pid']:
+            with open(self.options['pid'], 'w') as f:
+                f.write(f"{os.getpid()}\n")
+
+    def remove_pid(self):
+        # After a reload the file belongs to the new master
+        path = self.options['pid']
+        if not path:
+            return
+        try:
+            with open(path) as f:
+                if int(f.read().strip() or 0) == os.getpid():
+                    os.unlink(path)
+        except (OSError, ValueError):
+            pass
+
+
+def main(argv):
+    def option(name, default):
+        return argv[argv.index(name) + 1] if name in argv else default
+
+    worker_class = option('--worker-class', None)
+    if worker_class == 'green':
+        from gevent import monkey
+        monkey.patch_all()
+
+    module_name, _, attribute = option('--app', 'wsgi:app').partition(':')
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(module_name)
+    application = getattr(module, attribute or 'app')
+    config = application.config
+    worker_class = worker_class or config['SERVER_WORKER_CLASS']
+    if worker_class not in WORKER_CLASSES:
+        print(__doc__)
+        return 1
+    if worker_class == 'green' and 'gevent' not in sys.modules:
+        print("Green workers: pass --worker-class green, the standard library is patched before the import")
+        return 1
+
+    options = {
+        'bind': option('--bind', config['SERVER_BIND']),
+        'worker_class': worker_class,
+        'workers': int(option('--workers', config['SERVER_WORKERS'] or default_workers(worker_class))),
+        'threads': int(option('--threads', config['SERVER_THREADS'])),
+        'streams': int(option('--streams', config['SERVER_STREAMS'])),
+        'connections': int(option('--connections', config['SERVER_GREEN_CONNECTIONS'])),
+        'max_requests': int(option('--max-requests', config['SERVER_MAX_REQUESTS'] or 0)),
+        'max_requests_jitter': int(option('--max-requests-jitter', config['SERVER_MAX_REQUESTS_JITTER'])),
+        'graceful_timeout': float(option('--graceful-timeout', config['SERVER_GRACEFUL_TIMEOUT'])),
+        'timeout': float(option('--timeout', config['SERVER_REQUEST_TIMEOUT'])),
+        'pid': option('--pid', config['SERVER_PID_FILE']),
+    }
+
+    hook = getattr(module, 'on_preload', None)
+    if hook:
+        hook(application)
+    listener = listen(options['bind'])
+    Master(module, application, listener, options).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,142 @@
+"""
+Default settings for the CyberCrime Reporting System backend.
+
+create_app() loads these, then any CCRS_* environment variables (for
+example CCRS_MYSQL_PASSWORD=secret or CCRS_DB_POOL_SIZE=20; values are
+parsed as JSON where they can be, and CCRS_RATE_LIMITS__auth__ip=5/minute
+sets a nested key), then the config it was given.
+"""
+
+import os
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+SECRET_KEY = 'your_secret_key'  # Needed for session
+
+MYSQL_HOST = 'localhost'
+MYSQL_USER = 'root'
+MYSQL_PASSWORD = '123456'
+MYSQL_DB = 'cybercrime_db'
+
+# Connection pool settings
+DB_POOL_SIZE = 10
+DB_POOL_MAX_OVERFLOW = 5
+DB_POOL_TIMEOUT = 5
+DB_POOL_PRE_PING = True
+DB_POOL_RECYCLE = 3600
+DB_POOL_LEAK_THRESHOLD = 30
+
+# Audit log writer settings
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 1.0
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_SPILL_FILE = os.path.join(here, 'audit_spill.jsonl')
+
+# Audit log partitions: months kept in the table, where dropped months are
+# archived (None drops them without archiving), seconds between maintenance
+# runs (None disables the job), and the days /admin/audit_logs reads by default
+AUDIT_RETENTION_MONTHS = 12
+AUDIT_ARCHIVE_FOLDER = os.path.join(here, 'audit_archive')
+AUDIT_MAINTENANCE_INTERVAL = 86400
+AUDIT_RECENT_DAYS = 31
+
+# Encode responses with orjson when it is installed
+JSON_FAST_ENCODER = True
+
+# Request profiling: statements slower than this (seconds) go to the slow-query log
+SLOW_QUERY_THRESHOLD = 0.2
+SLOW_QUERY_LOG_SIZE = 200
+
+# Apply legacy repairs and pending migrations when the schema is validated at startup
+SCHEMA_AUTO_MIGRATE = True
+
+# Notification streams: with several worker processes, also poll the table on
+# each heartbeat for events published by the other workers
+NOTIFICATIONS_CATCH_UP = False
+
+# Seconds between dashboard counter reconciliations (None disables the job)
+DASHBOARD_RECONCILE_INTERVAL = 3600
+
+# Response cache: local LRU size and TTLs (seconds); set CACHE_SHARED_URL to a
+# redis:// URL to share entries and invalidations between worker processes
+CACHE_ENABLED = True
+CACHE_MAX_ENTRIES = 2048
+CACHE_DEFAULT_TTL = 60
+CACHE_LOCAL_TTL = 5
+CACHE_SHARED_URL = None
+
+# Rate limits per route class: token buckets per client IP and per user
+# (N/second|minute|hour|day), requests of the class running at once in each
+# process, and seconds a request waits for a slot before a 503.  Set
+# RATE_LIMIT_SHARED_URL to a redis:// URL to share the buckets between
+# worker processes
+RATE_LIMIT_ENABLED = True
+RATE_LIMITS = {
+    'auth': {'ip': '30/minute', 'user': '10/minute'},
+    'upload': {'ip': '60/hour', 'user': '30/hour', 'concurrency': 4},
+    'export': {'user': '10/minute', 'concurrency': 2},
+}
+RATE_LIMIT_QUEUE_TIMEOUT = 2
+RATE_LIMIT_MAX_KEYS = 100000
+RATE_LIMIT_SHARED_URL = None
+
+# Bulk assignment: items per batch, and days batch results are kept for retries
+BULK_ASSIGN_MAX_ITEMS = 5000
+BULK_ASSIGN_RETENTION_DAYS = 7
+
+# Automatic assignment to the least-loaded officer with a matching specialization:
+# on report submission (if enabled), caseload cap (None for no cap), and seconds
+# between full reloads of the caseloads (picks up other workers' assignments)
+AUTO_ASSIGN_ON_SUBMIT = False
+AUTO_ASSIGN_MAX_CASELOAD = None
+AUTO_ASSIGN_RELOAD_INTERVAL = 300
+
+# Password hashing: hash-cost policy for new (and, on login, upgraded) hashes,
+# worker processes (0 hashes on the request thread), calls queued or running
+# at once, and seconds a request waits for a slot before getting a 503
+PASSWORD_HASH_METHOD = 'pbkdf2:sha256:600000'
+PASSWORD_HASH_WORKERS = 2
+PASSWORD_HASH_MAX_PENDING = 64
+PASSWORD_HASH_TIMEOUT = 10
+
+# Async serving mode (async_app.py): size of its aiomysql pool, and seconds a
+# request body (an upload) may take to arrive
+ASYNC_DB_POOL_MIN = 2
+ASYNC_DB_POOL_MAX = 20
+ASYNC_BODY_TIMEOUT = 600
+
+# Production launcher (serve.py): listen address, worker class ('sync',
+# 'threaded' or 'green'), worker processes (None sizes by CPU count), threads
+# per threaded worker, long-lived notification streams per threaded worker on
+# top of those threads (further streams get a 503 and retry later; sync
+# workers serve none), connections per green worker, requests a worker serves
+# before it is replaced (plus up to the jitter, so they don't all restart at
+# once), seconds a stopping worker has to finish its requests (uploads
+# included), seconds a client may sit idle mid-request, and the pid file
+SERVER_BIND = '0.0.0.0:5000'
+SERVER_WORKER_CLASS = 'threaded'
+SERVER_WORKERS = None
+SERVER_THREADS = 8
+SERVER_STREAMS = 64
+SERVER_GREEN_CONNECTIONS = 1000
+SERVER_MAX_REQUESTS = 5000
+SERVER_MAX_REQUESTS_JITTER = 500
+SERVER_GRACEFUL_TIMEOUT = 120
+SERVER_REQUEST_TIMEOUT = 60
+SERVER_PID_FILE = None
+
+# Streaming exports: rows fetched per chunk, and gzip level when compressing
+EXPORT_BATCH_SIZE = 1000
+EXPORT_GZIP_LEVEL = 6
+
+# Uploads, created when the app is
+UPLOAD_FOLDER = os.path.join(here, 'uploads')
+# Upload limits: the whole request body, and each individual file
+MAX_CONTENT_LENGTH = 512 * 1024 * 1024
+MAX_FILE_SIZE = 256 * 1024 * 1024
+# Content-addressed evidence store, sharded as blobs/ab/cd/<sha256>
+# (None puts it in UPLOAD_FOLDER/blobs)
+BLOB_FOLDER = None
+# Let the fronting web server stream evidence: None, 'x-sendfile' or 'x-accel-redirect'
+EVIDENCE_SENDFILE = None
+EVIDENCE_ACCEL_PREFIX = '/protected-evidence/'
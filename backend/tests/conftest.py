@@ -0,0 +1,7 @@
+# Run from backend/: python -m pytest -q tests
+
+import os
+import sys
+
+# The backend is a flat set of modules, imported from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
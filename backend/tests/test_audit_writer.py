@@ -0,0 +1,134 @@
+import json
+import os
+
+import pytest
+from mysql.connector import errors
+
+from audit_writer import INSERT_COLUMNS, MAX_REPLAY_FAILURES, AuditWriter
+
+
+class FakeDatabase:
+    """audit_logs rows by `details`; refuses rows whose details are 'bad'"""
+
+    def __init__(self):
+        self.up = True
+        self.rows = []
+
+    def connect(self):
+        return FakeConnection(self) if self.up else None
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.db.rows.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, params=()):
+        if query.startswith('INSERT'):
+            details = list(params)[INSERT_COLUMNS.index('details')::len(INSERT_COLUMNS)]
+            if 'bad' in details:
+                raise errors.DataError("Data too long for column 'details'")
+            self.connection.pending.extend(details)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def writer(db, tmp_path):
+    writer = AuditWriter(db.connect, batch_size=10, flush_interval=0.05,
+                         spill_path=str(tmp_path / 'audit_spill.jsonl'))
+    yield writer
+    writer.close()
+
+
+def spilled(writer):
+    if not os.path.exists(writer.spill_path):
+        return []
+    with open(writer.spill_path) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_batches_are_written(db, writer):
+    for i in range(25):
+        writer.submit('Login', f'event {i}')
+    assert writer.flush()
+    assert sorted(db.rows) == sorted(f'event {i}' for i in range(25))
+    assert writer.stats()['written'] == 25
+
+
+def test_outage_spills_and_replays(db, writer):
+    db.up = False
+    writer.submit('Login', 'during outage')
+    assert writer.flush()
+    assert [event['details'] for event in spilled(writer)] == ['during outage']
+
+    db.up = True
+    writer.submit('Login', 'after outage')
+    # The replay follows the write; close() waits for it
+    writer.close()
+    assert set(db.rows) == {'during outage', 'after outage'}
+    assert spilled(writer) == []
+    assert writer.stats()['replayed'] == 1
+
+
+def test_refused_event_is_set_aside(db, writer):
+    db.up = False
+    for details in ('first', 'bad', 'last'):
+        writer.submit('Login', details)
+    assert writer.flush()
+
+    db.up = True
+    # Each successful write is followed by one replay of the spill
+    for i in range(MAX_REPLAY_FAILURES):
+        writer.submit('Login', f'live {i}')
+        assert writer.flush()
+    writer.close()
+
+    assert {'first', 'last'} <= set(db.rows)
+    assert 'bad' not in db.rows
+    assert spilled(writer) == []
+    with open(writer.spill_path + '.rejected') as file:
+        rejected = [json.loads(line) for line in file]
+    assert [(event['details'], event['replay_failures']) for event in rejected] == [('bad', MAX_REPLAY_FAILURES)]
+    assert writer.stats()['rejected'] == 1
+
+
+def test_failed_replay_does_not_lose_the_batch(db, writer, monkeypatch, capsys):
+    def broken():
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(writer, '_replay_spill', broken)
+    writer.submit('Login', 'kept')
+    assert writer.flush()
+    writer.close()
+    assert db.rows == ['kept']
+    output = capsys.readouterr().out
+    assert 'lost' not in output
+    assert 'Error replaying spilled audit events: disk gone' in output
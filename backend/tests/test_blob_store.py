@@ -0,0 +1,108 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from blob_store import BlobStore, collect_garbage, hash_file
+from uploads import HashingSpoolFile
+
+
+def spool(directory, data):
+    file = HashingSpoolFile(str(directory))
+    file.write(data)
+    return file
+
+
+class FakeCursor:
+    """Answers reference_counts()' query from a set of referenced digests"""
+
+    def __init__(self, referenced):
+        self.referenced = referenced
+        self.rows = []
+        self.closed = False
+
+    def execute(self, query, params):
+        self.rows = [(sha256, 1) for sha256 in params if sha256 in self.referenced]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, referenced=()):
+        self.cursors = []
+        self.referenced = set(referenced)
+
+    def cursor(self):
+        cursor = FakeCursor(self.referenced)
+        self.cursors.append(cursor)
+        return cursor
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / 'blobs'))
+
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_path_for_shards_by_digest(store):
+    digest = hashlib.sha256(b'x').hexdigest()
+    assert store.path_for(digest) == os.path.join(store.root, digest[:2], digest[2:4], digest)
+    with pytest.raises(ValueError):
+        store.path_for('../../etc/passwd')
+    with pytest.raises(ValueError):
+        store.path_for(digest.upper())
+
+
+def test_put_stores_by_content(store, tmp_path):
+    path = store.put(spool(tmp_path, b'evidence'))
+    digest = hashlib.sha256(b'evidence').hexdigest()
+    assert path == store.path_for(digest)
+    with open(path, 'rb') as file:
+        assert file.read() == b'evidence'
+    assert hash_file(path) == digest
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.part')]
+
+
+def test_put_duplicate_discards_spool_and_refreshes_mtime(store, tmp_path):
+    path = store.put(spool(tmp_path, b'same'))
+    age(path, 7200)
+    duplicate = spool(tmp_path, b'same')
+    assert store.put(duplicate) == path
+    assert not os.path.exists(duplicate.temp_path)
+    assert time.time() - os.stat(path).st_mtime < 60
+
+
+def test_put_path(store, tmp_path):
+    source = tmp_path / 'legacy.pdf'
+    source.write_bytes(b'legacy')
+    sha256, path = store.put_path(str(source))
+    assert sha256 == hashlib.sha256(b'legacy').hexdigest()
+    assert store.exists(sha256)
+    assert list(store.iter_blobs()) == [(sha256, path)]
+
+
+def test_gc_removes_only_old_unreferenced_blobs(store, tmp_path):
+    referenced = store.put(spool(tmp_path, b'referenced'))
+    orphan = store.put(spool(tmp_path, b'orphan'))
+    fresh = store.put(spool(tmp_path, b'fresh orphan'))
+    age(referenced, 7200)
+    age(orphan, 7200)
+
+    connection = FakeConnection([os.path.basename(referenced)])
+    removed, freed = collect_garbage(connection, store, grace_seconds=3600, batch_size=2)
+
+    assert (removed, freed) == (1, len(b'orphan'))
+    assert os.path.exists(referenced)
+    assert not os.path.exists(orphan)
+    assert os.path.exists(fresh)
+    assert len(connection.cursors) == 1
+    assert connection.cursors[0].closed
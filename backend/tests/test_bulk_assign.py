@@ -0,0 +1,42 @@
+import pytest
+
+import bulk_assign
+from bulk_assign import InvalidBatch, current_officers, parse_assignments
+
+
+class FakeCursor:
+    def __init__(self, assigned):
+        self.assigned = assigned
+        self.queries = 0
+        self.rows = []
+
+    def execute(self, query, params):
+        self.queries += 1
+        self.rows = [{'id': report_id, 'assigned_officer_id': self.assigned[report_id]}
+                     for report_id in params if report_id in self.assigned]
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_current_officers(monkeypatch):
+    monkeypatch.setattr(bulk_assign, 'STAGE_BATCH_SIZE', 2)
+    cursor = FakeCursor({1: 7, 2: None, 3: 8})
+    assert current_officers(cursor, [1, 2, 3, 4]) == {1: 7, 2: None, 3: 8}
+    assert cursor.queries == 2
+
+
+def test_parse_assignments():
+    assert parse_assignments([{'report_id': 1, 'officer_id': '2'}, [3, 4, 'note']], 10) == \
+        [(1, 2, ''), (3, 4, 'note')]
+
+
+@pytest.mark.parametrize('assignments', [[], 'x', [{'report_id': 0, 'officer_id': 1}], [{'report_id': 1}], [7]])
+def test_parse_assignments_rejects(assignments):
+    with pytest.raises(InvalidBatch):
+        parse_assignments(assignments, 10)
+
+
+def test_parse_assignments_max_items():
+    with pytest.raises(InvalidBatch):
+        parse_assignments([[1, 1]] * 3, 2)
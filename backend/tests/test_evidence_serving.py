@@ -0,0 +1,92 @@
+import pytest
+from flask import Flask
+
+from evidence_serving import serve_blob
+
+SHA256 = 'ab' * 32
+CONTENT = bytes(range(100))
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / 'blob'
+    path.write_bytes(CONTENT)
+    app = Flask(__name__)
+
+    @app.route('/blob')
+    def blob():
+        return serve_blob(str(path), SHA256, 'application/pdf')
+
+    @app.route('/missing')
+    def missing():
+        return serve_blob(str(tmp_path / 'gone'), SHA256)
+
+    return app.test_client()
+
+
+def test_whole_file(client):
+    response = client.get('/blob')
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['ETag'] == f'"{SHA256}"'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+
+
+def test_if_none_match(client):
+    response = client.get('/blob', headers={'If-None-Match': f'"{SHA256}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_single_range(client):
+    response = client.get('/blob', headers={'Range': 'bytes=10-19'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == 'bytes 10-19/100'
+    assert response.data == CONTENT[10:20]
+
+
+def test_suffix_range(client):
+    response = client.get('/blob', headers={'Range': 'bytes=-5'})
+    assert response.status_code == 206
+    assert response.data == CONTENT[-5:]
+
+
+def test_unsatisfiable_range(client):
+    response = client.get('/blob', headers={'Range': 'bytes=5000-6000'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == 'bytes */100'
+
+
+def test_multiple_ranges(client):
+    response = client.get('/blob', headers={'Range': 'bytes=0-9,90-'})
+    assert response.status_code == 206
+    assert response.mimetype == 'multipart/byteranges'
+    boundary = response.mimetype_params['boundary']
+    assert int(response.headers['Content-Length']) == len(response.data)
+    parts = response.data.split(f'--{boundary}'.encode())
+    head = b'\r\nContent-Type: application/pdf\r\n'
+    assert parts[1] == head + b'Content-Range: bytes 0-9/100\r\n\r\n' + CONTENT[:10] + b'\r\n'
+    assert parts[2] == head + b'Content-Range: bytes 90-99/100\r\n\r\n' + CONTENT[90:] + b'\r\n'
+    assert parts[3] == b'--\r\n'
+
+
+def test_unsatisfiable_ranges_are_dropped(client):
+    response = client.get('/blob', headers={'Range': 'bytes=0-9,5000-6000'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == 'bytes 0-9/100'
+    assert response.data == CONTENT[:10]
+
+
+def test_no_satisfiable_range_of_several(client):
+    response = client.get('/blob', headers={'Range': 'bytes=5000-6000,7000-8000'})
+    assert response.status_code == 416
+
+
+def test_stale_if_range_gets_whole_file(client):
+    response = client.get('/blob', headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert response.status_code == 200
+    assert response.data == CONTENT
+
+
+def test_missing_blob(client):
+    assert client.get('/missing').status_code == 404
@@ -0,0 +1,60 @@
+import os
+
+from migrate import split_sql_statements
+
+SCHEMA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database_schema.sql')
+
+
+def test_splits_on_semicolons():
+    assert split_sql_statements("SELECT 1;\nSELECT 2;\n") == ["SELECT 1", "SELECT 2"]
+
+
+def test_last_statement_needs_no_delimiter():
+    assert split_sql_statements("SELECT 1;\nSELECT 2") == ["SELECT 1", "SELECT 2"]
+
+
+def test_delimiter_directive():
+    sql = """
+DELIMITER //
+CREATE PROCEDURE p()
+BEGIN
+    SELECT 1;
+    SELECT 2;
+END //
+DELIMITER ;
+SELECT 3;
+"""
+    statements = split_sql_statements(sql)
+    assert len(statements) == 2
+    assert statements[0].startswith("CREATE PROCEDURE p()")
+    assert statements[0].endswith("END")
+    assert "SELECT 1;" in statements[0]
+    assert statements[1] == "SELECT 3"
+
+
+def test_delimiters_inside_quotes_are_kept():
+    sql = """INSERT INTO t VALUES ('a;b', "c;d", 'it\\'s;');\nSELECT `x;y` FROM t;"""
+    assert split_sql_statements(sql) == [
+        """INSERT INTO t VALUES ('a;b', "c;d", 'it\\'s;')""",
+        "SELECT `x;y` FROM t",
+    ]
+
+
+def test_comments_are_dropped():
+    sql = """
+-- a comment; with a semicolon
+# another; one
+SELECT 1; -- trailing; comment
+SELECT '-- not a comment' # trailing
+;
+"""
+    assert split_sql_statements(sql) == ["SELECT 1", "SELECT '-- not a comment'"]
+
+
+def test_schema_file():
+    with open(SCHEMA) as file:
+        statements = split_sql_statements(file.read())
+    assert statements[0].upper().startswith("CREATE DATABASE")
+    assert statements[1].upper().startswith("USE ")
+    assert all(statement.strip() for statement in statements)
+    assert not any(statement.upper().startswith("DELIMITER") for statement in statements)
@@ -0,0 +1,59 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_condition, parse_page_args
+
+
+def test_round_trip_datetime():
+    when = datetime(2024, 3, 1, 12, 30, 5)
+    cursor = encode_cursor(when, 42)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (when, 42)
+
+
+def test_round_trip_number():
+    assert decode_cursor(encode_cursor(7, 3)) == (7, 3)
+
+
+def _raw(payload):
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor!',
+    encode_cursor(datetime(2024, 1, 1), 1)[:-3],
+    _raw(b'not json'),
+    _raw(b'\xff\xfe'),
+    _raw(b'[1, 2, 3]'),
+    _raw(b'42'),
+    _raw(b'[1, "x"]'),
+    _raw(b'["yesterday", 1]'),
+    _raw(b'{"a": 1, "b": 2}'),
+])
+def test_tampered_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_parse_page_args():
+    cursor = encode_cursor(datetime(2024, 1, 1), 9)
+    assert parse_page_args({}) == (50, None, False)
+    assert parse_page_args({'limit': '10', 'cursor': cursor, 'include_total': 'true'}) == \
+        (10, (datetime(2024, 1, 1), 9), True)
+    assert parse_page_args({'limit': '100000'})[0] == 500
+    assert parse_page_args({'limit': '0'})[0] == 1
+    assert parse_page_args({'limit': 'lots'})[0] == 50
+
+
+def test_parse_page_args_rejects_bad_cursor():
+    with pytest.raises(InvalidCursor):
+        parse_page_args({'cursor': 'garbage'})
+
+
+def test_keyset_condition():
+    assert keyset_condition('r.created_at', 'r.id', None) == ("", [])
+    condition, params = keyset_condition('r.created_at', 'r.id', (5, 9))
+    assert condition == "(r.created_at < %s OR (r.created_at = %s AND r.id < %s))"
+    assert params == [5, 5, 9]
@@ -0,0 +1,102 @@
+import pytest
+
+import rate_limit
+from rate_limit import LocalBuckets, RateLimiter, parse_rate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    return clock
+
+
+def test_parse_rate():
+    assert parse_rate('20/minute') == (20 / 60, 20)
+    assert parse_rate('5/seconds') == (5, 5)
+    assert parse_rate(None) is None
+
+
+def test_burst_then_wait(clock):
+    buckets = LocalBuckets()
+    for _ in range(3):
+        assert buckets.take('k', 1.0, 3) == (True, 0.0)
+    allowed, wait = buckets.take('k', 1.0, 3)
+    assert not allowed
+    assert wait == pytest.approx(1.0)
+
+    clock.now += 0.5
+    allowed, wait = buckets.take('k', 1.0, 3)
+    assert not allowed
+    assert wait == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert buckets.take('k', 1.0, 3)[0]
+
+
+def test_refill_is_capped_at_burst(clock):
+    buckets = LocalBuckets()
+    buckets.take('k', 1.0, 2)
+    clock.now += 3600
+    assert buckets.take('k', 1.0, 2)[0]
+    assert buckets.take('k', 1.0, 2)[0]
+    assert not buckets.take('k', 1.0, 2)[0]
+
+
+def test_full_buckets_expire(clock):
+    buckets = LocalBuckets()
+    buckets.take('a', 1.0, 2)
+    assert len(buckets) == 1
+    clock.now += 1.5
+    buckets.take('b', 1.0, 2)
+    assert len(buckets) == 1
+
+
+def test_max_keys_evicts_least_recent(clock):
+    buckets = LocalBuckets(max_keys=2)
+    for key in 'abc':
+        buckets.take(key, 1.0, 5)
+    assert len(buckets) == 2
+    assert buckets.evictions == 1
+    # 'a' was evicted, so it starts from a full bucket again
+    for _ in range(5):
+        assert buckets.take('a', 1.0, 5)[0]
+
+
+def test_check_takes_from_both_scopes(clock):
+    limiter = RateLimiter({'auth': {'ip': '2/second', 'user': '1/second'}})
+    assert limiter.check('auth', '10.0.0.1', 'alice') == 0
+    assert limiter.check('auth', '10.0.0.1', 'alice') == pytest.approx(1.0)
+    assert limiter.check('auth', '10.0.0.1', 'bob') == pytest.approx(0.5)
+    stats = limiter.stats()
+    assert stats['auth.limited_user'] == 1
+    assert stats['auth.limited_ip'] == 1
+
+
+def test_concurrency_cap():
+    limiter = RateLimiter({'export': {'concurrency': 1}}, queue_timeout=0)
+    assert limiter.acquire('export')
+    assert not limiter.acquire('export')
+    limiter.release('export')
+    assert limiter.acquire('export')
+    assert limiter.stats()['export.rejected_busy'] == 1
+
+
+class BrokenStore:
+    def take(self, key, rate, burst, cost=1):
+        raise ConnectionError("down")
+
+
+def test_shared_store_failure_falls_back_to_local(clock):
+    limiter = RateLimiter({'auth': {'ip': '1/second'}}, shared=BrokenStore())
+    assert limiter.check('auth', '10.0.0.1') == 0
+    assert limiter.check('auth', '10.0.0.1') == pytest.approx(1.0)
+    assert limiter.shared_errors == 2
@@ -0,0 +1,82 @@
+import errno
+import hashlib
+import io
+import os
+
+import pytest
+from flask import Flask, jsonify, request
+
+import uploads
+from blob_store import BlobStore
+from uploads import UploadRequest, new_spool, store_upload
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.config.update(BLOB_FOLDER=str(tmp_path / 'blobs'), MAX_FILE_SIZE=100)
+    os.makedirs(app.config['BLOB_FOLDER'])
+    store = BlobStore(app.config['BLOB_FOLDER'])
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        stored = [store_upload(file, store) for file in request.files.getlist('files')]
+        return jsonify([[size, sha256] for size, sha256, _ in stored])
+
+    @app.route('/ignore', methods=['POST'])
+    def ignore():
+        return jsonify(len(request.files.getlist('files')))
+
+    app.store = store
+    return app
+
+
+def spool_files(folder):
+    return [name for name in os.listdir(folder) if name.endswith('.part')]
+
+
+def test_upload_is_stored_by_digest(app):
+    data = {'files': [(io.BytesIO(b'a' * 10), 'a.txt'), (io.BytesIO(b'b' * 20), 'b.txt')]}
+    response = app.test_client().post('/upload', data=data)
+    assert response.status_code == 200
+    assert response.json == [[10, hashlib.sha256(b'a' * 10).hexdigest()],
+                             [20, hashlib.sha256(b'b' * 20).hexdigest()]]
+    assert app.store.exists(hashlib.sha256(b'b' * 20).hexdigest())
+    assert spool_files(app.config['BLOB_FOLDER']) == []
+
+
+def test_oversized_file_removes_every_spool(app):
+    data = {'files': [(io.BytesIO(b'a' * 50), 'a.txt'), (io.BytesIO(b'b' * 200), 'b.txt')]}
+    response = app.test_client().post('/upload', data=data)
+    assert response.status_code == 413
+    assert spool_files(app.config['BLOB_FOLDER']) == []
+
+
+def test_spools_not_stored_are_removed(app):
+    data = {'files': [(io.BytesIO(b'a' * 50), 'a.txt')]}
+    response = app.test_client().post('/ignore', data=data)
+    assert response.json == 1
+    assert spool_files(app.config['BLOB_FOLDER']) == []
+
+
+def test_commit_across_filesystems(app, monkeypatch):
+    replace = os.replace
+    calls = []
+
+    def cross_device(source, target):
+        calls.append(source)
+        if len(calls) == 1:
+            raise OSError(errno.EXDEV, 'Invalid cross-device link')
+        replace(source, target)
+
+    spool = new_spool(app.config)
+    spool.write(b'evidence')
+    monkeypatch.setattr(uploads.os, 'replace', cross_device)
+    path = app.store.put(spool)
+
+    with open(path, 'rb') as file:
+        assert file.read() == b'evidence'
+    assert not os.path.exists(spool.temp_path)
+    assert spool_files(app.config['BLOB_FOLDER']) == []
+    assert spool_files(os.path.dirname(path)) == []
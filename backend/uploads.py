@@ -0,0 +1,131 @@
+"""
+Streaming evidence upload pipeline.
+
+Werkzeug parses multipart bodies into per-file streams it asks the request
+for.  UploadRequest hands it a HashingSpoolFile instead, which writes each
+chunk straight to a temporary file in the blob store's folder while computing
+the SHA-256 digest and size, and aborts with 413 as soon as a file grows past
+the per-file limit.  Once the request is parsed the bytes are already on disk;
+store_upload() then only has to rename the temp file into the blob store.
+The request removes every spool that was not stored when it is closed,
+including those of the earlier files when a later one is too large.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingSpoolFile:
+    """Writable temp file that hashes and counts bytes as they arrive"""
+
+    def __init__(self, directory, max_size=None):
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-', suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self.max_size = max_size
+        self.size = 0
+        self.committed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size and self.size > self.max_size:
+            self.close()
+            raise RequestEntityTooLarge(f"File exceeds the {self.max_size} byte upload limit")
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def commit(self, final_path):
+        """Atomically move the received bytes to `final_path`"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        try:
+            os.replace(self.temp_path, final_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Spooled on another filesystem: copy next to the target, then rename
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(final_path), prefix='.upload-', suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as target, open(self.temp_path, 'rb') as source:
+                    shutil.copyfileobj(source, target, CHUNK_SIZE)
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.replace(temp_path, final_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            os.remove(self.temp_path)
+        self.committed = True
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self.committed and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __getattr__(self, name):
+        # seek/read/tell/flush etc. used by Werkzeug and FileStorage
+        return getattr(self._file, name)
+
+
+def new_spool(config):
+    """A HashingSpoolFile in the blob store's folder, so storing it is a rename"""
+    return HashingSpoolFile(config['BLOB_FOLDER'], config.get('MAX_FILE_SIZE'))
+
+
+class UploadRequest(Request):
+    """Request class that spools file parts through HashingSpoolFile"""
+
+    spools = ()
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        spool = new_spool(current_app.config)
+        self.spools = [*self.spools, spool]
+        return spool
+
+    def close(self):
+        # Parsing may have failed part way, leaving spools no FileStorage holds
+        try:
+            super().close()
+        finally:
+            for spool in self.spools:
+                spool.close()
+
+
+def store_upload(file, blob_store):
+    """
+    Move an uploaded file into the blob store and return (size, sha256, path).
+
+    Uploads parsed by UploadRequest are just renamed into place (or dropped,
+    if the same content is already stored).  Any other FileStorage is first
+    copied in CHUNK_SIZE pieces to a temp file, hashed on the way.
+    """
+    stream = file.stream
+    if isinstance(stream, HashingSpoolFile):
+        return stream.size, stream.sha256, blob_store.put(stream)
+
+    spool = new_spool(current_app.config)
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk)
+        path = blob_store.put(spool)
+    finally:
+        spool.close()
+    return spool.size, spool.sha256, path
@@ -0,0 +1,260 @@
+"""
+Victim routes: report submission, the victim's reports, their evidence and
+case logs.
+"""
+
+from flask import Blueprint, current_app, request, jsonify, session
+
+from serialization import fetch_dicts
+from notifications import ASSIGNED, NEW_EVIDENCE, create_notifications, report_parties
+from response_cache import cached
+from rate_limit import limit
+from extensions import db_cursor, get_assignment_engine, log_audit_event, response_cache, notification_hub
+from evidence_routes import store_evidence_files, insert_evidence, public_evidence
+
+bp = Blueprint('victim', __name__)
+
+@bp.route('/victim/report', methods=['POST'])
+@limit('upload')
+def report_crime():
+    if 'user_id' not in session or session.get('role') != 'victim':
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    victim_id = session['user_id']
+    crime_type = request.form.get('crime_type')
+    description = request.form.get('description')
+    date_occurred = request.form.get('date')
+    location = request.form.get('location')
+    files = request.files.getlist('files')
+    
+    if not all([crime_type, description, date_occurred, location]):
+        return jsonify({"error": "All fields are required"}), 400
+    
+    assigned_officer_id = None
+    with db_cursor() as (connection, cursor):
+        try:
+            # Blobs first, so no row lock is held while they are flushed to disk
+            stored = store_evidence_files(files)
+            
+            # Insert the report into database
+            cursor.execute("""
+                INSERT INTO reports (victim_id, crime_type, description, date_occurred, location, status, priority)
+                VALUES (%s, %s, %s, %s, %s, 'Open', 'Medium')
+            """, (victim_id, crime_type, description, date_occurred, location))
+        
+            report_id = cursor.lastrowid
+        
+            evidence_files = insert_evidence(cursor, report_id, stored, victim_id, "Evidence uploaded with report")
+            
+            if current_app.config['AUTO_ASSIGN_ON_SUBMIT']:
+                assigned_officer_id = auto_assign_report(cursor, report_id, crime_type)
+                if assigned_officer_id:
+                    created = create_notifications(cursor, [
+                        (assigned_officer_id, report_id, ASSIGNED, f"You have been assigned to report #{report_id}"),
+                    ])
+        
+            connection.commit()
+            response_cache.invalidate('reports')
+            print(f"Report submitted successfully: ID {report_id}")
+        
+        except Exception as e:
+            print(f"Database error in report submission: {e}")
+            connection.rollback()
+            if assigned_officer_id:
+                get_assignment_engine().release(assigned_officer_id)
+            return jsonify({"error": "Database error"}), 500
+    
+    # Log the report submission event
+    victim_name = session.get('email', 'Unknown')
+    log_audit_event(victim_name, "Report Submitted", f"Crime report #{report_id} submitted", "Success", request.remote_addr)
+    if assigned_officer_id:
+        notification_hub.publish(created)
+        log_audit_event(victim_name, "Officer Auto-Assigned",
+                        f"Officer #{assigned_officer_id} assigned to report #{report_id}", "Success", request.remote_addr)
+    
+    return jsonify({
+        'message': 'Report submitted successfully', 
+        'report_id': report_id,
+        'assigned_officer_id': assigned_officer_id,
+        'evidence_count': len(evidence_files),
+        'evidence': [public_evidence(ev) for ev in evidence_files]
+    }), 200
+
+@bp.route('/victim/report/<int:report_id>/evidence', methods=['POST'])
+@limit('upload')
+def add_report_evidence(report_id):
+    if 'user_id' not in session or session.get('role') != 'victim':
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    user_id = session['user_id']
+    
+    # Parse (and spool to disk) the upload before borrowing a connection
+    files = request.files.getlist('files')
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Check if report exists and belongs to this user
+            cursor.execute("""
+                SELECT id FROM reports WHERE id = %s AND victim_id = %s
+            """, (report_id, user_id))
+        
+            report = cursor.fetchone()
+            if not report:
+                return jsonify({"error": "Report not found"}), 404
+        
+            # Blobs first, so no row lock is held while they are flushed to disk
+            stored = store_evidence_files(files)
+            evidence_files = insert_evidence(cursor, report_id, stored, user_id, "Additional evidence uploaded")
+            _, officer_id = report_parties(cursor, report_id)
+            created = create_notifications(cursor, [
+                (officer_id, report_id, NEW_EVIDENCE,
+                 f"{len(evidence_files)} new evidence file(s) on report #{report_id}")
+            ]) if evidence_files else []
+        
+            connection.commit()
+            # New evidence can also move the report from Open to Under Investigation
+            response_cache.invalidate(f'report:{report_id}', 'reports')
+            notification_hub.publish(created)
+        
+            # Get updated evidence list for this report
+            cursor.execute("""
+                SELECT id, filename, original_name, content_type, file_size, description, upload_date
+                FROM evidence 
+                WHERE report_id = %s
+                ORDER BY upload_date DESC
+            """, (report_id,))
+        
+            updated_evidence = cursor.fetchall()
+        
+            return jsonify({
+                'message': 'Evidence added successfully', 
+                'evidence': updated_evidence
+            }), 200
+        
+        except Exception as e:
+            print(f"Database error in add evidence: {e}")
+            connection.rollback()
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/victim/reports', methods=['GET'])
+def get_victim_reports():
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    with db_cursor() as (connection, cursor):
+        try:
+            cursor.execute("""
+                SELECT r.*, u.name as victim_name, o.name as assigned_officer_name,
+                       (SELECT COUNT(*) FROM evidence e WHERE e.report_id = r.id) as evidence_count
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                LEFT JOIN users o ON r.assigned_officer_id = o.id
+                WHERE r.victim_id = %s
+                ORDER BY r.date_submitted DESC
+            """, (user_id,))
+        
+            my_reports = fetch_dicts(cursor)
+        
+            return jsonify({"reports": my_reports}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_victim_reports: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+@bp.route('/victim/report/<int:report_id>', methods=['GET'])
+@cached(tags=['report:{report_id}', 'users'])
+def get_victim_report_details(report_id):
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Get report details with assigned officer information
+            cursor.execute("""
+                SELECT r.*, u.name as victim_name, 
+                       o.name as assigned_officer_name, o.email as assigned_officer_email,
+                       off.badge_number, off.specialization
+                FROM reports r
+                JOIN users u ON r.victim_id = u.id
+                LEFT JOIN users o ON r.assigned_officer_id = o.id
+                LEFT JOIN officers off ON o.id = off.user_id
+                WHERE r.id = %s AND r.victim_id = %s
+            """, (report_id, user_id))
+        
+            report = cursor.fetchone()
+            if not report:
+                return jsonify({"error": "Report not found"}), 404
+        
+            # Get evidence for this report
+            cursor.execute("""
+                SELECT id, filename, original_name, content_type, file_size, description, upload_date
+                FROM evidence 
+                WHERE report_id = %s
+                ORDER BY upload_date DESC
+            """, (report_id,))
+        
+            evidence = cursor.fetchall()
+        
+            # Add evidence to report
+            report['evidence'] = evidence
+        
+            return jsonify({"report": report}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_victim_report_details: {e}")
+            return jsonify({"error": "Database error"}), 500
+
+def auto_assign_report(cursor, report_id, crime_type):
+    """Assign a just-inserted report to the least-loaded matching officer; returns the officer id"""
+    engine = get_assignment_engine()
+    officer_id = engine.reserve(crime_type)
+    if officer_id is None:
+        return None
+    try:
+        cursor.execute("""
+            UPDATE reports
+            SET assigned_officer_id = %s, assignment_date = NOW(),
+                assignment_note = 'Assigned automatically by caseload', status = 'Under Investigation'
+            WHERE id = %s
+        """, (officer_id, report_id))
+    except Exception:
+        engine.release(officer_id)
+        raise
+    return officer_id
+
+@bp.route('/victim/report/<int:report_id>/logs', methods=['GET'])
+def get_victim_report_logs(report_id):
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    with db_cursor(dictionary=True) as (connection, cursor):
+        try:
+            # Check if the report belongs to this victim
+            cursor.execute("""
+                SELECT id FROM reports 
+                WHERE id = %s AND victim_id = %s
+            """, (report_id, user_id))
+        
+            report = cursor.fetchone()
+            if not report:
+                return jsonify({'error': 'Report not found or not authorized'}), 404
+        
+            # Get logs for this report
+            cursor.execute("""
+                SELECT cl.*, DATE(cl.log_date) as date, u.name as officer_name, u.email as officer_email
+                FROM case_logs cl
+                LEFT JOIN users u ON cl.officer_id = u.id
+                WHERE cl.report_id = %s
+                ORDER BY cl.log_date DESC
+            """, (report_id,))
+        
+            logs = cursor.fetchall()
+        
+            return jsonify({'logs': logs}), 200
+        
+        except Exception as e:
+            print(f"Database error in get_victim_report_logs: {e}")
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
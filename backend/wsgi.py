@@ -0,0 +1,10 @@
+"""
+The app served in production: python serve.py (or any WSGI server) loads wsgi:app.
+serve.py also looks up the launcher hooks on this module.
+"""
+
+from app import create_app, on_preload, on_worker_start, on_worker_drain
+
+__all__ = ['app', 'on_preload', 'on_worker_start', 'on_worker_drain']
+
+app = create_app()
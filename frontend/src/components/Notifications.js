@@ -1,59 +1,101 @@
-import React, { useEffect, useState, useRef } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { Badge, IconButton, Menu, MenuItem, ListItemText, Typography, Box, Tooltip, CircularProgress } from "@mui/material";
 import NotificationsIcon from "@mui/icons-material/Notifications";
 import { fetchWithAuth } from "../utils/auth";
 
+const API = "http://localhost:5000";
+// The server answers 503 when it has no room for another stream; EventSource
+// gives up on an error status, so reopen it after this long (plus jitter)
+const STREAM_BUSY_RETRY_MS = 30000;
+
 export default function Notifications() {
   const [anchorEl, setAnchorEl] = useState(null);
   const [notifications, setNotifications] = useState([]);
+  const [unreadCount, setUnreadCount] = useState(0);
   const [loading, setLoading] = useState(false);
   const [marking, setMarking] = useState(false);
-  const intervalRef = useRef();
-
-  const unreadCount = notifications.filter(n => !n.read).length;
+  // Ids already received: a resumed stream re-sends a few recent ones
+  const seenIds = useRef(new Set());
 
   const fetchNotifications = async () => {
     setLoading(true);
     try {
-      const res = await fetchWithAuth("http://localhost:5000/notifications");
+      const res = await fetchWithAuth(`${API}/notifications`, { credentials: "include" });
       const data = await res.json();
+      (data.notifications || []).forEach(n => seenIds.current.add(n.id));
       setNotifications(data.notifications || []);
+      setUnreadCount(data.unread_count || 0);
     } catch {
-      // ignore errors for polling
+      // the stream keeps the badge current; a failed refresh is not fatal
     }
     setLoading(false);
   };
 
   useEffect(() => {
     fetchNotifications();
-    intervalRef.current = setInterval(fetchNotifications, 30000); // poll every 30s
-    return () => clearInterval(intervalRef.current);
+    // One long-lived connection per tab; EventSource reconnects by itself and
+    // sends Last-Event-ID so nothing is missed in between
+    let source;
+    let retryTimer;
+    const onNotification = (e) => {
+      const notification = JSON.parse(e.data);
+      if (seenIds.current.has(notification.id)) return;
+      seenIds.current.add(notification.id);
+      setNotifications(prev =>
+        prev.some(n => n.id === notification.id) ? prev : [notification, ...prev]
+      );
+      if (!notification.read) setUnreadCount(count => count + 1);
+    };
+    const connect = () => {
+      source = new EventSource(`${API}/notifications/stream`, { withCredentials: true });
+      source.addEventListener("notification", onNotification);
+      source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED) return;
+        // Turned away: a fresh stream starts from "now", so reload the list too
+        retryTimer = setTimeout(() => {
+          fetchNotifications();
+          connect();
+        }, STREAM_BUSY_RETRY_MS * (1 + Math.random()));
+      };
+    };
+    connect();
+    return () => {
+      clearTimeout(retryTimer);
+      source.close();
+    };
   }, []);
 
-  const handleOpen = (e) => {
-    setAnchorEl(e.currentTarget);
-    fetchNotifications();
-  };
+  const handleOpen = (e) => setAnchorEl(e.currentTarget);
   const handleClose = () => setAnchorEl(null);
 
-  const handleMarkRead = async (ids) => {
+  const markRead = async (body, isAffected) => {
     setMarking(true);
     try {
-      await fetchWithAuth("http://localhost:5000/notifications/mark-read", {
+      const res = await fetchWithAuth(`${API}/notifications/mark-read`, {
         method: "POST",
+        credentials: "include",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ notification_ids: ids })
+        body: JSON.stringify(body)
       });
-      await fetchNotifications();
+      const data = await res.json();
+      setNotifications(prev => prev.map(n => (isAffected(n) ? { ...n, read: true } : n)));
+      if (data.unread_count !== undefined) setUnreadCount(data.unread_count);
     } catch {}
     setMarking(false);
   };
 
+  const handleMarkRead = (ids) => markRead({ notification_ids: ids }, n => ids.includes(n.id));
+
+  const handleMarkAllRead = () => {
+    const upToId = Math.max(...notifications.map(n => n.id));
+    markRead({ up_to_id: upToId }, n => n.id <= upToId);
+  };
+
   return (
     <Box>
       <Tooltip title="Notifications">
         <span>
-          <IconButton color="inherit" onClick={handleOpen} disabled={loading}>
+          <IconButton color="inherit" onClick={handleOpen}>
             <Badge badgeContent={unreadCount} color="error">
               <NotificationsIcon />
             </Badge>
@@ -90,7 +132,7 @@ export default function Notifications() {
           ))
         )}
         {unreadCount > 0 && (
-          <MenuItem onClick={() => handleMarkRead(notifications.filter(n => !n.read).map(n => n.id))} disabled={marking}>
+          <MenuItem onClick={handleMarkAllRead} disabled={marking || notifications.length === 0}>
             <Typography color="primary">Mark all as read</Typography>
           </MenuItem>
         )}
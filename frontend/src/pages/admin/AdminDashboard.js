@@ -24,21 +24,29 @@ export default function AdminDashboard() {
   const [adminName] = useSessionStorage("userName", "Admin User");
 
   const [reports, setReports] = useState([]);
+  const [stats, setStats] = useState({});
+  const [unassignedReports, setUnassignedReports] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
   useEffect(() => {
     setLoading(true);
-    fetch("http://localhost:5000/admin/all_reports", {
-      method: "GET",
-      credentials: "include"
-    })
+    const getJson = (url) => fetch(url, { method: "GET", credentials: "include" })
       .then(async res => {
         if (!res.ok) throw new Error((await res.json()).error || "Failed to fetch reports");
         return res.json();
-      })
-      .then(data => {
-        setReports(data.reports || []);
+      });
+    // Totals come from the analytics counters and the unassigned count from a
+    // filtered page total; only the recent-reports table needs report rows
+    Promise.all([
+      getJson("http://localhost:5000/admin/analytics"),
+      getJson("http://localhost:5000/admin/all_reports?unassigned=1&include_total=1&limit=1"),
+      getJson("http://localhost:5000/admin/all_reports?limit=5")
+    ])
+      .then(([analytics, unassigned, recent]) => {
+        setStats(analytics.report_stats || {});
+        setUnassignedReports(unassigned.page ? unassigned.page.total : 0);
+        setReports(recent.reports || []);
         setLoading(false);
       })
       .catch(err => {
@@ -47,11 +55,10 @@ export default function AdminDashboard() {
       });
   }, []);
 
-  // Calculate statistics
-  const totalReports = reports.length;
-  const unassignedReports = reports.filter(r => r.assigned_officer === "Not Assigned").length;
-      const inProgressReports = reports.filter(r => r.status === "Under Investigation").length;
-      const resolvedReports = reports.filter(r => r.status === "Closed").length;
+  // Statistics
+  const totalReports = stats.total_reports || 0;
+  const inProgressReports = stats.investigating_reports || 0;
+  const resolvedReports = stats.closed_reports || 0;
 
   const getStatusColor = (status) => {
     switch (status) {
@@ -263,7 +270,7 @@ export default function AdminDashboard() {
                     reports.slice(0, 5).map((report) => (
                       <TableRow key={report.id}>
                         <TableCell sx={{ fontWeight: 600 }}>{`#${String(report.id).padStart(3, '0')}`}</TableCell>
-                        <TableCell>{report.victim_id || report.victim || 'Unknown'}</TableCell>
+                        <TableCell>{report.victim_name || 'Unknown'}</TableCell>
                         <TableCell>{report.crime_type}</TableCell>
                         <TableCell>{formatDate(report.date_submitted)}</TableCell>
                         <TableCell>
@@ -274,7 +281,7 @@ export default function AdminDashboard() {
                             sx={{ fontWeight: 600 }}
                           />
                         </TableCell>
-                        <TableCell>{report.assigned_officer || 'Not Assigned'}</TableCell>
+                        <TableCell>{report.assigned_officer_name || 'Not Assigned'}</TableCell>
                       </TableRow>
                     ))
                   )}
@@ -3,7 +3,7 @@ import {
   Box, Typography, Paper, Grid, Card, CardContent, 
   TextField, InputAdornment, Select, MenuItem, FormControl,
   Table, TableBody, TableCell, TableContainer, TableHead, 
-  TableRow, Chip, IconButton, Avatar
+  TableRow, Chip, IconButton, Avatar, Button
 } from "@mui/material";
 import AdminSidebar from "../../components/AdminSidebar";
 import NotificationsNoneIcon from '@mui/icons-material/NotificationsNone';
@@ -23,6 +23,8 @@ export default function AllReports() {
   const [statusFilter, setStatusFilter] = useState("All Statuses");
   const [crimeTypeFilter, setCrimeTypeFilter] = useState("All Crime Types");
   const [reports, setReports] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalReports, setTotalReports] = useState(null);
   const [stats, setStats] = useState({
     total: 0,
     open: 0,
@@ -32,33 +34,38 @@ export default function AllReports() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
 
-  // Fetch reports from backend
-  useEffect(() => {
-    const fetchReports = async () => {
-      try {
-        const response = await fetch('http://localhost:5000/admin/all_reports', {
-          credentials: 'include'
-        });
-        
-        if (response.ok) {
-          const data = await response.json();
-          setReports(data.reports || []);
-        } else {
-          setError('Failed to fetch reports');
+  // Fetch a page of reports from backend; pass the cursor to load the next page
+  const fetchReports = async (cursor = null) => {
+    try {
+      const params = cursor ? `cursor=${encodeURIComponent(cursor)}` : 'include_total=1';
+      const response = await fetch(`http://localhost:5000/admin/all_reports?${params}`, {
+        credentials: 'include'
+      });
+      
+      if (response.ok) {
+        const data = await response.json();
+        setReports(prev => cursor ? [...prev, ...(data.reports || [])] : (data.reports || []));
+        setNextCursor(data.page ? data.page.next_cursor : null);
+        if (data.page && data.page.total !== undefined) {
+          setTotalReports(data.page.total);
         }
-      } catch (err) {
-        setError('Network error');
-      } finally {
-        setLoading(false);
+      } else {
+        setError('Failed to fetch reports');
       }
-    };
+    } catch (err) {
+      setError('Network error');
+    } finally {
+      setLoading(false);
+    }
+  };
 
+  useEffect(() => {
     fetchReports();
   }, []);
 
   // Calculate statistics
   useEffect(() => {
-    const total = reports.length;
+    const total = totalReports !== null ? totalReports : reports.length;
     const open = reports.filter(r => r.status === "Open").length;
     const inProgress = reports.filter(r => r.status === "Under Investigation").length;
     const resolved = reports.filter(r => r.status === "Closed").length;
@@ -69,7 +76,7 @@ export default function AllReports() {
       inProgress,
       resolved
     });
-  }, [reports]);
+  }, [reports, totalReports]);
 
   const getStatusColor = (status) => {
     switch (status) {
@@ -392,6 +399,11 @@ export default function AllReports() {
                 </TableBody>
               </Table>
             </TableContainer>
+            {nextCursor && (
+              <Box sx={{ p: 2, textAlign: 'center' }}>
+                <Button onClick={() => fetchReports(nextCursor)}>Load more</Button>
+              </Box>
+            )}
           </Paper>
         </Box>
       </Box>
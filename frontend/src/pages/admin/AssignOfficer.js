@@ -31,17 +31,26 @@ export default function AssignOfficer() {
   const [error, setError] = useState("");
   const [loading, setLoading] = useState(true);
 
+  // Fetch every unassigned report, following the page cursors
+  const fetchUnassignedReports = async () => {
+    let all = [];
+    let cursor = null;
+    do {
+      const params = `unassigned=1&limit=500${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`;
+      const res = await fetch(`http://localhost:5000/admin/all_reports?${params}`, {
+        credentials: "include"
+      });
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.error || "Failed to fetch reports");
+      all = all.concat(data.reports || []);
+      cursor = data.page ? data.page.next_cursor : null;
+    } while (cursor);
+    setReports(all);
+  };
+
   useEffect(() => {
     setLoading(true);
-    // Fetch unassigned reports
-    fetch("http://localhost:5000/admin/all_reports", {
-      credentials: "include"
-    })
-      .then(res => res.json())
-      .then(data => {
-        const unassignedReports = data.reports.filter(r => !r.assigned_officer_name || r.assigned_officer_name === "Not Assigned");
-        setReports(unassignedReports);
-      })
+    fetchUnassignedReports()
       .catch(err => console.error("Failed to fetch reports:", err));
 
     // Fetch available officers
@@ -83,14 +92,8 @@ export default function AssignOfficer() {
       if (res.ok) {
         setSuccess("Officer assigned successfully!");
         // Refresh the reports list
-        fetch("http://localhost:5000/admin/all_reports", {
-          credentials: "include"
-        })
-          .then(res => res.json())
-          .then(data => {
-            const unassignedReports = data.reports.filter(r => !r.assigned_officer_name || r.assigned_officer_name === "Not Assigned");
-            setReports(unassignedReports);
-          });
+        fetchUnassignedReports()
+          .catch(err => console.error("Failed to fetch reports:", err));
       } else {
         const data = await res.json();
         setError(data.error || "Failed to assign officer");
@@ -22,6 +22,7 @@ export default function ManageUsers() {
   const [searchTerm, setSearchTerm] = useState("");
   const [roleFilter, setRoleFilter] = useState("All Roles");
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [stats, setStats] = useState({
     total: 0,
     victims: 0,
@@ -54,45 +55,57 @@ export default function ManageUsers() {
     severity: 'success'
   });
 
-  // Fetch users from backend
-  useEffect(() => {
-    const fetchUsers = async () => {
-      try {
-        const response = await fetch('http://localhost:5000/admin/users', {
-          credentials: 'include'
+  // Fetch a page of users from backend; pass the cursor to load the next page
+  const fetchUsers = async (cursor = null) => {
+    try {
+      const url = cursor
+        ? `http://localhost:5000/admin/users?cursor=${encodeURIComponent(cursor)}`
+        : 'http://localhost:5000/admin/users';
+      const response = await fetch(url, {
+        credentials: 'include'
+      });
+      
+      if (response.ok) {
+        const data = await response.json();
+        const usersWithIcons = data.users.map(user => ({
+          ...user,
+          icon: getRoleIcon(user.role)
+        }));
+        setUsers(prev => cursor ? [...prev, ...usersWithIcons] : usersWithIcons);
+        setNextCursor(data.page ? data.page.next_cursor : null);
+      } else {
+        setError('Failed to fetch users');
+      }
+    } catch (err) {
+      setError('Network error');
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  // Stats come from the server, since only a page of users is loaded
+  const fetchStats = async () => {
+    try {
+      const response = await fetch('http://localhost:5000/admin/users/stats', {
+        credentials: 'include'
+      });
+      if (response.ok) {
+        const data = await response.json();
+        setStats({
+          total: data.total,
+          victims: data.victims,
+          officers: data.officers,
+          admins: data.admins
         });
-        
-        if (response.ok) {
-          const data = await response.json();
-          const usersWithIcons = data.users.map(user => ({
-            ...user,
-            icon: getRoleIcon(user.role)
-          }));
-          setUsers(usersWithIcons);
-          
-          // Calculate stats from users data
-          const total = usersWithIcons.length;
-          const victims = usersWithIcons.filter(user => user.role === 'Victim').length;
-          const officers = usersWithIcons.filter(user => user.role === 'Officer').length;
-          const admins = usersWithIcons.filter(user => user.role === 'Admin').length;
-          
-          setStats({
-            total,
-            victims,
-            officers,
-            admins
-          });
-        } else {
-          setError('Failed to fetch users');
-        }
-      } catch (err) {
-        setError('Network error');
-      } finally {
-        setLoading(false);
       }
-    };
+    } catch (err) {
+      console.error('Failed to fetch user stats:', err);
+    }
+  };
 
+  useEffect(() => {
     fetchUsers();
+    fetchStats();
   }, []);
 
   const getRoleColor = (role) => {
@@ -472,6 +485,11 @@ export default function ManageUsers() {
                 </TableBody>
               </Table>
             </TableContainer>
+            {nextCursor && (
+              <Box sx={{ p: 2, textAlign: 'center' }}>
+                <Button onClick={() => fetchUsers(nextCursor)}>Load more</Button>
+              </Box>
+            )}
           </Paper>
         </Box>
       </Box>
@@ -47,16 +47,7 @@ export default function CaseDetails() {
       });
 
     // Fetch evidence
-    fetch(`http://localhost:5000/officer/case/${id}/evidence`, {
-      credentials: "include"
-    })
-      .then(res => res.json())
-      .then(data => {
-        if (data.evidence) {
-          setEvidence(data.evidence);
-        }
-      })
-      .catch(err => console.error("Failed to fetch evidence:", err));
+    refreshEvidence();
 
     // Fetch logs
     fetch(`http://localhost:5000/officer/case/${id}/logs`, {
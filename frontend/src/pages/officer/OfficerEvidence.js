@@ -18,6 +18,7 @@ import PersonIcon from '@mui/icons-material/Person';
 
 export default function OfficerEvidence() {
   const [evidence, setEvidence] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [searchTerm, setSearchTerm] = useState("");
@@ -25,22 +26,30 @@ export default function OfficerEvidence() {
   const [sortBy, setSortBy] = useState("date");
   const [selectedCaseId, setSelectedCaseId] = useState("all");
 
-  useEffect(() => {
-    setLoading(true);
-    fetch("http://localhost:5000/officer/all_evidence", { method: "GET", credentials: "include" })
+  // Fetch a page of evidence; pass the cursor to load the next page
+  const fetchEvidence = (cursor = null) => {
+    const url = cursor
+      ? `http://localhost:5000/officer/all_evidence?cursor=${encodeURIComponent(cursor)}`
+      : "http://localhost:5000/officer/all_evidence";
+    fetch(url, { method: "GET", credentials: "include" })
       .then(async res => {
         if (!res.ok) throw new Error((await res.json()).error || "Failed to fetch evidence");
         return res.json();
       })
       .then(data => { 
-        console.log("Evidence data received:", data.evidence);
-        setEvidence(data.evidence || []); 
+        setEvidence(prev => cursor ? [...prev, ...(data.evidence || [])] : (data.evidence || [])); 
+        setNextCursor(data.page ? data.page.next_cursor : null);
         setLoading(false); 
       })
       .catch(err => { 
         setError(err.message); 
         setLoading(false); 
       });
+  };
+
+  useEffect(() => {
+    setLoading(true);
+    fetchEvidence();
   }, []);
 
   const getFileIcon = (contentType) => {
@@ -391,6 +400,11 @@ export default function OfficerEvidence() {
               <Typography variant="body2" color="text.secondary" textAlign="center">
                 Showing {filteredEvidence.length} of {evidence.length} evidence files
               </Typography>
+              {nextCursor && (
+                <Box sx={{ mt: 1, textAlign: 'center' }}>
+                  <Button onClick={() => fetchEvidence(nextCursor)}>Load more</Button>
+                </Box>
+              )}
         </Paper>
           )}
         </Box>